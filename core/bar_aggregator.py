@@ -0,0 +1,385 @@
+"""
+============================================
+장중 봉 집계기 - 실시간 틱 → 1초/1분/5분 OHLCV
+============================================
+- 브릿지 틱(last, 누적 volume)을 봉 단위로 집계
+- 심볼/봉 길이별 고정 크기 NumPy 링 버퍼 (메모리 상한 고정)
+- 마감된 봉은 대기열에 모았다가 일정 주기로 DB에 일괄 저장
+- 조회는 시간 오름차순 배열 (Green Mode VWAP, 차트용)
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pytz
+from dotenv import load_dotenv
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# .env 파일 로드
+load_dotenv()
+
+# 지원 봉 길이 (이름 → 초)
+TIMEFRAMES: Dict[str, int] = {"1s": 1, "1m": 60, "5m": 300}
+
+# 정규장 시작 (미국 동부)
+US_EASTERN = pytz.timezone("US/Eastern")
+SESSION_OPEN = (9, 30)
+
+
+def session_start_ts(now: Optional[float] = None) -> int:
+    """
+    당일 정규장 시작 시각 (epoch 초)
+    
+    Args:
+        now: 기준 시각 (None이면 현재)
+    """
+    moment = datetime.fromtimestamp(now if now is not None else time.time(), US_EASTERN)
+    start = moment.replace(hour=SESSION_OPEN[0], minute=SESSION_OPEN[1],
+                           second=0, microsecond=0)
+    return int(start.timestamp())
+
+
+class _BarRing:
+    """고정 크기 봉 링 버퍼 (컬럼별 NumPy 배열)"""
+    
+    __slots__ = ("capacity", "ts", "open", "high", "low", "close", "volume", "head", "count")
+    
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.open = np.zeros(capacity, dtype=np.float64)
+        self.high = np.zeros(capacity, dtype=np.float64)
+        self.low = np.zeros(capacity, dtype=np.float64)
+        self.close = np.zeros(capacity, dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.float64)
+        self.head = 0     # 다음에 쓸 위치
+        self.count = 0
+    
+    def append(self, bar: "_FormingBar") -> None:
+        """봉 1개 추가 (가득 차면 가장 오래된 봉을 덮어씀)"""
+        i = self.head
+        self.ts[i] = bar.ts
+        self.open[i] = bar.open
+        self.high[i] = bar.high
+        self.low[i] = bar.low
+        self.close[i] = bar.close
+        self.volume[i] = bar.volume
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+    
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """시간 오름차순 복사본 반환"""
+        order = (np.arange(self.count) + self.head - self.count) % self.capacity
+        return {
+            "ts": self.ts[order],
+            "open": self.open[order],
+            "high": self.high[order],
+            "low": self.low[order],
+            "close": self.close[order],
+            "volume": self.volume[order],
+        }
+
+
+class _FormingBar:
+    """집계 중인 봉"""
+    
+    __slots__ = ("ts", "open", "high", "low", "close", "volume")
+    
+    def __init__(self, ts: int, price: float, volume: float) -> None:
+        self.ts = ts
+        self.open = price
+        self.high = price
+        self.low = price
+        self.close = price
+        self.volume = volume
+
+
+class BarAggregator(QObject):
+    """
+    장중 봉 집계기
+    
+    사용법:
+        bars = BarAggregator(db)
+        bars.start()                      # 주기적 DB 저장 시작
+        bars.add_tick("SPY", 470.0, cumulative_volume)   # 브릿지 시세마다
+        spy_1m = bars.get_bars("SPY", "1m", since=session_start_ts())
+    
+    Signals:
+        log_message(str): 로그 메시지
+    """
+    
+    # === PyQt Signals ===
+    log_message = pyqtSignal(str)       # 로그 메시지
+    
+    # === 설정값 (.env에서 로드) ===
+    RING_SIZE = int(os.getenv("INTRADAY_RING_SIZE", "1440"))       # 심볼/봉 길이별 보관 봉 수
+    FLUSH_INTERVAL_MS = int(os.getenv("INTRADAY_FLUSH_MS", "5000"))  # DB 저장 주기
+    MAX_PENDING = int(os.getenv("INTRADAY_MAX_PENDING", "50000"))    # 저장 대기 봉 최대 수 (DB 미개방/실패 시)
+    
+    def __init__(self, db=None, timeframes: Optional[Dict[str, int]] = None,
+                 parent=None) -> None:
+        """
+        초기화
+        
+        Args:
+            db: MarketDatabase (None이면 메모리에만 보관)
+            timeframes: 봉 길이 {"이름": 초} (기본: 1s/1m/5m)
+            parent: 부모 QObject
+        """
+        super().__init__(parent)
+        self.db = db
+        self.timeframes = dict(timeframes or TIMEFRAMES)
+        self._lock = threading.Lock()
+        
+        # === (심볼, 봉 이름)별 상태 ===
+        self._rings: Dict[Tuple[str, str], _BarRing] = {}
+        self._forming: Dict[Tuple[str, str], _FormingBar] = {}
+        
+        # 심볼별 마지막 누적 거래량 (틱 volume은 당일 누적값)
+        self._last_volume: Dict[str, float] = {}
+        
+        # DB 저장 대기 봉 [(symbol, timeframe_sec, ts, o, h, l, c, v), ...]
+        self._pending: List[Tuple] = []
+        
+        # --- 저장 타이머 ---
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush)
+    
+    # ============================================
+    # 시작/중지
+    # ============================================
+    
+    def start(self) -> None:
+        """주기적 DB 저장 시작"""
+        self.flush_timer.start(self.FLUSH_INTERVAL_MS)
+    
+    def stop(self) -> None:
+        """저장 중지 (남은 봉은 마지막으로 저장)"""
+        self.flush_timer.stop()
+        self.flush()
+    
+    # ============================================
+    # 틱 집계
+    # ============================================
+    
+    def on_tick(self, data: dict, ts: Optional[float] = None) -> None:
+        """
+        실시간 틱 반영 (dict 입력)
+        
+        Args:
+            data: {symbol, last, volume, ...}
+            ts: 틱 시각 (epoch 초, None이면 현재)
+        """
+        self.add_tick(data.get("symbol", ""), data.get("last") or 0.0,
+                      data.get("volume") or 0, ts)
+    
+    def add_tick(self, symbol: str, price: float, cumulative_volume: float,
+                 ts: Optional[float] = None) -> None:
+        """
+        실시간 틱 반영
+        
+        Args:
+            symbol: 심볼
+            price: 체결가 (last)
+            cumulative_volume: 당일 누적 거래량
+            ts: 틱 시각 (epoch 초, None이면 현재)
+        """
+        if not symbol or price <= 0:
+            return
+        
+        now = ts if ts else time.time()
+        
+        with self._lock:
+            volume = self._volume_delta(symbol, cumulative_volume or 0)
+            
+            for name, seconds in self.timeframes.items():
+                key = (symbol, name)
+                start = int(now) // seconds * seconds
+                bar = self._forming.get(key)
+                
+                if bar is None or bar.ts != start:
+                    if bar is not None and start > bar.ts:
+                        self._close_bar(key, seconds, bar)
+                    elif bar is not None:
+                        # 시각이 되돌아간 틱 → 현재 봉에 합산
+                        self._update_bar(bar, price, volume)
+                        continue
+                    self._forming[key] = _FormingBar(start, price, volume)
+                else:
+                    self._update_bar(bar, price, volume)
+    
+    def _volume_delta(self, symbol: str, cumulative: float) -> float:
+        """누적 거래량 → 이번 틱 거래량"""
+        last = self._last_volume.get(symbol)
+        self._last_volume[symbol] = cumulative
+        
+        # 첫 틱이거나 누적값이 리셋되면 (새 세션) 0으로 처리
+        if last is None or cumulative < last:
+            return 0.0
+        return float(cumulative - last)
+    
+    @staticmethod
+    def _update_bar(bar: _FormingBar, price: float, volume: float) -> None:
+        """집계 중인 봉 갱신"""
+        if price > bar.high:
+            bar.high = price
+        if price < bar.low:
+            bar.low = price
+        bar.close = price
+        bar.volume += volume
+    
+    def _close_bar(self, key: Tuple[str, str], seconds: int, bar: _FormingBar) -> None:
+        """봉 마감 → 링 버퍼 + 저장 대기열 (락 안에서 호출)"""
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = _BarRing(self.RING_SIZE)
+            self._rings[key] = ring
+        ring.append(bar)
+        
+        self._pending.append((key[0], seconds, bar.ts, bar.open, bar.high,
+                              bar.low, bar.close, int(round(bar.volume))))
+    
+    def close_expired(self, now: Optional[float] = None) -> None:
+        """
+        기간이 끝난 집계 중 봉 마감 (틱이 끊긴 심볼용)
+        
+        Args:
+            now: 기준 시각 (epoch 초, None이면 현재)
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            for key, bar in list(self._forming.items()):
+                seconds = self.timeframes[key[1]]
+                if bar.ts + seconds <= now:
+                    self._close_bar(key, seconds, bar)
+                    del self._forming[key]
+    
+    # ============================================
+    # 조회
+    # ============================================
+    
+    def get_bars(self, symbol: str, timeframe: str = "1m",
+                 since: Optional[int] = None,
+                 include_partial: bool = False) -> Dict[str, np.ndarray]:
+        """
+        장중 봉 조회 (시간 오름차순)
+        
+        Args:
+            symbol: 심볼
+            timeframe: 봉 이름 ("1s", "1m", "5m")
+            since: 이 시각(epoch 초) 이후 시작한 봉만
+            include_partial: 집계 중인 봉 포함 여부
+        
+        Returns:
+            {"ts", "open", "high", "low", "close", "volume"} 배열
+        """
+        if timeframe not in self.timeframes:
+            raise KeyError(f"지원하지 않는 봉 길이: {timeframe} (지원: {list(self.timeframes)})")
+        
+        key = (symbol, timeframe)
+        with self._lock:
+            ring = self._rings.get(key)
+            bars = ring.to_arrays() if ring is not None else _BarRing(1).to_arrays()
+            
+            bar = self._forming.get(key) if include_partial else None
+            if bar is not None:
+                bars = {
+                    col: np.append(arr, getattr(bar, col))
+                    for col, arr in bars.items()
+                }
+        
+        if since is not None:
+            start = int(np.searchsorted(bars["ts"], since))
+            bars = {col: arr[start:] for col, arr in bars.items()}
+        return bars
+    
+    # ============================================
+    # DB 저장
+    # ============================================
+    
+    def flush(self) -> int:
+        """
+        마감된 봉을 DB에 일괄 저장 (단일 트랜잭션)
+        
+        Returns:
+            저장한 봉 수
+        """
+        self.close_expired()
+        
+        if self.db is None:
+            # DB 없이 사용 → 메모리에만 보관 (대기열은 버림)
+            with self._lock:
+                self._pending = []
+            return 0
+        
+        if not self.db.is_open():
+            # DB가 열릴 때까지 대기열 유지 (한도 초과분만 버림)
+            self._requeue([])
+            return 0
+        
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+        
+        try:
+            self.db.upsert_intraday_bars(pending)
+            return len(pending)
+        except Exception as e:
+            # 다음 주기에 재시도
+            self._requeue(pending)
+            self.log_message.emit(f"⚠️ 장중 봉 저장 실패: {str(e)}")
+            return 0
+    
+    def _requeue(self, pending: List[Tuple]) -> None:
+        """저장 못 한 봉을 대기열 앞에 되돌림 (MAX_PENDING 초과 시 오래된 봉부터 버림)"""
+        with self._lock:
+            queue = pending + self._pending
+            dropped = len(queue) - self.MAX_PENDING
+            if dropped > 0:
+                queue = queue[dropped:]
+            self._pending = queue
+        if dropped > 0:
+            self.log_message.emit(f"⚠️ 장중 봉 저장 대기 한도 초과: 오래된 {dropped}개 버림")
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    
+    from core.storage import MarketDatabase
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MarketDatabase(Path(tmp) / "test.db")
+        db.open()
+        
+        bars = BarAggregator(db)
+        bars.log_message.connect(lambda x: print(f"[LOG] {x}"))
+        
+        # 0~179초 동안 1초마다 틱 (누적 거래량 100씩 증가)
+        base = 1_700_000_040    # 분 경계
+        for i in range(180):
+            bars.on_tick({"symbol": "SPY", "last": 470.0 + (i % 7) * 0.1,
+                          "volume": 1000 + i * 100}, ts=base + i)
+        
+        one_min = bars.get_bars("SPY", "1m")
+        print(f"마감된 1분봉: {len(one_min['ts'])}개 (2 예상)")
+        print(f"1분봉 거래량: {one_min['volume']} (첫 봉 5900, 둘째 6000 예상)")
+        print(f"집계 중 포함: {len(bars.get_bars('SPY', '1m', include_partial=True)['ts'])}개 (3 예상)")
+        
+        saved = bars.flush()
+        print(f"DB 저장: {saved}봉")
+        print(f"DB 1분봉: {len(db.load_intraday_bars('SPY', 60))}개 (3 예상, 만료 봉 마감 포함)")
+        
+        db.close()
@@ -6,21 +6,73 @@ Interactive Brokers Gateway/TWS 연결을 백그라운드에서 처리합니다.
 GUI가 멈추지 않도록 별도 스레드에서 실행됩니다.
 
 중요: time.sleep() 대신 QThread.msleep() 사용!
+
+이벤트 루프:
+- 브릿지 스레드 전용 asyncio 루프 (connectAsync, run_until_complete)
+- 폴링 없이 종료 이벤트만 기다림 → 유휴 시 CPU 사용 없음
+- 다른 스레드의 IB 호출은 call()/run_coroutine()으로 루프에 전달
+  (run_coroutine_threadsafe → 즉시 실행, concurrent Future 반환)
+
+연결 감독:
+- 하트비트 (reqCurrentTimeAsync)로 응답 없는 연결 감지
+- 끊기면 스레드 재시작 없이 지수 백오프로 재연결 (최대 IB_RECONNECT_MAX_S)
+- 재연결 후 추적 중인 구독(주식/지수/VX 선물)을 일괄 재요청
+- 미체결 주문/포지션을 다시 받아 reconciled 시그널로 전달
+
+계약 캐시 (core/contract_cache.py):
+- 연결 시 유니버스(ETF/인버스/VIX)를 qualifyContractsAsync 1회로 확인
+- 구독/주문은 conId가 채워진 캐시 계약 사용
+
+VX 선물 커브 (core/vx_curve.py):
+- reqContractDetails 1회로 월물 체인 조회 → 앞쪽 VX_CURVE_MONTHS개 구독
+- 근월물 만기일에 자동 롤오버 (세션 중에도)
+- 30/60/90일 고정 만기 커브를 vix_futures_update로 전달
+
+시세 회선 (core/subscription_manager.py):
+- 동시 회선 한도(IB_MAX_LINES) 안에서 우선순위/LRU로 스트리밍 심볼 배분
+- 넘친 심볼은 스냅샷 요청으로 순환 갱신
+- 주문/보유 종목은 자동으로 최우선
+
+요청 대기열 (core/ib_commands.py):
+- 주문/구독/취소/과거 봉 요청은 submit(명령)으로 대기열에 추가 → Future 반환
+- 루프 스레드가 대기열을 한 번에 최대 IB_COMMAND_BATCH개씩 꺼내 실행
+- 호출 스레드는 기다리지 않음 (결과는 Future 콜백으로)
+
+시세 전달 (배치):
+- ib_insync pendingTickersEvent로 갱신된 티커만 수신
+- 심볼별 QuoteTable 행을 제자리 갱신 (틱 경로에서 객체 생성 없음)
+- TICK_BATCH_MS 동안 바뀐 심볼 ID를 price_batch 시그널 1회로 전송
 ============================================
 """
 
 # ============================================
 # 필수 라이브러리 임포트
 # ============================================
+import asyncio                          # 브릿지 전용 이벤트 루프
+import inspect                          # 비동기 명령 판별
 import os                               # 환경 변수
-from typing import Optional, Dict, Any, List  # 타입 힌트
+import threading                        # 루프 스레드 판별
+from collections import deque           # 명령 대기열
+from concurrent.futures import Future   # 다른 스레드에 돌려줄 결과
+from typing import Optional, Dict, Any, List, Set, Callable, Coroutine, Deque, Tuple  # 타입 힌트
 from dotenv import load_dotenv          # .env 파일 로드
-from ib_insync import IB, util, Stock, Ticker, Future  # IBKR API
+from ib_insync import IB, Ticker       # IBKR API
 from PyQt6.QtCore import (              # PyQt6 코어
     QThread,                            # 백그라운드 스레드
     pyqtSignal,                         # 시그널 (스레드 → GUI 통신)
 )
 
+from core.contract_cache import ContractCache, contract_key  # 확인된 계약 캐시
+from core.ib_commands import (          # 브릿지 루프로 넘기는 타입 요청
+    IBCommand, PlaceOrder, CancelOrder, Subscribe, Unsubscribe,
+    HistoricalData, OpenOrders, Positions,
+)
+from core.quote_table import QuoteTable  # 심볼별 최신 시세 (제자리 갱신)
+from core.subscription_manager import (  # 시세 회선 배분
+    SubscriptionManager, PRIORITY_REGIME, PRIORITY_TRADED,
+)
+from core.vx_curve import VXCurve        # VX 월물 체인 + 고정 만기 커브
+
 # .env 파일 로드
 load_dotenv()
 
@@ -35,7 +87,9 @@ class IBKRBridge(QThread):
     Signals:
         connected(bool): 연결 상태 변경 시 발생
         account_update(dict): 계좌 정보 업데이트 시 발생
-        price_update(dict): 실시간 시세 업데이트 시 발생
+        price_batch(list): 배치 창(TICK_BATCH_MS)마다 갱신된 심볼 ID 목록 (quote_table 행)
+        vix_futures_update(dict): VIX 선물 가격 업데이트 시 발생
+        reconciled(dict): 재연결 후 {open_trades, positions} 대조 결과
         error(str): 에러 발생 시 발생
         log_message(str): 로그 메시지 발생 시 발생
     """
@@ -43,12 +97,35 @@ class IBKRBridge(QThread):
     # === PyQt Signals (GUI와 통신용) ===
     connected = pyqtSignal(bool)        # 연결 상태
     account_update = pyqtSignal(dict)   # 계좌 정보
-    price_update = pyqtSignal(dict)     # 실시간 시세 {symbol, bid, ask, last, volume}
+    price_batch = pyqtSignal(list)      # 실시간 시세 [symbol_id, ...] (값은 quote_table)
+    vix_futures_update = pyqtSignal(dict)  # VIX 선물 {front_month, back_month, curve, keys}
+    reconciled = pyqtSignal(dict)       # 재연결 후 {open_trades, positions}
     error = pyqtSignal(str)             # 에러 메시지
     log_message = pyqtSignal(str)       # 로그 메시지
     
-    def __init__(self, parent=None) -> None:
-        """브릿지 초기화"""
+    # === 시세 배치 설정 (.env에서 로드) ===
+    TICK_BATCH_MS = int(os.getenv("TICK_BATCH_MS", "50"))   # 시세 병합 창 (ms)
+    
+    # === 연결 감독 설정 ===
+    HEARTBEAT_S = float(os.getenv("IB_HEARTBEAT_S", "10"))                 # 하트비트 주기
+    HEARTBEAT_TIMEOUT_S = float(os.getenv("IB_HEARTBEAT_TIMEOUT_S", "5"))  # 응답 대기 한도
+    RECONNECT_MAX_S = float(os.getenv("IB_RECONNECT_MAX_S", "30"))         # 재연결 백오프 상한
+    
+    # === 요청 대기열 설정 ===
+    COMMAND_BATCH = int(os.getenv("IB_COMMAND_BATCH", "64"))  # 루프 1회전에 실행할 최대 명령 수
+    
+    def __init__(self, quote_table: Optional[QuoteTable] = None,
+                 contracts: Optional[ContractCache] = None,
+                 universe: Optional[List[str]] = None, parent=None) -> None:
+        """
+        브릿지 초기화
+        
+        Args:
+            quote_table: 시세를 기록할 QuoteTable (None이면 자체 생성)
+            contracts: 계약 캐시 (None이면 자체 생성, data/contracts.json)
+            universe: 연결 시 미리 확인할 심볼 (VX 근월/원월은 자동 추가)
+            parent: 부모 QObject
+        """
         super().__init__(parent)
         
         # --- IB 객체 ---
@@ -64,94 +141,272 @@ class IBKRBridge(QThread):
         self._is_running: bool = False
         self._is_connected: bool = False
         
+        # --- 브릿지 이벤트 루프 (run()에서 생성) ---
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._link_down: Optional[asyncio.Event] = None     # 현재 연결이 끊기면 set
+        
+        # --- 요청 대기열 [(명령, Future), ...] ---
+        self._commands: Deque[Tuple[IBCommand, Future]] = deque()
+        self._command_lock = threading.Lock()
+        self._drain_scheduled: bool = False
+        self._command_handlers: Dict[type, Callable[[Any], Any]] = {
+            PlaceOrder: self._place_order,
+            CancelOrder: lambda c: self.ib.cancelOrder(c.order),
+            Subscribe: lambda c: self._subscribe_market_data(list(c.symbols), c.outside_rth,
+                                                             c.priority),
+            Unsubscribe: lambda c: (self._unsubscribe_all() if c.symbol is None
+                                    else self._unsubscribe_market_data(c.symbol)),
+            HistoricalData: lambda c: self.ib.reqHistoricalDataAsync(
+                c.contract, c.end_datetime, c.duration, c.bar_size,
+                c.what_to_show, c.use_rth,
+            ),
+            OpenOrders: lambda c: self.ib.openOrders(),
+            Positions: lambda c: self.ib.positions(),
+        }
+        
+        # --- 계약 캐시 / 사전 확인 유니버스 ---
+        self.contracts: ContractCache = contracts if contracts is not None else ContractCache()
+        self.universe: List[str] = list(universe or [])
+        
         # --- 실시간 시세 구독 추적 ---
         self._subscribed_tickers: Dict[str, Ticker] = {}
+        self._ticker_callbacks: Dict[str, Callable[[Ticker], None]] = {}  # VX 선물 등 개별 콜백
         
-        # --- VIX 선물 데이터 ---
-        self._vix_futures: Dict[str, float] = {
-            "front_month": 0.0,
-            "back_month": 0.0,
-        }
+        # --- 시세 회선 배분 (한도 초과분은 스냅샷 순환) ---
+        self.subscriptions = SubscriptionManager()
+        
+        # --- 배치 시세 (티커 id → 심볼 ID, 병합 창 동안 바뀐 심볼 ID) ---
+        self.quote_table: QuoteTable = quote_table if quote_table is not None else QuoteTable()
+        self._quotes: Dict[int, int] = {}
+        self._snapshot_tickers: Dict[str, Ticker] = {}     # 직전 순환에서 요청한 스냅샷
+        self._dirty_quotes: Set[int] = set()
+        self._flush_scheduled: bool = False
+        
+        # --- VIX 선물 커브 (subscribe_vix_futures 이후 롤오버 감시) ---
+        self.vx_curve = VXCurve()
+        self._vx_enabled: bool = False
     
     def run(self) -> None:
         """
         스레드 메인 루프
         
         이 메서드는 start()를 호출하면 자동으로 실행됩니다.
-        연결을 시도하고, 연결되면 이벤트 루프를 유지합니다.
+        브릿지 전용 asyncio 루프를 만들고, 연결 후 종료 요청까지 루프를 유지합니다.
         """
         self._is_running = True
         self.log_message.emit("🔌 IBKR 연결 시도 중...")
         
+        # --- 브릿지 스레드 전용 이벤트 루프 ---
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        
         try:
-            # --- ib_insync용 이벤트 루프 시작 (필수!) ---
-            util.startLoop()
-            
-            # --- IB 객체 생성 ---
-            self.ib = IB()
-            
-            # --- 연결 시도 (최대 3회 재시도) ---
-            max_retries = 3
-            for attempt in range(1, max_retries + 1):
-                try:
-                    self.log_message.emit(f"📡 연결 시도 {attempt}/{max_retries}...")
-                    
-                    # 연결 (타임아웃 10초)
-                    self.ib.connect(
-                        host=self.host,
-                        port=self.port,
-                        clientId=self.client_id,
-                        timeout=10
-                    )
-                    
-                    # 연결 성공!
-                    self._is_connected = True
-                    self.connected.emit(True)
-                    self.log_message.emit(f"✅ IBKR 연결 성공! (포트: {self.port})")
-                    
-                    # --- 이벤트 콜백 등록 (폴링 대신 이벤트 기반!) ---
-                    self.ib.orderStatusEvent += self._on_order_status
-                    self.ib.execDetailsEvent += self._on_execution
-                    self.ib.accountValueEvent += self._on_account_value
-                    
-                    # 초기 계좌 정보 1회 조회
-                    self._fetch_account_info()
-                    
-                    break  # 재시도 루프 탈출
-                    
-                except Exception as e:
-                    self.log_message.emit(f"⚠️ 연결 실패: {str(e)}")
-                    
-                    if attempt < max_retries:
-                        # Exponential Backoff (1초, 2초, 4초)
-                        wait_time = 2 ** (attempt - 1)
-                        self.log_message.emit(f"⏳ {wait_time}초 후 재시도...")
-                        QThread.msleep(wait_time * 1000)  # time.sleep 대신!
-                    else:
-                        raise  # 마지막 시도도 실패하면 예외 발생
-            
-            # --- 이벤트 루프 유지 (폴링 없이!) ---
-            while self._is_running and self.ib.isConnected():
-                # IB 이벤트만 처리 (콜백이 자동 호출됨)
-                self.ib.sleep(0.1)
-                    
+            loop.run_until_complete(self._main())
         except Exception as e:
             self.error.emit(f"❌ 연결 오류: {str(e)}")
             self._is_connected = False
             self.connected.emit(False)
-        
         finally:
             # --- 정리 ---
             self._disconnect()
+            self._loop = None
+            self._fail_pending_commands()
+            self._shutdown_loop(loop)
     
-    def _fetch_account_info(self) -> None:
+    async def _main(self) -> None:
+        """연결 감독: 연결 → 끊김 감시 → 백오프 재연결 (종료 요청까지 반복)"""
+        self._stop_event = asyncio.Event()
+        
+        # --- IB 객체 생성 (재연결해도 같은 객체 사용) ---
+        self.ib = IB()
+        
+        # --- 이벤트 콜백 등록 (폴링 대신 이벤트 기반! 1회만) ---
+        self.ib.orderStatusEvent += self._on_order_status
+        self.ib.execDetailsEvent += self._on_execution
+        self.ib.positionEvent += self._on_position
+        self.ib.accountValueEvent += self._on_account_value
+        self.ib.pendingTickersEvent += self._on_pending_tickers
+        self.ib.disconnectedEvent += self._on_disconnected
+        
+        is_reconnect = False
+        while self._is_running:
+            if not await self._connect_with_backoff():
+                return  # 종료 요청
+            
+            self._link_down = asyncio.Event()
+            if not self.ib.isConnected():
+                continue  # 연결 직후 끊김
+            
+            # 유니버스 계약 확인 (캐시에 없는 것만 1회 왕복)
+            await self._qualify_universe()
+            
+            # 연결 성공!
+            self._is_connected = True
+            if is_reconnect:
+                self.log_message.emit(f"🔁 IBKR 재연결 성공! (포트: {self.port})")
+                await self._restore_session()
+            else:
+                self.log_message.emit(f"✅ IBKR 연결 성공! (포트: {self.port})")
+            self.connected.emit(True)
+            
+            # 계좌 정보 조회
+            await self._fetch_account_info()
+            
+            # --- 종료 요청 또는 끊김까지 대기 (폴링 없음, 하트비트만 주기 실행) ---
+            heartbeat = asyncio.ensure_future(self._heartbeat())
+            rotation = asyncio.ensure_future(self._snapshot_rotation())
+            vx_roll = asyncio.ensure_future(self._vx_roll_watch())
+            stop_wait = asyncio.ensure_future(self._stop_event.wait())
+            down_wait = asyncio.ensure_future(self._link_down.wait())
+            await asyncio.wait({stop_wait, down_wait}, return_when=asyncio.FIRST_COMPLETED)
+            for task in (heartbeat, rotation, vx_roll, stop_wait, down_wait):
+                task.cancel()
+            
+            if self._stop_event.is_set():
+                return
+            
+            # 끊김 → 재연결
+            self._is_connected = False
+            self.connected.emit(False)
+            self.log_message.emit("⚠️ IBKR 연결 끊김 → 재연결 시도")
+            is_reconnect = True
+    
+    async def _connect_with_backoff(self) -> bool:
+        """
+        연결될 때까지 지수 백오프 재시도 (1, 2, 4 ... 최대 RECONNECT_MAX_S초)
+        
+        Returns:
+            연결 성공 여부 (False면 종료 요청)
+        """
+        attempt = 0
+        while self._is_running:
+            attempt += 1
+            try:
+                self.log_message.emit(f"📡 연결 시도 {attempt}...")
+                
+                # 연결 (타임아웃 10초)
+                await self.ib.connectAsync(
+                    host=self.host,
+                    port=self.port,
+                    clientId=self.client_id,
+                    timeout=10
+                )
+                return True
+                
+            except Exception as e:
+                self.log_message.emit(f"⚠️ 연결 실패: {str(e)}")
+                
+                # Exponential Backoff - 루프를 막지 않고 대기 (종료 요청 시 즉시 깨어남)
+                wait_time = min(self.RECONNECT_MAX_S, 2 ** min(attempt - 1, 16))
+                self.log_message.emit(f"⏳ {wait_time:.0f}초 후 재시도...")
+                if await self._wait_stop(wait_time):
+                    return False
+        return False
+    
+    async def _wait_stop(self, timeout: float) -> bool:
+        """종료 요청을 최대 timeout초 대기 (요청되면 True)"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _heartbeat(self) -> None:
+        """주기적으로 서버 시각 요청 → 응답이 없으면 연결을 끊어 재연결 유도"""
+        while True:
+            await asyncio.sleep(self.HEARTBEAT_S)
+            try:
+                await asyncio.wait_for(self.ib.reqCurrentTimeAsync(), self.HEARTBEAT_TIMEOUT_S)
+            except Exception:
+                self.log_message.emit("💔 하트비트 응답 없음 → 연결 재설정")
+                self.ib.disconnect()
+                if self._link_down is not None:
+                    self._link_down.set()
+                return
+    
+    async def _qualify_universe(self) -> None:
+        """유니버스 계약을 일괄 확인 (캐시 적중은 왕복 없음, VX 선물은 커브 체인으로)"""
+        keys = list(self.universe)
+        try:
+            added = await self.contracts.qualify_async(self.ib, keys)
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 계약 확인 실패: {str(e)}")
+            return
+        
+        missing = [key for key in keys if not self.contracts.is_qualified(key)]
+        self.log_message.emit(
+            f"📇 계약 캐시: {len(keys) - len(missing)}/{len(keys)}개 확인 (신규 {added}개)"
+            + (f", 미확인: {', '.join(missing)}" if missing else "")
+        )
+    
+    def _on_disconnected(self) -> None:
+        """IB 연결 끊김 이벤트 (루프 스레드)"""
+        if self._link_down is not None:
+            self._link_down.set()
+    
+    async def _restore_session(self) -> None:
+        """재연결 후 구독 일괄 복원 + 미체결 주문/포지션 대조"""
+        # --- 1. 추적 중인 구독 일괄 재요청 (티커 객체가 새로 만들어짐) ---
+        previous = list(self._subscribed_tickers.items())
+        self._quotes.clear()
+        self._snapshot_tickers.clear()      # 끊김과 함께 끝난 요청
+        for key, old_ticker in previous:
+            try:
+                ticker = self.ib.reqMktData(old_ticker.contract, "", False, False, [])
+            except Exception as e:
+                self.log_message.emit(f"⚠️ {key} 재구독 실패: {str(e)}")
+                continue
+            
+            self._subscribed_tickers[key] = ticker
+            callback = self._ticker_callbacks.get(key)
+            if callback is not None:
+                if ticker is not old_ticker:
+                    ticker.updateEvent += callback
+            else:
+                self._quotes[id(ticker)] = self.quote_table.register(key)
+        
+        if previous:
+            self.log_message.emit(f"📡 구독 복원: {len(previous)}개")
+        
+        # --- 2. 주문/포지션 대조 (connectAsync가 동기화를 마친 상태) ---
+        open_trades = self.ib.openTrades()
+        positions = self.ib.positions()
+        
+        # 보유/미체결 종목은 시세 회선 최우선
+        traded = [item.contract.symbol for item in list(open_trades) + list(positions)
+                  if getattr(item.contract, "secType", "") == "STK"]
+        if traded:
+            self._subscribe_market_data(traded, True, PRIORITY_TRADED)
+        self.reconciled.emit({"open_trades": open_trades, "positions": positions})
+        self.log_message.emit(
+            f"🧾 재연결 대조: 미체결 주문 {len(open_trades)}건, 포지션 {len(positions)}건"
+        )
+    
+    @staticmethod
+    def _shutdown_loop(loop: asyncio.AbstractEventLoop) -> None:
+        """남은 작업 취소 후 루프 종료"""
+        try:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+    
+    async def _fetch_account_info(self) -> None:
         """계좌 정보 조회 및 GUI에 전달"""
         if not self.ib or not self.ib.isConnected():
             return
         
         try:
             # 계좌 요약 정보 요청
-            account_values = self.ib.accountSummary()
+            account_values = await self.ib.accountSummaryAsync()
             
             # 필요한 정보 추출
             info: Dict[str, Any] = {
@@ -172,6 +427,11 @@ class IBKRBridge(QThread):
         except Exception as e:
             self.log_message.emit(f"⚠️ 계좌 정보 조회 실패: {str(e)}")
     
+    def _refresh_account_info(self) -> None:
+        """계좌 정보 재조회 예약 (루프 스레드 콜백에서 호출)"""
+        if self._loop is not None:
+            self._loop.create_task(self._fetch_account_info())
+    
     # ============================================
     # 이벤트 콜백 (체결 시에만 호출됨)
     # ============================================
@@ -183,7 +443,32 @@ class IBKRBridge(QThread):
         
         if status in ("Filled", "PartiallyFilled"):
             # 체결되면 잔고 업데이트
-            self._fetch_account_info()
+            self._refresh_account_info()
+        elif status in ("Cancelled", "ApiCancelled", "Inactive"):
+            # 체결 없이 끝난 주문 → 보유도 없으면 거래 회선 반납
+            self._release_if_flat(trade.contract)
+    
+    def _on_position(self, position) -> None:
+        """포지션 변경 시 (청산으로 0이 되면 거래 회선 반납)"""
+        if position.position == 0:
+            self._release_if_flat(position.contract)
+    
+    def _release_if_flat(self, contract) -> None:
+        """보유/미체결 주문이 모두 없는 주식은 거래 우선순위 철회 후 회선 재배분 (루프 스레드)"""
+        if getattr(contract, "secType", "") != "STK":
+            return
+        
+        symbol = contract.symbol
+        if any(t.contract.symbol == symbol for t in self.ib.openTrades()):
+            return
+        if any(p.contract.symbol == symbol and p.position != 0 for p in self.ib.positions()):
+            return
+        
+        if self.subscriptions.withdraw(symbol, PRIORITY_TRADED):
+            self.log_message.emit(f"📤 {symbol} 보유 종료 → 거래 시세 회선 반납")
+            if self.subscriptions.priority(symbol) < 0:
+                self._stop_stream(symbol)   # 다른 요청도 없음 → 구독 해제
+            self._rebalance_lines()
     
     def _on_execution(self, trade, fill) -> None:
         """체결 발생 시"""
@@ -196,7 +481,7 @@ class IBKRBridge(QThread):
         self.log_message.emit(f"{emoji} 체결: {symbol} {qty}주 @ ${price:.2f}")
         
         # 체결 후 잔고 업데이트
-        self._fetch_account_info()
+        self._refresh_account_info()
     
     def _on_account_value(self, value) -> None:
         """계좌 값 변경 시 (NetLiquidation 등)"""
@@ -226,6 +511,14 @@ class IBKRBridge(QThread):
         self._is_running = False
         self.log_message.emit("⏹ 연결 중지 요청됨...")
         
+        # 루프의 종료 이벤트를 깨움 (폴링 없이 즉시 종료)
+        loop, stop_event = self._loop, self._stop_event
+        if loop is not None and stop_event is not None:
+            try:
+                loop.call_soon_threadsafe(stop_event.set)
+            except RuntimeError:
+                pass  # 이미 닫힌 루프
+        
         # 스레드 종료 대기 (최대 5초)
         self.wait(5000)
     
@@ -237,188 +530,425 @@ class IBKRBridge(QThread):
         """IB 객체 반환 (다른 모듈에서 사용)"""
         return self.ib if self._is_connected else None
     
+    # ============================================
+    # 루프 스레드 호출 (다른 스레드 → 브릿지 루프)
+    # ============================================
+    
+    def in_loop_thread(self) -> bool:
+        """현재 스레드가 브릿지 루프 스레드인지"""
+        return threading.get_ident() == self._loop_thread_id
+    
+    def run_coroutine(self, coro: Coroutine) -> Future:
+        """
+        코루틴을 브릿지 루프에서 실행
+        
+        Args:
+            coro: ib_insync 비동기 요청 등 (예: ib.reqHistoricalDataAsync(...))
+        
+        Returns:
+            concurrent.futures.Future (루프 스레드에서 result()로 기다리면 교착!)
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            coro.close()
+            future: Future = Future()
+            future.set_exception(RuntimeError("IBKR 이벤트 루프가 실행 중이 아님"))
+            return future
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+    
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        동기 함수를 브릿지 루프에서 실행 (루프 스레드면 바로 실행)
+        
+        Args:
+            fn: 실행할 함수 (예: self.ib.placeOrder)
+            *args, **kwargs: fn 인자
+        
+        Returns:
+            concurrent.futures.Future (fn 반환값 또는 예외)
+        """
+        if self.in_loop_thread():
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        
+        async def _invoke() -> Any:
+            return fn(*args, **kwargs)
+        
+        return self.run_coroutine(_invoke())
+    
+    # ============================================
+    # 요청 대기열 (타입 명령 → 루프에서 일괄 실행)
+    # ============================================
+    
+    def submit(self, command: IBCommand) -> Future:
+        """
+        IB 요청 제출 (어느 스레드에서든 호출, 기다리지 않음)
+        
+        Args:
+            command: core.ib_commands의 명령 (PlaceOrder, Subscribe, ...)
+        
+        Returns:
+            concurrent.futures.Future (명령별 결과 또는 예외)
+        """
+        future: Future = Future()
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            future.set_exception(RuntimeError("IBKR 이벤트 루프가 실행 중이 아님"))
+            return future
+        
+        with self._command_lock:
+            self._commands.append((command, future))
+            if self._drain_scheduled:
+                return future  # 이미 깨워둠 → 같은 배치로 실행
+            self._drain_scheduled = True
+        
+        try:
+            loop.call_soon_threadsafe(self._drain_commands)
+        except RuntimeError:
+            self._fail_pending_commands()  # 그 사이 루프가 닫힘
+        return future
+    
+    def _drain_commands(self) -> None:
+        """대기열에서 최대 COMMAND_BATCH개를 꺼내 실행 (루프 스레드)"""
+        with self._command_lock:
+            count = min(len(self._commands), self.COMMAND_BATCH)
+            batch = [self._commands.popleft() for _ in range(count)]
+            if self._commands:
+                # 남은 명령은 다음 회전에 (틱 콜백이 밀리지 않도록)
+                self._loop.call_soon(self._drain_commands)
+            else:
+                self._drain_scheduled = False
+        
+        for command, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue  # 호출자가 취소함
+            try:
+                if not self.ib or not self.ib.isConnected():
+                    raise ConnectionError("IBKR 연결 안됨")
+                result = self._command_handlers[type(command)](command)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            
+            if inspect.isawaitable(result):
+                # 비동기 명령 (과거 봉 등) → 완료 시 Future에 전달
+                task = asyncio.ensure_future(result)
+                task.add_done_callback(lambda t, f=future: self._resolve(f, t))
+            else:
+                future.set_result(result)
+    
+    def _place_order(self, command: PlaceOrder) -> Any:
+        """주문 전송 (미확인 계약이면 먼저 확인 후 캐시에 저장)"""
+        if command.contract.secType == "STK":
+            # 주문 종목은 시세 회선 최우선
+            self._subscribe_market_data([command.contract.symbol], True, PRIORITY_TRADED)
+        
+        if command.contract.conId:
+            return self.ib.placeOrder(command.contract, command.order)
+        return self._qualify_and_place(command)
+    
+    async def _qualify_and_place(self, command: PlaceOrder) -> Any:
+        """계약 확인 → 캐시 저장 → 주문 전송"""
+        await self.ib.qualifyContractsAsync(command.contract)
+        self.contracts.store(command.contract)
+        return self.ib.placeOrder(command.contract, command.order)
+    
+    @staticmethod
+    def _resolve(future: Future, task: "asyncio.Future") -> None:
+        """asyncio 작업 결과 → concurrent Future"""
+        if task.cancelled():
+            future.set_exception(RuntimeError("IB 요청이 취소됨"))
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+    
+    def _fail_pending_commands(self) -> None:
+        """루프 종료 시 남은 명령 실패 처리"""
+        with self._command_lock:
+            pending = list(self._commands)
+            self._commands.clear()
+            self._drain_scheduled = False
+        
+        for _, future in pending:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("IBKR 브릿지 종료됨"))
+    
     # ============================================
     # 실시간 시세 구독
     # ============================================
     
-    def subscribe_market_data(self, symbols: List[str], outside_rth: bool = True) -> None:
+    def subscribe_market_data(self, symbols: List[str], outside_rth: bool = True,
+                              priority: int = PRIORITY_REGIME) -> Future:
         """
-        실시간 시세 구독
+        실시간 시세 구독 (어느 스레드에서든 호출 가능, 브릿지 루프에서 실행)
+        
+        회선이 모자라면 우선순위가 낮은 심볼은 스냅샷 순환으로 갱신됩니다.
         
         Args:
             symbols: 구독할 심볼 리스트 (예: ["SPY", "QQQ", "VIX"])
             outside_rth: True면 Pre/After Market 시세도 수신 (기본값: True)
+            priority: PRIORITY_TRADED / PRIORITY_REGIME / PRIORITY_SCANNER
         """
+        return self.submit(Subscribe(tuple(symbols), outside_rth, priority))
+    
+    def _subscribe_market_data(self, symbols: List[str], outside_rth: bool = True,
+                               priority: int = PRIORITY_REGIME) -> None:
+        """실시간 시세 구독 요청 → 회선 재배분 (루프 스레드)"""
         if not self.ib or not self.ib.isConnected():
             self.log_message.emit("❌ 시세 구독 실패: IBKR 연결 안됨")
             return
         
-        for symbol in symbols:
-            if symbol in self._subscribed_tickers:
-                continue  # 이미 구독 중
+        self.subscriptions.request(symbols, priority)
+        self._rebalance_lines(outside_rth)
+    
+    def _streaming_symbols(self) -> List[str]:
+        """회선 관리 대상 스트리밍 심볼 (VX 선물 등 개별 콜백 구독 제외)"""
+        return [key for key in self._subscribed_tickers if key not in self._ticker_callbacks]
+    
+    def _rebalance_lines(self, outside_rth: bool = True) -> None:
+        """우선순위/LRU에 따라 스트리밍 심볼 조정 (루프 스레드)"""
+        streaming = self._streaming_symbols()
+        free_lines = self.subscriptions.MAX_LINES - len(self._ticker_callbacks)
+        capacity = self.subscriptions.streaming_capacity(free_lines)
+        to_add, to_drop = self.subscriptions.plan(streaming, capacity)
+        
+        # 먼저 끊어서 회선 확보
+        for symbol in to_drop:
+            self._stop_stream(symbol)
+        if to_drop:
+            self.log_message.emit(
+                f"📉 시세 회선 한도: {', '.join(to_drop)} → 스냅샷 순환으로 전환"
+            )
+        
+        for symbol in to_add:
+            self._start_stream(symbol, outside_rth)
+    
+    def _start_stream(self, symbol: str, outside_rth: bool = True) -> None:
+        """스트리밍 시세 1개 시작 (루프 스레드)"""
+        try:
+            # 캐시된 확인 계약 (VIX는 지수, 나머지는 SMART 주식)
+            contract = self.contracts.contract(symbol)
             
-            try:
-                # VIX는 인덱스
-                if symbol.upper() in ["VIX", "^VIX"]:
-                    from ib_insync import Index
-                    contract = Index("VIX", "CBOE")
-                else:
-                    contract = Stock(symbol, "SMART", "USD")
-                
-                # 시세 구독 요청 (outsideRth: Pre/After Market 지원)
-                # genericTickList "": 기본 틱, snapshot=False: 스트리밍
-                # regulatorySnapshot=False, mktDataOptions=[]
-                ticker = self.ib.reqMktData(
-                    contract, 
-                    "", 
-                    False,  # snapshot
-                    False,  # regulatorySnapshot
-                    []      # mktDataOptions
-                )
-                
-                # 콜백 등록
-                ticker.updateEvent += self._on_price_update
-                
-                self._subscribed_tickers[symbol] = ticker
-                
-                hours_mode = "Extended Hours" if outside_rth else "Regular Hours"
-                self.log_message.emit(f"📡 실시간 시세 구독: {symbol} ({hours_mode})")
-                
-            except Exception as e:
-                self.log_message.emit(f"⚠️ {symbol} 구독 실패: {str(e)}")
+            # 시세 구독 요청 (outsideRth: Pre/After Market 지원)
+            # genericTickList "": 기본 틱, snapshot=False: 스트리밍
+            # regulatorySnapshot=False, mktDataOptions=[]
+            ticker = self.ib.reqMktData(
+                contract, 
+                "", 
+                False,  # snapshot
+                False,  # regulatorySnapshot
+                []      # mktDataOptions
+            )
+            
+            # 배치 시세 슬롯 (pendingTickersEvent에서 갱신)
+            self._quotes[id(ticker)] = self.quote_table.register(symbol)
+            
+            self._subscribed_tickers[symbol] = ticker
+            
+            hours_mode = "Extended Hours" if outside_rth else "Regular Hours"
+            self.log_message.emit(f"📡 실시간 시세 구독: {symbol} ({hours_mode})")
+            
+        except Exception as e:
+            self.log_message.emit(f"⚠️ {symbol} 구독 실패: {str(e)}")
+    
+    def _stop_stream(self, symbol: str) -> None:
+        """스트리밍 시세 1개 중지 (요청은 유지, 루프 스레드)"""
+        ticker = self._subscribed_tickers.pop(symbol, None)
+        if ticker is None:
+            return
+        
+        self._quotes.pop(id(ticker), None)
+        self._ticker_callbacks.pop(symbol, None)
+        if self.ib and self.ib.isConnected():
+            self.ib.cancelMktData(ticker.contract)
     
-    def unsubscribe_market_data(self, symbol: str) -> None:
-        """실시간 시세 구독 해제"""
+    async def _snapshot_rotation(self) -> None:
+        """회선에서 밀린 심볼을 스냅샷으로 돌아가며 갱신"""
+        while True:
+            await asyncio.sleep(self.subscriptions.ROTATION_S)
+            
+            # 직전 배치 정리 (그 사이 스트리밍으로 올라간 심볼은 같은 티커 → 유지)
+            for symbol, ticker in self._snapshot_tickers.items():
+                if symbol not in self._subscribed_tickers:
+                    self._end_snapshot(ticker)
+            self._snapshot_tickers.clear()
+            
+            batch = self.subscriptions.next_snapshot_batch(self._streaming_symbols())
+            for symbol in batch:
+                try:
+                    ticker = self.ib.reqMktData(self.contracts.contract(symbol), "", True, False, [])
+                    self._quotes[id(ticker)] = self.quote_table.register(symbol)
+                    self._snapshot_tickers[symbol] = ticker
+                except Exception as e:
+                    self.log_message.emit(f"⚠️ {symbol} 스냅샷 실패: {str(e)}")
+    
+    def _end_snapshot(self, ticker: Ticker) -> None:
+        """스냅샷 1건 정리: 배치 시세 슬롯 삭제 + 응답 중이면 취소 (루프 스레드)"""
+        self._quotes.pop(id(ticker), None)
+        
+        wrapper = self.ib.wrapper
+        req_id = wrapper.ticker2ReqId["mktData"].get(ticker)
+        if req_id is None:
+            return
+        if req_id in wrapper._reqId2Contract and self.ib.isConnected():
+            self.ib.cancelMktData(ticker.contract)      # 아직 응답 중 → 서버 취소
+        else:
+            wrapper.endTicker(ticker, "mktData")        # 끝난 스냅샷 → 로컬 매핑만 정리
+    
+    def unsubscribe_market_data(self, symbol: str) -> Future:
+        """실시간 시세 구독 해제 (브릿지 루프에서 실행)"""
+        return self.submit(Unsubscribe(symbol))
+    
+    def _unsubscribe_market_data(self, symbol: str) -> None:
+        """실시간 시세 구독 해제 (루프 스레드, 빈 회선은 밀린 심볼에 배분)"""
+        self.subscriptions.release(symbol)
         if symbol not in self._subscribed_tickers:
             return
         
         try:
-            ticker = self._subscribed_tickers.pop(symbol)
-            if self.ib and self.ib.isConnected():
-                self.ib.cancelMktData(ticker.contract)
+            self._stop_stream(symbol)
             self.log_message.emit(f"📴 시세 구독 해제: {symbol}")
         except Exception as e:
             self.log_message.emit(f"⚠️ {symbol} 구독 해제 실패: {str(e)}")
+        
+        if self.ib and self.ib.isConnected():
+            self._rebalance_lines()
+    
+    def unsubscribe_all(self) -> Future:
+        """모든 시세 구독 해제 (브릿지 루프에서 실행)"""
+        return self.submit(Unsubscribe())
     
-    def unsubscribe_all(self) -> None:
-        """모든 시세 구독 해제"""
-        symbols = list(self._subscribed_tickers.keys())
-        for symbol in symbols:
-            self.unsubscribe_market_data(symbol)
+    def _unsubscribe_all(self) -> None:
+        """모든 시세 구독 해제 (루프 스레드)"""
+        for symbol in list(self._subscribed_tickers.keys()):
+            self._unsubscribe_market_data(symbol)
     
-    def _on_price_update(self, ticker: Ticker) -> None:
-        """실시간 시세 업데이트 콜백"""
+    def _on_pending_tickers(self, tickers: Set[Ticker]) -> None:
+        """
+        갱신된 티커 묶음 콜백 (ib_insync pendingTickersEvent)
+        
+        심볼별 QuoteTable 행을 제자리 갱신하고, 병합 창이 끝나면 1회 전송합니다.
+        """
         try:
-            symbol = ticker.contract.symbol
-            
-            data = {
-                "symbol": symbol,
-                "bid": ticker.bid if ticker.bid else 0.0,
-                "ask": ticker.ask if ticker.ask else 0.0,
-                "last": ticker.last if ticker.last else 0.0,
-                "volume": ticker.volume if ticker.volume else 0,
-                "high": ticker.high if ticker.high else 0.0,
-                "low": ticker.low if ticker.low else 0.0,
-                "close": ticker.close if ticker.close else 0.0,
-            }
+            table = self.quote_table
+            for ticker in tickers:
+                sid = self._quotes.get(id(ticker))
+                if sid is None:
+                    continue  # VIX 선물 등 별도 콜백으로 처리하는 티커
+                table.update(
+                    sid, ticker.bid, ticker.ask, ticker.last, ticker.lastSize,
+                    ticker.volume, ticker.time.timestamp() if ticker.time else 0.0,
+                )
+                self._dirty_quotes.add(sid)
             
-            self.price_update.emit(data)
+            if self._dirty_quotes and not self._flush_scheduled:
+                self._flush_scheduled = True
+                self._loop.call_later(
+                    self.TICK_BATCH_MS / 1000, self._flush_quotes
+                )
             
         except Exception:
             pass  # 에러 무시 (시세 업데이트가 너무 빈번함)
-
-
+    
+    def _flush_quotes(self) -> None:
+        """병합 창 동안 바뀐 심볼 ID를 한 번에 전송 (값은 quote_table에서 읽음)"""
+        self._flush_scheduled = False
+        if not self._dirty_quotes:
+            return
+        
+        batch = list(self._dirty_quotes)
+        self._dirty_quotes.clear()
+        self.price_batch.emit(batch)
+    
     # ============================================
-    # VIX 선물 구독
+    # VIX 선물 구독 (커브)
     # ============================================
     
-    def subscribe_vix_futures(self) -> None:
+    def subscribe_vix_futures(self) -> Future:
         """
-        VIX 선물 (VX) 구독
+        VIX 선물 (VX) 커브 구독 (브릿지 루프에서 실행)
         
-        근월물과 원월물을 자동으로 계산하여 구독합니다.
+        월물 체인을 1회 조회해 앞쪽 VX_CURVE_MONTHS개를 구독하고,
+        이후 근월물 만기일마다 자동으로 롤오버합니다.
         """
+        return self.run_coroutine(self._subscribe_vix_futures())
+    
+    async def _subscribe_vix_futures(self) -> None:
+        """VIX 선물 (VX) 커브 구독 (루프 스레드)"""
         if not self.ib or not self.ib.isConnected():
             self.log_message.emit("❌ VIX 선물 구독 실패: IBKR 연결 안됨")
             return
         
         try:
-            from datetime import datetime, timedelta
-            import calendar
-            
-            # 현재 날짜 기준 근월/원월 계산
-            now = datetime.now()
-            
-            # VX 선물은 매월 셋째 주 수요일 만기
-            def get_vx_expiry(year: int, month: int) -> datetime:
-                """VX 선물 만기일 계산 (셋째 주 수요일)"""
-                cal = calendar.Calendar()
-                wednesdays = [d for d in cal.itermonthdays2(year, month) 
-                              if d[0] != 0 and d[1] == 2]  # 수요일 = 2
-                if len(wednesdays) >= 3:
-                    third_wed = wednesdays[2][0]
-                    return datetime(year, month, third_wed)
-                return datetime(year, month, 15)  # fallback
-            
-            # 근월물 (이번 달 또는 다음 달)
-            front_month = now.month
-            front_year = now.year
-            front_expiry = get_vx_expiry(front_year, front_month)
-            
-            # 만기가 지났으면 다음 달로
-            if now > front_expiry:
-                front_month += 1
-                if front_month > 12:
-                    front_month = 1
-                    front_year += 1
-            
-            # 원월물 (근월물 + 2개월)
-            back_month = front_month + 2
-            back_year = front_year
-            if back_month > 12:
-                back_month -= 12
-                back_year += 1
-            
-            front_contract_month = f"{front_year}{front_month:02d}"
-            back_contract_month = f"{back_year}{back_month:02d}"
-            
-            # VX 선물 계약 생성
-            vx_front = Future("VX", exchange="CFE", 
-                              lastTradeDateOrContractMonth=front_contract_month)
-            vx_back = Future("VX", exchange="CFE", 
-                             lastTradeDateOrContractMonth=back_contract_month)
-            
-            # 시세 구독 (qualifyContracts 생략 - 블로킹 방지)
-            front_ticker = self.ib.reqMktData(vx_front, "", False, False, [])
-            back_ticker = self.ib.reqMktData(vx_back, "", False, False, [])
-            
-            # 콜백 등록 (last, bid, ask 순서로 확인)
-            def on_front_update(ticker):
-                price = ticker.last or ticker.bid or ticker.ask
-                if price and price > 0:
-                    self._vix_futures["front_month"] = price
-                    self.log_message.emit(f"📈 VX Front: {price:.2f}")
-            
-            def on_back_update(ticker):
-                price = ticker.last or ticker.bid or ticker.ask
-                if price and price > 0:
-                    self._vix_futures["back_month"] = price
-                    self.log_message.emit(f"📈 VX Back: {price:.2f}")
-            
-            front_ticker.updateEvent += on_front_update
-            back_ticker.updateEvent += on_back_update
-            
-            self._subscribed_tickers["VX_FRONT"] = front_ticker
-            self._subscribed_tickers["VX_BACK"] = back_ticker
-            
-            self.log_message.emit(f"📡 VIX 선물 구독: VX {front_contract_month} (근월), VX {back_contract_month} (원월)")
-            
+            if not self.vx_curve.has_chain():
+                await self._load_vx_chain()
+            self._vx_enabled = True
+            self._roll_vix_futures()
         except Exception as e:
             self.log_message.emit(f"⚠️ VIX 선물 구독 실패: {str(e)}")
     
-    def get_vix_futures(self) -> Dict[str, float]:
-        """VIX 선물 가격 반환"""
-        return self._vix_futures
+    async def _load_vx_chain(self) -> None:
+        """VX 월물 체인 조회 (reqContractDetails 1회)"""
+        count = await self.vx_curve.load_chain_async(self.ib)
+        self.log_message.emit(f"📇 VX 월물 체인: {count}개")
+    
+    def _roll_vix_futures(self) -> None:
+        """구독 월물을 커브에 맞춤: 만기 월물 해지 + 다음 월물 구독 (루프 스레드)"""
+        added, removed = self.vx_curve.roll()
+        
+        for key in removed:
+            self._stop_stream(key)
+        
+        for contract in added:
+            key = contract_key(contract)
+            ticker = self.ib.reqMktData(contract, "", False, False, [])
+            callback = self._make_vx_callback(key)
+            ticker.updateEvent += callback
+            
+            # 재연결 시 새 티커에 다시 연결할 콜백
+            self._ticker_callbacks[key] = callback
+            self._subscribed_tickers[key] = ticker
+        
+        if removed:
+            self.log_message.emit(
+                f"🔄 VX 롤오버: {', '.join(removed)} 해지 → "
+                f"{', '.join(contract_key(c) for c in added)} 구독"
+            )
+        elif added:
+            self.log_message.emit(f"📡 VIX 선물 구독: {', '.join(self.vx_curve.keys)}")
+    
+    def _make_vx_callback(self, key: str) -> Callable[[Ticker], None]:
+        """월물 티커 콜백 (커브 갱신 → 스냅샷 전송)"""
+        def on_update(ticker: Ticker) -> None:
+            # last, bid, ask 순서로 확인
+            price = ticker.last or ticker.bid or ticker.ask
+            if price and price > 0 and self.vx_curve.update(key, price):
+                self.vix_futures_update.emit(self.vx_curve.snapshot())
+        return on_update
+    
+    async def _vx_roll_watch(self) -> None:
+        """근월물 만기일 0시에 롤오버 (체인이 모자라면 재조회)"""
+        while True:
+            # 장기 대기 중 시계 변화에 대비해 최대 1시간 단위로 재확인
+            await asyncio.sleep(min(self.vx_curve.seconds_to_roll(), 3600))
+            if not self._vx_enabled or self.vx_curve.seconds_to_roll() > 0:
+                continue
+            try:
+                if not self.vx_curve.has_chain():
+                    await self._load_vx_chain()
+                self._roll_vix_futures()
+            except Exception as e:
+                self.log_message.emit(f"⚠️ VX 롤오버 실패: {str(e)}")
+                await asyncio.sleep(60)
+    
+    def get_vix_futures(self) -> Dict[str, Any]:
+        """VIX 선물 커브 스냅샷 (복사본, 루프 스레드가 계속 갱신하므로)"""
+        return self.vx_curve.snapshot()
 
 # ============================================
 # 단위 테스트
@@ -0,0 +1,204 @@
+"""
+============================================
+컬럼형 아카이브 - 메모리 맵 바이너리 가격 저장소
+============================================
+- 심볼/봉 길이별 디렉터리 하나, 컬럼별 고정 dtype 바이너리 파일
+  (data/archive/<timeframe>/<symbol>/{ts,open,...}.bin + header.json)
+- 추가 전용 (append-only): 마지막 ts 이후 행만 뒤에 붙임
+- 조회는 np.memmap + searchsorted 슬라이스 (복사/파싱 없음)
+- header.json의 행 수가 기준 → 기록 중 중단돼도 읽기는 안전
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import quote
+
+import numpy as np
+
+# 기본 아카이브 경로
+ARCHIVE_DIR = Path(__file__).parent.parent / "data" / "archive"
+
+# 아카이브 포맷 버전
+ARCHIVE_VERSION = 1
+
+# 컬럼 dtype (ts: 일봉은 epoch-day, 장중 봉은 epoch 초)
+ARCHIVE_COLUMNS: Dict[str, str] = {
+    "ts": "<i8",
+    "open": "<f8",
+    "high": "<f8",
+    "low": "<f8",
+    "close": "<f8",
+    "volume": "<i8",
+}
+
+
+class ColumnarArchive:
+    """
+    메모리 맵 컬럼형 가격 아카이브
+    
+    사용법:
+        archive = ColumnarArchive()
+        archive.append("SPY", "1m", {"ts": ..., "open": ..., ...})
+        bars = archive.read("SPY", "1m", start=ts0)   # np.memmap 뷰
+    """
+    
+    HEADER_FILE = "header.json"
+    
+    def __init__(self, root: Path = ARCHIVE_DIR) -> None:
+        """
+        초기화
+        
+        Args:
+            root: 아카이브 루트 디렉터리
+        """
+        self.root = Path(root)
+        self._lock = threading.Lock()     # 기록 직렬화
+    
+    # ============================================
+    # 경로/헤더
+    # ============================================
+    
+    def _series_dir(self, symbol: str, timeframe: str) -> Path:
+        """심볼 디렉터리 ("^VIX" 같은 특수문자는 URL 인코딩)"""
+        return self.root / timeframe / quote(symbol, safe="")
+    
+    def read_header(self, symbol: str, timeframe: str) -> Optional[dict]:
+        """
+        헤더 조회
+        
+        Returns:
+            {"version", "symbol", "timeframe", "columns", "rows", "first_ts", "last_ts"}
+            또는 None (아카이브 없음)
+        """
+        path = self._series_dir(symbol, timeframe) / self.HEADER_FILE
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    
+    def _write_header(self, series_dir: Path, header: dict) -> None:
+        """헤더 원자적 교체 (임시 파일 → rename)"""
+        tmp = series_dir / (self.HEADER_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(header, f, indent=2)
+        os.replace(tmp, series_dir / self.HEADER_FILE)
+    
+    # ============================================
+    # 기록 (추가 전용)
+    # ============================================
+    
+    def append(self, symbol: str, timeframe: str, bars: Dict[str, np.ndarray]) -> int:
+        """
+        봉 추가 (마지막 ts 이후 행만)
+        
+        Args:
+            symbol: 심볼
+            timeframe: 봉 이름 ("1d", "1m", ...)
+            bars: ARCHIVE_COLUMNS 키를 가진 배열 (ts 오름차순)
+        
+        Returns:
+            추가된 행 수
+        """
+        with self._lock:
+            series_dir = self._series_dir(symbol, timeframe)
+            header = self.read_header(symbol, timeframe)
+            rows = header["rows"] if header else 0
+            last_ts = header["last_ts"] if header else None
+            
+            ts = np.asarray(bars["ts"], dtype=ARCHIVE_COLUMNS["ts"])
+            start = 0 if last_ts is None else int(np.searchsorted(ts, last_ts, side="right"))
+            if start >= len(ts):
+                return 0
+            
+            series_dir.mkdir(parents=True, exist_ok=True)
+            for col, dtype in ARCHIVE_COLUMNS.items():
+                path = series_dir / f"{col}.bin"
+                data = np.ascontiguousarray(np.asarray(bars[col])[start:], dtype=dtype)
+                with open(path, "ab") as f:
+                    # 이전 기록이 중단돼 남은 꼬리 바이트 제거
+                    f.truncate(rows * np.dtype(dtype).itemsize)
+                    f.write(data.tobytes())
+            
+            added = len(ts) - start
+            self._write_header(series_dir, {
+                "version": ARCHIVE_VERSION,
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "columns": ARCHIVE_COLUMNS,
+                "rows": rows + added,
+                "first_ts": int(ts[start]) if header is None else header["first_ts"],
+                "last_ts": int(ts[-1]),
+            })
+            return added
+    
+    # ============================================
+    # 조회 (메모리 맵)
+    # ============================================
+    
+    def read(self, symbol: str, timeframe: str, start: Optional[int] = None,
+             end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        봉 조회 (np.memmap 슬라이스, 복사 없음)
+        
+        Args:
+            symbol: 심볼
+            timeframe: 봉 이름
+            start: 이 ts 이상 (None이면 처음부터)
+            end: 이 ts 미만 (None이면 끝까지)
+        
+        Returns:
+            ARCHIVE_COLUMNS 키 → 읽기 전용 배열 (아카이브 없으면 빈 배열)
+        """
+        header = self.read_header(symbol, timeframe)
+        if header is None or header["rows"] == 0:
+            return {col: np.empty(0, dtype=dtype) for col, dtype in ARCHIVE_COLUMNS.items()}
+        
+        series_dir = self._series_dir(symbol, timeframe)
+        rows = header["rows"]
+        columns = {
+            col: np.memmap(series_dir / f"{col}.bin", dtype=dtype, mode="r", shape=(rows,))
+            for col, dtype in header["columns"].items()
+        }
+        
+        ts = columns["ts"]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = rows if end is None else int(np.searchsorted(ts, end, side="left"))
+        return {col: arr[lo:hi] for col, arr in columns.items()}
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = ColumnarArchive(Path(tmp))
+        
+        n = 1000
+        ts = np.arange(n, dtype=np.int64) * 60 + 1_700_000_000
+        bars = {
+            "ts": ts,
+            "open": np.linspace(400, 410, n),
+            "high": np.linspace(401, 411, n),
+            "low": np.linspace(399, 409, n),
+            "close": np.linspace(400.5, 410.5, n),
+            "volume": np.full(n, 1000, dtype=np.int64),
+        }
+        
+        print(f"첫 추가: {archive.append('^VIX', '1m', bars)}행 ({n} 예상)")
+        print(f"중복 추가: {archive.append('^VIX', '1m', bars)}행 (0 예상)")
+        
+        more = {col: arr + (n * 60 if col == "ts" else 0) for col, arr in bars.items()}
+        print(f"이어서 추가: {archive.append('^VIX', '1m', more)}행 ({n} 예상)")
+        
+        view = archive.read("^VIX", "1m", start=int(ts[10]), end=int(ts[20]))
+        print(f"구간 조회: {len(view['close'])}행 (10 예상), memmap: {isinstance(view['close'], np.memmap)}")
+        print(f"헤더: {archive.read_header('^VIX', '1m')['rows']}행 ({2 * n} 예상)")
@@ -0,0 +1,229 @@
+"""
+============================================
+계약 캐시 - 사전 확인(qualify)된 IB 계약 + conId 디스크 저장
+============================================
+- 키: 주식/ETF "SPY", 지수 "VIX", VX 선물 "VX:YYYYMM"
+- 시작 시 유니버스 전체를 qualifyContractsAsync 1회로 일괄 확인
+- 확인된 계약(conId 포함)은 data/contracts.json에 저장
+  → 재시작 시 디스크에서 바로 로드, 빠진 키만 서버 왕복
+- 주문/구독은 매번 새 계약을 만들지 않고 캐시된 계약 사용
+- 만기 지난 선물은 로드 시 버림
+- VX 월물 체인/롤오버는 core/vx_curve.py (reqContractDetails)
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from ib_insync import Contract, Future, Index, Stock, util
+
+# 기본 저장 경로
+CONTRACTS_PATH = Path(__file__).parent.parent / "data" / "contracts.json"
+
+# 캐시 포맷 버전
+CACHE_VERSION = 1
+
+# 지수로 취급할 심볼
+INDEX_SYMBOLS = {"VIX": ("VIX", "CBOE"), "^VIX": ("VIX", "CBOE")}
+
+
+def make_contract(key: str) -> Contract:
+    """키 → 미확인 계약 (conId 없음)"""
+    if key.upper() in INDEX_SYMBOLS:
+        symbol, exchange = INDEX_SYMBOLS[key.upper()]
+        return Index(symbol, exchange)
+    if ":" in key:
+        symbol, month = key.split(":", 1)
+        return Future(symbol, exchange="CFE", lastTradeDateOrContractMonth=month)
+    return Stock(key, "SMART", "USD")
+
+
+def contract_key(contract: Contract) -> str:
+    """계약 → 캐시 키"""
+    if contract.secType == "FUT":
+        return f"{contract.symbol}:{contract.lastTradeDateOrContractMonth[:6]}"
+    return contract.symbol
+
+
+class ContractCache:
+    """
+    확인된 계약 캐시
+    
+    사용법:
+        cache = ContractCache()
+        await cache.qualify_async(ib, ["SPY", "TQQQ", "VX:202611"])   # 연결 직후 1회
+        contract = cache.contract("SPY")    # conId가 채워진 계약 (없으면 미확인 계약)
+    
+    반환되는 계약 객체는 공유 객체이므로 수정하지 마세요.
+    """
+    
+    def __init__(self, path: Path = CONTRACTS_PATH) -> None:
+        """
+        초기화 (디스크 캐시 로드)
+        
+        Args:
+            path: JSON 저장 경로
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._contracts: Dict[str, Contract] = {}
+        self.load()
+    
+    # ============================================
+    # 조회
+    # ============================================
+    
+    def contract(self, key: str) -> Contract:
+        """
+        계약 조회
+        
+        Args:
+            key: "SPY", "VIX", "VX:202611" 등
+        
+        Returns:
+            캐시된 확인 계약 (없으면 새 미확인 계약)
+        """
+        cached = self._contracts.get(key)
+        return cached if cached is not None else make_contract(key)
+    
+    def is_qualified(self, key: str) -> bool:
+        """확인된 계약 보유 여부"""
+        return key in self._contracts
+    
+    def keys(self) -> List[str]:
+        """캐시된 키 목록"""
+        return list(self._contracts)
+    
+    # ============================================
+    # 확인 (브릿지 루프에서 await)
+    # ============================================
+    
+    async def qualify_async(self, ib, keys: Iterable[str]) -> int:
+        """
+        캐시에 없는 키만 모아 qualifyContractsAsync 1회로 확인
+        
+        Args:
+            ib: 연결된 IB 객체
+            keys: 확인할 키 목록
+        
+        Returns:
+            새로 확인된 계약 수
+        """
+        missing = [key for key in dict.fromkeys(keys) if key not in self._contracts]
+        if not missing:
+            return 0
+        
+        contracts = [make_contract(key) for key in missing]
+        await ib.qualifyContractsAsync(*contracts)
+        
+        added = 0
+        with self._lock:
+            for key, contract in zip(missing, contracts):
+                if contract.conId:   # 확인 실패(모호/없음) 계약은 conId가 0
+                    self._contracts[key] = contract
+                    added += 1
+        
+        if added:
+            self.save()
+        return added
+    
+    def store(self, contract: Contract) -> None:
+        """외부에서 확인된 계약 추가 (conId 필수)"""
+        if not contract.conId:
+            return
+        with self._lock:
+            self._contracts[contract_key(contract)] = contract
+        self.save()
+    
+    # ============================================
+    # 디스크 저장/로드
+    # ============================================
+    
+    def load(self) -> None:
+        """디스크 캐시 로드 (만기 지난 선물 제외)"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        if data.get("version") != CACHE_VERSION:
+            return
+        
+        this_month = datetime.now().strftime("%Y%m")
+        contracts: Dict[str, Contract] = {}
+        for key, fields in data.get("contracts", {}).items():
+            try:
+                contract = Contract.create(**fields)
+            except TypeError:
+                continue
+            if contract.secType == "FUT" and \
+                    contract.lastTradeDateOrContractMonth[:6] < this_month:
+                continue
+            if contract.conId:
+                contracts[key] = contract
+        
+        with self._lock:
+            self._contracts.update(contracts)
+    
+    def save(self) -> None:
+        """디스크 저장 (임시 파일 → rename)"""
+        with self._lock:
+            payload = {
+                "version": CACHE_VERSION,
+                "updated": datetime.now().isoformat(timespec="seconds"),
+                "contracts": {
+                    key: util.dataclassNonDefaults(contract)
+                    for key, contract in sorted(self._contracts.items())
+                },
+            }
+        
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # 디스크 저장 실패는 무시 (메모리 캐시는 유지)
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import asyncio
+    import tempfile
+    
+    class FakeIB:
+        """qualifyContractsAsync만 흉내 (conId 부여)"""
+        calls = 0
+        
+        async def qualifyContractsAsync(self, *contracts):
+            FakeIB.calls += 1
+            for i, contract in enumerate(contracts, start=1):
+                if contract.symbol != "AMBIGUOUS":
+                    contract.conId = 1000 + i
+            return contracts
+    
+    keys = ["SPY", "TQQQ", "VIX", "VX:209912", "VX:210001", "AMBIGUOUS"]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "contracts.json"
+        cache = ContractCache(path)
+        added = asyncio.run(cache.qualify_async(FakeIB(), keys))
+        print(f"일괄 확인: {added}개 (5 예상), 서버 왕복: {FakeIB.calls}회 (1 예상)")
+        print(f"SPY: {cache.contract('SPY')}")
+        
+        # 재시작 → 디스크에서 로드, 모호한 심볼만 다시 요청
+        restarted = ContractCache(path)
+        asyncio.run(restarted.qualify_async(FakeIB(), keys))
+        print(f"재시작 후 캐시: {len(restarted.keys())}개, 서버 왕복 누적: {FakeIB.calls}회 (2 예상)")
+        print(f"VIX 계약 타입: {type(restarted.contract('VIX')).__name__} (Index 예상)")
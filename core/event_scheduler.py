@@ -0,0 +1,142 @@
+"""
+============================================
+이벤트 스케줄러 - 더티 플래그 + 병합 재평가
+============================================
+- 틱/VIX 선물 갱신이 들어오면 해당 입력을 "더티"로 표시
+- 짧은 시간에 몰린 이벤트는 1회 재평가로 병합
+- 재평가 간 최소 간격 보장 (설정값)
+- 입력이 없을 때는 하트비트로만 깨어남 (시간 기반 로직용)
+- 재평가 시 바뀐 입력 목록을 함께 전달 → 필요한 단계만 재계산
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import os
+import time
+from typing import Set
+
+from dotenv import load_dotenv
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+# .env 파일 로드
+load_dotenv()
+
+
+class EventScheduler(QObject):
+    """
+    병합 재평가 스케줄러
+    
+    사용법:
+        scheduler = EventScheduler()
+        scheduler.evaluate.connect(on_evaluate)    # on_evaluate(dirty: set)
+        scheduler.start()
+        scheduler.mark_dirty("SPY")                # 틱 도착 시
+    
+    Signals:
+        evaluate(set): 재평가 요청 (바뀐 입력 이름 집합)
+    """
+    
+    # === PyQt Signals ===
+    evaluate = pyqtSignal(object)       # 바뀐 입력 집합
+    
+    # === 하트비트 입력 이름 ===
+    HEARTBEAT = "heartbeat"
+    
+    # === 설정값 (.env에서 로드) ===
+    MIN_INTERVAL_MS = int(os.getenv("EVAL_MIN_INTERVAL_MS", "50"))     # 재평가 최소 간격
+    HEARTBEAT_MS = int(os.getenv("EVAL_HEARTBEAT_MS", "10000"))        # 입력 없을 때 재평가 주기
+    
+    def __init__(self, parent=None) -> None:
+        """초기화"""
+        super().__init__(parent)
+        self._dirty: Set[str] = set()
+        self._is_running = False
+        self._last_run = 0.0     # 마지막 재평가 (monotonic 초)
+        
+        # --- 병합 타이머 (단발) ---
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._fire)
+        
+        # --- 하트비트 타이머 ---
+        self._heartbeat = QTimer(self)
+        self._heartbeat.timeout.connect(lambda: self.mark_dirty(self.HEARTBEAT))
+    
+    # ============================================
+    # 시작/중지
+    # ============================================
+    
+    def start(self) -> None:
+        """스케줄러 시작 (첫 재평가는 모든 단계 실행)"""
+        self._is_running = True
+        self._heartbeat.start(self.HEARTBEAT_MS)
+        self.mark_dirty(self.HEARTBEAT)
+    
+    def stop(self) -> None:
+        """스케줄러 중지"""
+        self._is_running = False
+        self._timer.stop()
+        self._heartbeat.stop()
+        self._dirty.clear()
+    
+    def is_running(self) -> bool:
+        """실행 중 여부"""
+        return self._is_running
+    
+    # ============================================
+    # 더티 표시 / 재평가
+    # ============================================
+    
+    def mark_dirty(self, *inputs: str) -> None:
+        """
+        입력 변경 표시 (재평가 예약)
+        
+        Args:
+            *inputs: 바뀐 입력 이름 (예: "SPY", "VIX", "VIX_FUTURES")
+        """
+        if not self._is_running:
+            return
+        
+        self._dirty.update(inputs)
+        if self._timer.isActive():
+            return  # 이미 예약됨 → 병합
+        
+        elapsed_ms = (time.monotonic() - self._last_run) * 1000
+        delay_ms = max(0, int(self.MIN_INTERVAL_MS - elapsed_ms))
+        self._timer.start(delay_ms)
+    
+    def _fire(self) -> None:
+        """예약된 재평가 실행"""
+        if not self._is_running or not self._dirty:
+            return
+        
+        dirty, self._dirty = self._dirty, set()
+        self._last_run = time.monotonic()
+        self.evaluate.emit(dirty)
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import sys
+    from PyQt6.QtCore import QCoreApplication
+    
+    app = QCoreApplication(sys.argv)
+    
+    scheduler = EventScheduler()
+    runs = []
+    scheduler.evaluate.connect(lambda dirty: runs.append(sorted(dirty)))
+    scheduler.start()
+    
+    # 틱 100개가 한꺼번에 들어와도 재평가는 병합됨
+    for i in range(100):
+        scheduler.mark_dirty("SPY" if i % 2 else "VIX")
+    
+    QTimer.singleShot(300, app.quit)
+    app.exec()
+    
+    print(f"재평가 횟수: {len(runs)} (1~2 예상)")
+    print(f"바뀐 입력: {runs}")
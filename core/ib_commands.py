@@ -0,0 +1,73 @@
+"""
+============================================
+IB 요청 명령 - 브릿지 루프로 넘기는 타입 요청
+============================================
+- 다른 스레드(메인/엔진)는 IB 객체를 직접 만지지 않고
+  명령 객체를 IBKRBridge.submit()으로 보냄 → concurrent Future 반환
+- 브릿지 루프 스레드가 대기열을 한 번에 꺼내 일괄 실행
+- 명령은 불변 (frozen dataclass) → 스레드 간 전달 안전
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+from dataclasses import dataclass
+from typing import Tuple, Union
+
+from ib_insync import Contract, Order
+
+from core.subscription_manager import PRIORITY_REGIME
+
+
+@dataclass(frozen=True)
+class PlaceOrder:
+    """주문 전송 → 결과: Trade"""
+    contract: Contract
+    order: Order
+
+
+@dataclass(frozen=True)
+class CancelOrder:
+    """주문 취소 → 결과: Trade (또는 None)"""
+    order: Order
+
+
+@dataclass(frozen=True)
+class Subscribe:
+    """실시간 시세 구독 (회선 한도 안에서 우선순위 배분) → 결과: None"""
+    symbols: Tuple[str, ...]
+    outside_rth: bool = True
+    priority: int = PRIORITY_REGIME
+
+
+@dataclass(frozen=True)
+class Unsubscribe:
+    """실시간 시세 구독 해제 (symbol=None이면 전체) → 결과: None"""
+    symbol: Union[str, None] = None
+
+
+@dataclass(frozen=True)
+class HistoricalData:
+    """과거 봉 요청 (비동기) → 결과: BarDataList"""
+    contract: Contract
+    duration: str = "1 D"
+    bar_size: str = "1 min"
+    what_to_show: str = "TRADES"
+    use_rth: bool = True
+    end_datetime: str = ""
+
+
+@dataclass(frozen=True)
+class OpenOrders:
+    """미체결 주문 조회 → 결과: List[Order]"""
+
+
+@dataclass(frozen=True)
+class Positions:
+    """보유 포지션 조회 → 결과: List[Position]"""
+
+
+# 브릿지가 처리하는 명령 타입
+IBCommand = Union[PlaceOrder, CancelOrder, Subscribe, Unsubscribe,
+                  HistoricalData, OpenOrders, Positions]
@@ -0,0 +1,218 @@
+"""
+============================================
+지표 파이프라인 - 봉별 메모이즈 + 의존성 그래프
+============================================
+- 키: (심볼, 지표, 파라미터, 마지막 봉 날짜)
+  → 같은 봉에서는 몇 번을 불러도 1회만 계산 (이후 O(1) 조회)
+- 지표 간 의존성은 DAG로 해석 (TR → ATR)
+  → 공통 입력은 한 번만 계산되어 여러 지표가 공유
+- 계산은 core/indicators.py 순수 함수 (전략/리스크 모듈과 같은 구현)
+- 일봉이 바뀌면 MarketDataManager가 심볼 단위로 무효화
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from core.indicators import sma, true_range, vwap_bands
+
+
+def _no_deps(*_params) -> Tuple:
+    """의존 지표 없음"""
+    return ()
+
+
+@dataclass(frozen=True)
+class IndicatorNode:
+    """
+    지표 정의 (DAG 노드)
+    
+    lookback(*params): 필요한 최근 봉 수 (0이면 봉을 읽지 않음)
+    compute(bars, inputs, *params): 값 계산 (inputs = deps 결과, 같은 순서)
+    deps(*params): 의존 지표 ((이름, 파라미터), ...)
+    """
+    lookback: Callable[..., int]
+    compute: Callable[..., Any]
+    deps: Callable[..., Tuple[Tuple[str, tuple], ...]] = _no_deps
+
+
+def _atr(_bars, inputs, period: int) -> float:
+    """TR 평균 (봉이 모자라면 NaN)"""
+    tr = inputs[0]
+    return float(tr.mean()) if len(tr) >= period else math.nan
+
+
+# 등록된 지표 (파라미터는 위치 인자)
+INDICATORS: Dict[str, IndicatorNode] = {
+    # True Range (최근 period개, 첫 값도 전일 종가 사용)
+    "tr": IndicatorNode(
+        lookback=lambda period: period + 1,
+        compute=lambda bars, _inputs, period: true_range(bars["high"], bars["low"], bars["close"])[-period:],
+    ),
+    # ATR = TR 단순평균
+    "atr": IndicatorNode(
+        lookback=lambda period: 0,
+        compute=_atr,
+        deps=lambda period: (("tr", (period,)),),
+    ),
+    # 종가 이동평균
+    "sma": IndicatorNode(
+        lookback=lambda period: period,
+        compute=lambda bars, _inputs, period: sma(bars["close"], period),
+    ),
+    # 종가/거래량 VWAP 밴드
+    "vwap_bands": IndicatorNode(
+        lookback=lambda period, multiplier: period,
+        compute=lambda bars, _inputs, period, multiplier: vwap_bands(
+            bars["close"], bars["volume"], multiplier),
+    ),
+}
+
+
+class IndicatorPipeline:
+    """
+    봉별 메모이즈 지표 계산기
+    
+    사용법:
+        pipeline = IndicatorPipeline(market_data.get_price_arrays)
+        pipeline.get("SPY", "atr", 20)          # 새 봉이면 TR → ATR 계산, 아니면 캐시
+        pipeline.get("SPY", "sma", 20)
+        pipeline.invalidate("SPY")              # 일봉 DB 갱신 후
+    """
+    
+    def __init__(self, source: Callable[[str, int], Dict[str, np.ndarray]],
+                 indicators: Optional[Dict[str, IndicatorNode]] = None) -> None:
+        """
+        초기화
+        
+        Args:
+            source: (심볼, 봉 수) → {"date", "open", "high", "low", "close", "volume"} 배열 뷰
+            indicators: 지표 정의 (기본 INDICATORS)
+        """
+        self._source = source
+        self._indicators = indicators if indicators is not None else INDICATORS
+        self._lock = threading.RLock()
+        
+        # (심볼, 지표, 파라미터) → (계산한 봉 날짜, 값) - 조합마다 최신 봉 1개만 보관
+        self._memo: Dict[Tuple[str, str, tuple], Tuple[Any, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    # ============================================
+    # 조회
+    # ============================================
+    
+    def get(self, symbol: str, name: str, *params) -> Any:
+        """
+        지표 값 (마지막 봉 기준)
+        
+        Args:
+            symbol: 심볼
+            name: INDICATORS 이름
+            *params: 지표 파라미터 (예: 기간)
+        
+        Returns:
+            지표 값 (봉이 없거나 모자라면 NaN 등 지표별 빈 값)
+        """
+        with self._lock:
+            bar_ts = self._bar_ts(symbol)
+            return self._resolve(symbol, name, tuple(params), bar_ts)
+    
+    def _bar_ts(self, symbol: str) -> Any:
+        """마지막 봉 날짜 (봉이 없으면 None)"""
+        dates = self._source(symbol, 1)["date"]
+        return dates[-1] if len(dates) else None
+    
+    def _resolve(self, symbol: str, name: str, params: tuple, bar_ts: Any) -> Any:
+        """메모 조회 → 없으면 의존 지표부터 계산 (락 안에서 호출)"""
+        key = (symbol, name, params)
+        cached = self._memo.get(key)
+        if cached is not None and cached[0] == bar_ts:
+            self.hits += 1
+            return cached[1]
+        
+        self.misses += 1
+        node = self._indicators[name]
+        inputs = [self._resolve(symbol, dep, dep_params, bar_ts)
+                  for dep, dep_params in node.deps(*params)]
+        lookback = node.lookback(*params)
+        bars = self._source(symbol, lookback) if lookback > 0 else None
+        
+        value = node.compute(bars, inputs, *params)
+        self._memo[key] = (bar_ts, value)
+        return value
+    
+    # ============================================
+    # 무효화
+    # ============================================
+    
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """
+        메모 삭제 (같은 날짜 봉 값이 바뀐 경우 등)
+        
+        Args:
+            symbol: 심볼 (None이면 전체)
+        """
+        with self._lock:
+            if symbol is None:
+                self._memo.clear()
+            else:
+                for key in [k for k in self._memo if k[0] == symbol]:
+                    del self._memo[key]
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import time
+    
+    from core.price_cache import PriceCache
+    
+    rng = np.random.default_rng(7)
+    n = 300
+    close = 400 + rng.standard_normal(n).cumsum()
+    open_ = close + rng.standard_normal(n) * 0.5
+    history = {
+        "date": np.arange("2025-01-01", n, dtype="datetime64[D]"),
+        "open": open_,
+        "high": np.maximum(open_, close) + 1.0,
+        "low": np.minimum(open_, close) - 1.0,
+        "close": close,
+        "volume": rng.integers(1_000_000, 5_000_000, n),
+    }
+    bars_loaded = [n - 1]
+    cache = PriceCache(lambda symbol: {k: v[:bars_loaded[0]] for k, v in history.items()})
+    pipeline = IndicatorPipeline(cache.get)
+    
+    # 직접 계산과 비교
+    atr = pipeline.get("SPY", "atr", 20)
+    window = {k: v[:n - 1] for k, v in history.items()}
+    direct = true_range(window["high"][-21:], window["low"][-21:], window["close"][-21:])[-20:].mean()
+    print(f"{'✅' if abs(atr - direct) < 1e-12 else '❌'} ATR(20) = {atr:.4f}")
+    print(f"SMA(20) = {pipeline.get('SPY', 'sma', 20):.2f}")
+    
+    # 같은 봉 반복 조회 → 캐시
+    misses = pipeline.misses
+    start = time.perf_counter()
+    for _ in range(10000):
+        pipeline.get("SPY", "atr", 20)
+        pipeline.get("SPY", "sma", 20)
+    elapsed = (time.perf_counter() - start) / 20000 * 1e6
+    print(f"같은 봉 20000회 조회: 추가 계산 {pipeline.misses - misses}회, 조회당 {elapsed:.1f}µs")
+    
+    # 새 봉 → 심볼 무효화 후 1회씩만 재계산 (TR은 ATR 경유로 함께)
+    bars_loaded[0] = n
+    cache.invalidate("SPY")
+    pipeline.invalidate("SPY")
+    misses = pipeline.misses
+    pipeline.get("SPY", "atr", 20)
+    pipeline.get("SPY", "atr", 20)
+    print(f"새 봉 후 ATR 2회 조회: 계산 {pipeline.misses - misses}회 (TR + ATR = 2 예상)")
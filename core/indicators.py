@@ -0,0 +1,606 @@
+"""
+============================================
+기술적 지표 - 순수 NumPy (pandas-ta 미사용)
+============================================
+- ADX / +DI / -DI (Wilder 평활)
+  · adx_batch(): 전체 히스토리 벡터 계산 (백테스트용)
+  · WilderADX: 상태 유지형, 새 봉 1개당 O(1) 갱신 (실시간용)
+- Wilder 평활 = 첫 값은 기간 단순평균, 이후 s += (x - s) / period
+- 평활 재귀식은 블록 단위 누적합으로 벡터화 (파이썬 루프 없음)
+- KER (Kaufman 효율비)
+  · ker_batch(): 여러 기간의 롤링 KER 시리즈를 누적합 1회로 계산
+  · StreamingKER: |가격 변화| 구간 합을 유지 → 기간별 O(1) 갱신
+- 가격 통계 (True Range, 이동평균, Yang-Zhang 변동성, VWAP 밴드)
+  · 전략/리스크/시장 데이터가 공용으로 쓰는 순수 함수
+  · 봉별 메모이즈는 core/indicator_pipeline.py
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import math
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# 벡터 평활 블록 크기 (감쇠 계수 거듭제곱의 언더플로 방지)
+_SMOOTH_BLOCK = 256
+
+
+# ============================================
+# Wilder 평활 (벡터)
+# ============================================
+
+def wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder 평활 (RMA)
+    
+    s[period-1] = mean(values[:period]), 이후 s[t] = s[t-1] + (values[t] - s[t-1]) / period
+    
+    Args:
+        values: 입력 배열 (NaN 없음)
+        period: 평활 기간
+    
+    Returns:
+        같은 길이 배열 (앞 period-1개는 NaN)
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    
+    alpha = 1.0 / period
+    decay = 1.0 - alpha
+    seed = values[:period].mean()
+    out[period - 1] = seed
+    
+    # s[t] = decay^k * (s0 + Σ alpha * x_i / decay^i) → 블록마다 누적합 한 번
+    rest = values[period:]
+    for start in range(0, len(rest), _SMOOTH_BLOCK):
+        block = rest[start:start + _SMOOTH_BLOCK]
+        powers = decay ** np.arange(1, len(block) + 1)
+        smoothed = powers * (seed + np.cumsum(alpha * block / powers))
+        out[period + start:period + start + len(block)] = smoothed
+        seed = smoothed[-1]
+    
+    return out
+
+
+# ============================================
+# ADX / DMI (배치)
+# ============================================
+
+def _directional_moves(high: np.ndarray, low: np.ndarray,
+                       close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """봉별 True Range / +DM / -DM (두 번째 봉부터, 길이 n-1)"""
+    up = high[1:] - high[:-1]
+    down = low[:-1] - low[1:]
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    
+    prev_close = close[:-1]
+    tr = np.maximum(high[1:], prev_close) - np.minimum(low[1:], prev_close)
+    return tr, plus_dm, minus_dm
+
+
+def _di_dx(tr_s, plus_s, minus_s):
+    """평활 배열 → +DI, -DI, DX (0으로 나누면 0)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = np.where(tr_s > 0, 100.0 * plus_s / tr_s, 0.0)
+        minus_di = np.where(tr_s > 0, 100.0 * minus_s / tr_s, 0.0)
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, 100.0 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    return plus_di, minus_di, dx
+
+
+def adx_batch(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+              period: int = 14) -> Dict[str, np.ndarray]:
+    """
+    ADX / +DI / -DI 전체 계산 (백테스트용)
+    
+    Args:
+        high, low, close: 오래된 순서의 가격 배열
+        period: 기간 (기본 14)
+    
+    Returns:
+        {"adx", "plus_di", "minus_di", "atr", "plus_dm", "minus_dm", "dx"}
+        입력과 같은 길이, 계산 전 구간은 NaN
+        (DI는 period번째 봉부터, ADX는 2 × period번째 봉부터)
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    
+    result = {key: np.full(n, np.nan)
+              for key in ("adx", "plus_di", "minus_di", "atr", "plus_dm", "minus_dm", "dx")}
+    if n < period + 1:
+        return result
+    
+    tr, plus_dm, minus_dm = _directional_moves(high, low, close)
+    
+    # 평활 (봉 1부터 시작 → 결과는 한 칸 밀어서 저장)
+    atr = wilder_smooth(tr, period)
+    plus_s = wilder_smooth(plus_dm, period)
+    minus_s = wilder_smooth(minus_dm, period)
+    plus_di, minus_di, dx = _di_dx(atr, plus_s, minus_s)
+    
+    valid = ~np.isnan(atr)
+    for key, values in (("atr", atr), ("plus_dm", plus_s), ("minus_dm", minus_s),
+                        ("plus_di", plus_di), ("minus_di", minus_di), ("dx", dx)):
+        result[key][1:] = np.where(valid, values, np.nan)
+    
+    # ADX = DX의 Wilder 평활 (DX 첫 유효값부터)
+    first_dx = period          # result 기준 DX 첫 유효 인덱스
+    result["adx"][first_dx:] = wilder_smooth(result["dx"][first_dx:], period)
+    return result
+
+
+# ============================================
+# ADX / DMI (상태 유지, 증분)
+# ============================================
+
+class WilderADX:
+    """
+    증분 ADX 계산기 (새 봉 1개당 O(1))
+    
+    사용법:
+        adx = WilderADX(period=14)
+        adx.seed(high, low, close)          # 과거 배열로 초기화 (벡터 계산 1회)
+        adx.push(h, l, c)                   # 새 봉 마감 시
+        adx.replace_last(h, l, c)           # 진행 중인 마지막 봉 값이 바뀌었을 때
+        adx.adx, adx.plus_di, adx.minus_di
+    """
+    
+    # 상태 필드 (replace_last용 스냅샷 순서)
+    _FIELDS = ("count", "prev_high", "prev_low", "prev_close",
+               "tr_s", "plus_s", "minus_s", "dx_sum", "dx_count", "adx")
+    
+    def __init__(self, period: int = 14) -> None:
+        """
+        초기화
+        
+        Args:
+            period: 기간 (기본 14)
+        """
+        if period < 2:
+            raise ValueError("기간은 2 이상이어야 합니다")
+        self.period = period
+        self._previous: Optional[tuple] = None
+        self.reset()
+    
+    def reset(self) -> None:
+        """상태 초기화"""
+        self.count = 0                 # 받은 봉 수
+        self.prev_high = self.prev_low = self.prev_close = 0.0
+        self.tr_s = self.plus_s = self.minus_s = 0.0   # 워밍업 중에는 합계, 이후 평활값
+        self.dx_sum = 0.0              # ADX 워밍업 중 DX 합계
+        self.dx_count = 0
+        self.adx = math.nan
+        self.plus_di = self.minus_di = math.nan
+        self._previous = None
+    
+    # ============================================
+    # 초기화 (배치)
+    # ============================================
+    
+    def seed(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> None:
+        """
+        과거 배열로 초기화 (adx_batch 1회 → 마지막 상태만 보관)
+        
+        Args:
+            high, low, close: 오래된 순서의 가격 배열
+        """
+        self.reset()
+        n = len(close) - 1           # 배치로 계산할 봉 수 (마지막 봉은 push → replace_last 가능)
+        p = self.period
+        if n <= p:
+            # 평활 시작 전 → 봉 단위로 누적
+            for h, l, c in zip(high, low, close):
+                self.push(float(h), float(l), float(c))
+            return
+        
+        batch = adx_batch(high[:n], low[:n], close[:n], p)
+        self.count = n
+        self.prev_high, self.prev_low = float(high[n - 1]), float(low[n - 1])
+        self.prev_close = float(close[n - 1])
+        self.tr_s = float(batch["atr"][-1])
+        self.plus_s = float(batch["plus_dm"][-1])
+        self.minus_s = float(batch["minus_dm"][-1])
+        self.plus_di = float(batch["plus_di"][-1])
+        self.minus_di = float(batch["minus_di"][-1])
+        
+        dx = batch["dx"][p:]
+        if n >= 2 * p:
+            self.adx = float(batch["adx"][-1])
+            self.dx_count = p
+        else:
+            self.dx_sum = float(dx.sum())
+            self.dx_count = len(dx)
+        
+        self.push(float(high[-1]), float(low[-1]), float(close[-1]))
+    
+    # ============================================
+    # 갱신 (봉 1개, O(1))
+    # ============================================
+    
+    def push(self, high: float, low: float, close: float) -> float:
+        """
+        새 봉 추가
+        
+        Returns:
+            현재 ADX (워밍업 중이면 NaN)
+        """
+        self._previous = tuple(getattr(self, f) for f in self._FIELDS) + (self.plus_di, self.minus_di)
+        p = self.period
+        self.count += 1
+        
+        if self.count > 1:
+            up = high - self.prev_high
+            down = self.prev_low - low
+            plus_dm = up if up > down and up > 0 else 0.0
+            minus_dm = down if down > up and down > 0 else 0.0
+            tr = max(high, self.prev_close) - min(low, self.prev_close)
+            
+            moves = self.count - 1     # 받은 이동 수
+            if moves < p:
+                self.tr_s += tr
+                self.plus_s += plus_dm
+                self.minus_s += minus_dm
+            elif moves == p:
+                # 워밍업 끝: 합계 → 평균
+                self.tr_s = (self.tr_s + tr) / p
+                self.plus_s = (self.plus_s + plus_dm) / p
+                self.minus_s = (self.minus_s + minus_dm) / p
+            else:
+                self.tr_s += (tr - self.tr_s) / p
+                self.plus_s += (plus_dm - self.plus_s) / p
+                self.minus_s += (minus_dm - self.minus_s) / p
+            
+            if moves >= p:
+                self._update_adx()
+        
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        return self.adx
+    
+    def _update_adx(self) -> None:
+        """DI/DX 계산 → ADX 워밍업 또는 평활"""
+        p = self.period
+        if self.tr_s > 0:
+            self.plus_di = 100.0 * self.plus_s / self.tr_s
+            self.minus_di = 100.0 * self.minus_s / self.tr_s
+        else:
+            self.plus_di = self.minus_di = 0.0
+        di_sum = self.plus_di + self.minus_di
+        dx = 100.0 * abs(self.plus_di - self.minus_di) / di_sum if di_sum > 0 else 0.0
+        
+        if self.dx_count < p:
+            self.dx_sum += dx
+            self.dx_count += 1
+            if self.dx_count == p:
+                self.adx = self.dx_sum / p
+        else:
+            self.adx += (dx - self.adx) / p
+    
+    def replace_last(self, high: float, low: float, close: float) -> float:
+        """
+        마지막 봉 값 교체 (장중 갱신되는 당일 봉)
+        
+        Returns:
+            현재 ADX
+        """
+        if self._previous is None:
+            return self.push(high, low, close)
+        
+        *fields, self.plus_di, self.minus_di = self._previous
+        for name, value in zip(self._FIELDS, fields):
+            setattr(self, name, value)
+        return self.push(high, low, close)
+    
+    @property
+    def ready(self) -> bool:
+        """ADX 계산 가능 여부 (워밍업 완료)"""
+        return not math.isnan(self.adx)
+
+
+# ============================================
+# KER (Kaufman's Efficiency Ratio)
+# ============================================
+# 기간 = 가격 개수 (RegimeDetector.calculate_ker와 동일)
+#   KER[t] = |p[t] - p[t-period+1]| / Σ|p[i] - p[i-1]| (i = t-period+2 .. t)
+
+def ker_batch(prices: np.ndarray, periods: Iterable[int] = (20,)) -> Dict[int, np.ndarray]:
+    """
+    롤링 KER 시리즈 (여러 기간 동시, 백테스트용)
+    
+    Args:
+        prices: 오래된 순서의 종가 배열
+        periods: 기간 목록 (가격 개수, 2 이상)
+    
+    Returns:
+        {period: KER 배열} (입력과 같은 길이, 앞 period-1개는 NaN, 변화가 없으면 0)
+    """
+    prices = np.asarray(prices, dtype=float)
+    n = len(prices)
+    
+    # 절대 변화량 누적합 (cum[t] = Σ|p[i] - p[i-1]|, i ≤ t)
+    cum = np.zeros(n)
+    if n > 1:
+        np.cumsum(np.abs(np.diff(prices)), out=cum[1:])
+    
+    result: Dict[int, np.ndarray] = {}
+    for period in periods:
+        if period < 2:
+            raise ValueError("기간은 2 이상이어야 합니다")
+        ker = np.full(n, np.nan)
+        if n >= period:
+            lag = period - 1
+            change = np.abs(prices[lag:] - prices[:-lag])
+            volatility = cum[lag:] - cum[:-lag]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ker[lag:] = np.where(volatility > 0, change / volatility, 0.0)
+        result[period] = ker
+    return result
+
+
+class StreamingKER:
+    """
+    다중 기간 스트리밍 KER (새 가격 1개당 기간별 O(1))
+    
+    사용법:
+        ker = StreamingKER(periods=(10, 20, 60))
+        ker.seed(closes)              # 과거 종가로 초기화
+        ker.push(new_close)           # 새 봉 마감 시
+        ker.replace_last(price)       # 진행 중인 마지막 봉 가격이 바뀌었을 때
+        ker.value(20), ker.values()
+    """
+    
+    def __init__(self, periods: Iterable[int] = (10, 20, 60)) -> None:
+        """
+        초기화
+        
+        Args:
+            periods: 기간 목록 (가격 개수, 2 이상)
+        """
+        self.periods: Tuple[int, ...] = tuple(sorted(set(periods)))
+        if not self.periods or self.periods[0] < 2:
+            raise ValueError("기간은 2 이상이어야 합니다")
+        self.reset()
+    
+    def reset(self) -> None:
+        """상태 초기화"""
+        longest = self.periods[-1]
+        # 한 칸 여유 → replace_last가 빠져나간 값을 되살릴 수 있음
+        self._prices: deque = deque(maxlen=longest + 1)
+        self._diffs: deque = deque(maxlen=longest)
+        self._sums: Dict[int, float] = {p: 0.0 for p in self.periods}   # 기간별 |변화| 합
+    
+    def seed(self, prices: np.ndarray) -> None:
+        """
+        과거 가격으로 초기화 (마지막 구간만 보관, 합계는 벡터 계산)
+        
+        Args:
+            prices: 오래된 순서의 가격 배열
+        """
+        self.reset()
+        tail = np.asarray(prices, dtype=float)[-(self.periods[-1] + 1):]
+        diffs = np.abs(np.diff(tail))
+        self._prices.extend(tail.tolist())
+        self._diffs.extend(diffs.tolist())
+        for p in self.periods:
+            self._sums[p] = float(diffs[-(p - 1):].sum()) if len(diffs) else 0.0
+    
+    def push(self, price: float) -> None:
+        """새 가격 추가 (빠져나가는 변화량을 빼고 새 변화량을 더함)"""
+        prices, diffs = self._prices, self._diffs
+        if prices:
+            diff = abs(price - prices[-1])
+            count = len(diffs)
+            for p in self.periods:
+                self._sums[p] += diff
+                if count >= p - 1:
+                    self._sums[p] -= diffs[-(p - 1)]
+            diffs.append(diff)
+        prices.append(price)
+    
+    def replace_last(self, price: float) -> None:
+        """마지막 가격 교체 (마지막 push를 되돌린 뒤 다시 push)"""
+        prices, diffs = self._prices, self._diffs
+        if not prices:
+            self.push(price)
+            return
+        
+        prices.pop()
+        if diffs:
+            diff = diffs.pop()
+            count = len(diffs)
+            for p in self.periods:
+                self._sums[p] -= diff
+                if count >= p - 1:
+                    self._sums[p] += diffs[-(p - 1)]
+        self.push(price)
+    
+    def value(self, period: int) -> float:
+        """
+        기간 KER
+        
+        Returns:
+            0~1 (가격이 period개 미만이면 NaN, 변화가 없으면 0)
+        """
+        prices = self._prices
+        if len(prices) < period:
+            return math.nan
+        volatility = self._sums[period]
+        if volatility <= 1e-12:
+            return 0.0
+        return min(1.0, float(abs(prices[-1] - prices[-period]) / volatility))
+    
+    def values(self) -> Dict[int, float]:
+        """모든 기간 KER"""
+        return {p: self.value(p) for p in self.periods}
+
+
+# ============================================
+# 가격 통계 (순수 함수)
+# ============================================
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """봉별 True Range (첫 봉은 전일 종가 없음 → 고가-저가)"""
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def sma(values: np.ndarray, period: int) -> float:
+    """마지막 period개 단순평균 (값이 모자라면 NaN)"""
+    if period <= 0 or len(values) < period:
+        return math.nan
+    return float(np.mean(np.asarray(values[-period:], dtype=float)))
+
+
+def yang_zhang_components(open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                          close: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Yang-Zhang 입력 로그 수익률
+    
+    Returns:
+        {"overnight": ln(시가/전일 종가) (n-1개), "open_close": ln(종가/시가),
+         "high_low": ln(고가/저가)}
+    """
+    o = np.asarray(open_, dtype=float)
+    h = np.asarray(high, dtype=float)
+    l = np.asarray(low, dtype=float)
+    c = np.asarray(close, dtype=float)
+    return {
+        "overnight": np.log(o[1:] / c[:-1]),
+        "open_close": np.log(c / o),
+        "high_low": np.log(h / l),
+    }
+
+
+def yang_zhang_volatility(components: Dict[str, np.ndarray], periods_per_year: int = 252) -> float:
+    """
+    Yang-Zhang 연환산 변동성
+    
+    σ² = σ_overnight² + k × σ_close² + (1-k) × σ_hl²
+    
+    Args:
+        components: yang_zhang_components() 결과 (봉 2개 이상)
+        periods_per_year: 연환산 봉 수 (일봉 252)
+    
+    Returns:
+        연환산 변동성 (예: 0.20 = 20%)
+    """
+    overnight = components["overnight"]
+    n = len(components["open_close"])
+    
+    var_close = np.var(components["open_close"], ddof=1)
+    var_open = np.var(overnight, ddof=1) if len(overnight) > 1 else 0.0
+    var_hl = np.mean(components["high_low"] ** 2) / (4 * np.log(2))
+    
+    k = 0.34 / (1.34 + (n + 1) / (n - 1))
+    return float(np.sqrt((var_open + k * var_close + (1 - k) * var_hl) * periods_per_year))
+
+
+def vwap_bands(prices: np.ndarray, volumes: np.ndarray,
+               multiplier: float = 2.0) -> Tuple[float, float, float]:
+    """
+    거래량 가중 평균가와 밴드 (거래량 가중 표준편차 × multiplier)
+    
+    Returns:
+        (vwap, upper_band, lower_band) (입력이 비었거나 거래량 0이면 0)
+    """
+    if len(prices) == 0 or len(prices) != len(volumes):
+        return (0.0, 0.0, 0.0)
+    
+    prices = np.asarray(prices, dtype=float)
+    volumes = np.asarray(volumes, dtype=float)
+    total_volume = volumes.sum()
+    if total_volume == 0:
+        return (0.0, 0.0, 0.0)
+    
+    vwap = float(np.dot(prices, volumes) / total_volume)
+    std = float(np.sqrt(np.dot((prices - vwap) ** 2, volumes) / total_volume))
+    return (vwap, vwap + multiplier * std, vwap - multiplier * std)
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import time
+    
+    print("=" * 50)
+    print("ADX 엔진 테스트")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(7)
+    close = 400 + rng.standard_normal(600).cumsum()
+    high = close + rng.random(600) * 2
+    low = close - rng.random(600) * 2
+    
+    # 1. 배치 vs 봉 단위 증분 (같은 값이어야 함)
+    batch = adx_batch(high, low, close)
+    incremental = WilderADX()
+    values = [incremental.push(h, l, c) for h, l, c in zip(high, low, close)]
+    diff = np.nanmax(np.abs(batch["adx"] - np.array(values)))
+    same_nan = np.array_equal(np.isnan(batch["adx"]), np.isnan(values))
+    print(f"  {'✅' if diff < 1e-9 and same_nan else '❌'} 배치 = 증분 (최대 오차 {diff:.2e})")
+    
+    # 2. 배열로 초기화 후 이어서 갱신 (워밍업 구간 길이별)
+    for cut in (5, 15, 20, 28, 29, 40):
+        partial = WilderADX()
+        partial.seed(high[:cut], low[:cut], close[:cut])
+        for h, l, c in zip(high[cut:60], low[cut:60], close[cut:60]):
+            partial.push(h, l, c)
+        if abs(partial.adx - batch["adx"][59]) > 1e-9:
+            print(f"  ❌ seed({cut}) 후 불일치")
+    seeded = WilderADX()
+    seeded.seed(high[:500], low[:500], close[:500])
+    for h, l, c in zip(high[500:], low[500:], close[500:]):
+        seeded.push(h, l, c)
+    print(f"  {'✅' if abs(seeded.adx - batch['adx'][-1]) < 1e-9 else '❌'} seed + push = 배치 "
+          f"(ADX {seeded.adx:.2f}, +DI {seeded.plus_di:.2f}, -DI {seeded.minus_di:.2f})")
+    
+    # 3. 당일 봉 교체
+    seeded.replace_last(high[-1] + 5, low[-1], close[-1] + 4)
+    seeded.replace_last(high[-1], low[-1], close[-1])
+    print(f"  {'✅' if abs(seeded.adx - batch['adx'][-1]) < 1e-9 else '❌'} replace_last 왕복 후 동일")
+    
+    # 4. 속도
+    start = time.perf_counter()
+    for _ in range(10_000):
+        seeded.replace_last(high[-1], low[-1], close[-1])
+    per_update = (time.perf_counter() - start) / 10_000 * 1e6
+    print(f"  증분 갱신: {per_update:.2f}µs/봉")
+    
+    print("\n" + "=" * 50)
+    print("KER 엔진 테스트")
+    print("=" * 50)
+    
+    # 5. 배치 vs 기존 스칼라 정의
+    periods = (10, 20, 60)
+    kers = ker_batch(close, periods)
+    window = close[-20:]
+    scalar = abs(window[-1] - window[0]) / np.abs(np.diff(window)).sum()
+    print(f"  {'✅' if abs(kers[20][-1] - scalar) < 1e-12 else '❌'} 배치 마지막 값 = 스칼라 정의 ({scalar:.4f})")
+    
+    # 6. 스트리밍 vs 배치 (seed + push + replace_last)
+    streaming = StreamingKER(periods)
+    streaming.seed(close[:100])
+    worst = 0.0
+    for t in range(100, len(close)):
+        streaming.push(close[t] + 3.0)
+        streaming.replace_last(close[t])
+        worst = max(worst, max(abs(streaming.value(p) - kers[p][t]) for p in periods))
+    print(f"  {'✅' if worst < 1e-9 else '❌'} 스트리밍 = 배치 (최대 오차 {worst:.2e})")
+    
+    # 7. 수십 년 일봉 배치 속도
+    decades = 400 + rng.standard_normal(252 * 50).cumsum()
+    start = time.perf_counter()
+    ker_batch(decades, periods)
+    print(f"  50년 일봉 × {len(periods)}개 기간: {(time.perf_counter() - start) * 1e3:.2f}ms")
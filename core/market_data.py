@@ -2,10 +2,15 @@
 ============================================
 시장 데이터 수집기 - 로컬 DB 캐싱
 ============================================
-- SQLite로 히스토리컬 데이터 저장
+- SQLite로 히스토리컬 데이터 저장 (WAL, 기록/읽기 커넥션 분리)
+- 심볼별 메모리 가격 캐시 (NumPy 배열, DB 갱신 시에만 재로드)
+- 공용 지표 파이프라인 (봉별 메모이즈, 가격 캐시와 함께 무효화)
+- VIX 롤링 통계 (21/63/126/252일, 새 일봉마다 O(1) 증분 갱신)
 - 252일치 최초 다운로드 후 증분 업데이트
-- VIX 현물/선물 조회
-- IBKR 실패 시 yfinance 폴백
+- 다중 심볼 병렬 백필 (일괄 요청 + 워커 풀 + 단일 DB 기록자)
+- VIX 현물/선물 조회 (메모리 스냅샷)
+- IBKR 실패 시 yfinance 폴백 (백그라운드)
+- yfinance 응답은 공용 디스크 캐시 경유 (TTL, 요청 병합, 호출 제한)
 ============================================
 """
 
@@ -13,22 +18,30 @@
 # 필수 라이브러리 임포트
 # ============================================
 import os
-import sqlite3
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from pathlib import Path
 from typing import Optional, Dict, List, Any
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
 from dotenv import load_dotenv
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from core.bar_aggregator import BarAggregator, TIMEFRAMES
+from core.columnar_archive import ColumnarArchive
+from core.indicator_pipeline import IndicatorPipeline
+from core.price_cache import PriceCache
+from core.quote_table import QuoteTable
+from core.rolling_stats import RollingStats
+from core.storage import MarketDatabase, DB_PATH
+from core.vix_snapshot import VixSnapshotService
+from core.yf_client import get_yf_client
+
 # .env 파일 로드
 load_dotenv()
 
-# 데이터베이스 경로
-DB_PATH = Path(__file__).parent.parent / "data" / "market_data.db"
-
 
 class MarketDataManager(QThread):
     """
@@ -51,6 +64,9 @@ class MarketDataManager(QThread):
     # === 관리 대상 심볼 ===
     SYMBOLS = ["SPY", "QQQ", "^VIX"]   # 기본 심볼 (VIX는 yfinance용)
     
+    # === 백필 설정 (.env에서 로드) ===
+    BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "8"))   # 다운로드 워커 수
+    
     def __init__(self, ib=None, parent=None) -> None:
         """
         초기화
@@ -62,13 +78,43 @@ class MarketDataManager(QThread):
         super().__init__(parent)
         self.ib = ib          # IBKR IB 객체 (연결된 경우)
         self.bridge = None    # IBKRBridge 참조 (VIX 선물용)
-        self.conn: Optional[sqlite3.Connection] = None
+        self.db = MarketDatabase(DB_PATH)   # SQLite 저장소 (WAL + 커넥션 풀)
         self._is_running = False
         
-        # === 하이브리드 캐싱 변수 (1일 1회 갱신) ===
-        self._cached_mean: Optional[float] = None      # VIX 평균
-        self._cached_std: Optional[float] = None       # VIX 표준편차
-        self._cache_date: Optional[datetime] = None    # 캐시 날짜
+        # === DB 초기화 (스레드 1개만 수행, 나머지는 완료까지 대기) ===
+        self._init_lock = threading.RLock()
+        self._initialized = False
+        
+        # === 가격 캐시 (심볼별 NumPy 배열, 1회 로드) ===
+        self.price_cache = PriceCache(self._load_price_arrays)
+        
+        # === 지표 파이프라인 (심볼/지표/파라미터/봉 날짜별 1회 계산) ===
+        self.indicators = IndicatorPipeline(self.get_price_arrays)
+        
+        # === VIX 스냅샷 (틱으로 갱신, 루프는 메모리만 읽음) ===
+        self.vix_snapshot = VixSnapshotService()
+        self.vix_snapshot.log_message.connect(self.log_message.emit)
+        
+        # === 장중 봉 집계 (틱 → 1초/1분/5분 봉, DB 일괄 저장) ===
+        self.bar_aggregator = BarAggregator(self.db)
+        self.bar_aggregator.log_message.connect(self.log_message.emit)
+        
+        # === 최신 시세 테이블 (브릿지가 제자리 갱신, 엔진이 읽기) ===
+        self.quotes = QuoteTable()
+        
+        # === 컬럼형 아카이브 (장기 히스토리, 메모리 맵 조회) ===
+        self.archive = ColumnarArchive()
+        
+        # === VIX 롤링 통계 (새 일봉 종가마다 증분 갱신) ===
+        self.vix_stats = RollingStats(windows=(21, 63, 126, 252))
+        self._vix_stats_date: Optional[np.datetime64] = None  # 마지막 반영 일자
+        self._vix_stats_close: float = 0.0                    # 마지막 반영 종가
+        self._vix_rows_changed: bool = False                  # DB의 VIX 행 변경 → 다음 갱신에서 과거 행 확인
+        self._stats_lock = threading.Lock()                   # vix_stats + _cached_mean/std 읽기·쓰기 공용
+        
+        # === 하이브리드 캐싱 변수 (롤링 통계에서 파생) ===
+        self._cached_mean: Optional[float] = None      # VIX 평균 (126일)
+        self._cached_std: Optional[float] = None       # VIX 표준편차 (126일)
         self._last_vix: float = 0.0                    # 마지막 VIX (이벤트용)
         self.VIX_CHANGE_THRESHOLD = 0.5                # VIX 변동 임계값
     
@@ -83,134 +129,253 @@ class MarketDataManager(QThread):
         - DB 파일이 없으면 생성
         - 테이블이 없으면 생성
         - 데이터가 없으면 252일치 다운로드
+        
+        데이터 스레드와 엔진 스레드가 동시에 불러도 백필은 1회만 수행되고,
+        나중에 온 호출은 진행 중인 초기화가 끝날 때까지 기다립니다.
         """
+        with self._init_lock:
+            if self._initialized and self.db.is_open():
+                return
+            self._initialize_database()
+            self._initialized = True
+    
+    def _ensure_initialized(self) -> None:
+        """초기화 전이거나 진행 중이면 완료까지 대기 (완료 후에는 락 없이 통과)"""
+        if not self._initialized or not self.db.is_open():
+            self.initialize_database()
+    
+    def _initialize_database(self) -> None:
+        """DB 열기 + 부족한 심볼 백필 (_init_lock 안에서 호출)"""
         self.log_message.emit("📁 데이터베이스 초기화 중...")
         
-        # data 폴더 생성
-        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # DB 열기 (폴더/테이블 생성, WAL 전환 - 이미 열려 있으면 무시)
+        self.db.open()
         
-        # DB 연결 (check_same_thread=False: 멀티스레드 허용)
-        self.conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
-        
-        # 테이블 생성
-        self._create_tables()
-        
-        # 데이터 확인 및 다운로드
+        # 데이터 확인 및 다운로드 계획 수립
+        plan: Dict[str, int] = {}
         for symbol in self.SYMBOLS:
             count = self._get_data_count(symbol)
             if count < 200:  # 데이터가 부족하면
                 self.log_message.emit(f"📥 {symbol} 히스토리컬 데이터 다운로드 중...")
-                self._download_historical(symbol, days=252)
+                plan[symbol] = 252
             else:
                 self.log_message.emit(f"✅ {symbol}: {count}일치 데이터 캐시됨")
         
-        self.log_message.emit("✅ 데이터베이스 초기화 완료")
-    
-    def _create_tables(self) -> None:
-        """테이블 생성"""
-        cursor = self.conn.cursor()
-        
-        # 히스토리컬 가격 테이블
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS historical_prices (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT NOT NULL,
-                date TEXT NOT NULL,
-                open REAL,
-                high REAL,
-                low REAL,
-                close REAL,
-                volume INTEGER,
-                UNIQUE(symbol, date)
-            )
-        """)
-        
-        # 인덱스 생성 (빠른 조회용)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_symbol_date 
-            ON historical_prices(symbol, date)
-        """)
+        # 부족한 심볼만 병렬 백필
+        self._backfill(plan)
         
-        self.conn.commit()
+        self.log_message.emit("✅ 데이터베이스 초기화 완료")
     
     def _get_data_count(self, symbol: str) -> int:
         """심볼의 데이터 개수 조회"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT COUNT(*) FROM historical_prices WHERE symbol = ?",
-            (symbol,)
-        )
-        return cursor.fetchone()[0]
+        return self.db.count_daily_bars(symbol)
     
     def _get_last_date(self, symbol: str) -> Optional[str]:
         """심볼의 마지막 날짜 조회"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT MAX(date) FROM historical_prices WHERE symbol = ?",
-            (symbol,)
-        )
-        result = cursor.fetchone()[0]
-        return result
+        return self.db.last_daily_date(symbol)
     
-    def _download_historical(self, symbol: str, days: int = 252) -> bool:
+    def _fetch_history(self, symbol: str, days: int) -> Optional[pd.DataFrame]:
         """
-        yfinance로 히스토리컬 데이터 다운로드
+        yfinance로 단일 심볼 히스토리 조회 (네트워크만, DB 기록 없음)
         
-        IBKR API가 복잡하므로 yfinance 사용 (안정적)
+        워커 스레드에서 호출되므로 DB에 접근하지 않습니다.
+        
+        Returns:
+            OHLCV DataFrame 또는 None (데이터 없음)
+        """
+        df = get_yf_client().history(symbol, period=f"{days}d")
+        return None if df.empty else df
+    
+    def _fetch_history_batch(self, symbols: List[str], days: int) -> Dict[str, pd.DataFrame]:
+        """
+        yfinance 다중 심볼 일괄 조회 (요청 1회)
+        
+        실패하거나 비어 있는 심볼은 결과에서 빠지며,
+        호출자가 개별 워커로 다시 요청합니다.
+        
+        Args:
+            symbols: 심볼 리스트
+            days: 조회 일수 (심볼별 필요 일수 중 최대값)
+            
+        Returns:
+            {symbol: OHLCV DataFrame}
         """
+        results: Dict[str, pd.DataFrame] = {}
+        if len(symbols) < 2:
+            return results
+        
         try:
-            # yfinance로 다운로드
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period=f"{days}d")
+            data = get_yf_client().download(
+                symbols,
+                period=f"{days}d",
+                group_by="ticker",
+                auto_adjust=True,     # ticker.history() 기본값과 동일
+                threads=True,
+                progress=False,
+            )
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 일괄 다운로드 실패, 개별 다운로드로 전환: {str(e)}")
+            return results
+        
+        if data is None or data.empty:
+            return results
+        
+        for symbol in symbols:
+            try:
+                df = data[symbol].dropna(how="all")
+            except KeyError:
+                continue
+            if not df.empty:
+                results[symbol] = df
+        
+        return results
+    
+    def _backfill(self, plan: Dict[str, int]) -> None:
+        """
+        다중 심볼 병렬 백필
+        
+        1. 일괄 요청 1회 (yf.download)로 대부분의 심볼 수신
+        2. 빠진 심볼은 워커 풀(BACKFILL_WORKERS)이 동시에 개별 다운로드
+        3. 결과는 큐로 모아 현재 스레드(단일 기록자)만 SQLite에 기록
+        
+        → 시작 시간이 심볼 수의 합이 아니라 가장 느린 심볼에 수렴
+        
+        Args:
+            plan: {symbol: 다운로드 일수}
+        """
+        if not plan:
+            return
+        
+        results: "queue.Queue[tuple]" = queue.Queue()
+        
+        # === 1. 일괄 요청 ===
+        batch = self._fetch_history_batch(list(plan), max(plan.values()))
+        for symbol, df in batch.items():
+            results.put((symbol, df, None))
+        
+        missing = [symbol for symbol in plan if symbol not in batch]
+        
+        def worker(symbol: str) -> None:
+            """개별 다운로드 워커 (네트워크만)"""
+            try:
+                results.put((symbol, self._fetch_history(symbol, plan[symbol]), None))
+            except Exception as e:
+                results.put((symbol, None, str(e)))
+        
+        # === 2. 워커 풀 + 3. 단일 기록자 ===
+        workers = max(1, min(self.BACKFILL_WORKERS, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill") as pool:
+            for symbol in missing:
+                pool.submit(worker, symbol)
             
-            if df.empty:
-                self.log_message.emit(f"⚠️ {symbol}: 데이터 없음")
-                return False
+            # 도착하는 순서대로 기록 (다운로드와 기록이 겹쳐 진행됨)
+            for _ in range(len(plan)):
+                symbol, df, error = results.get()
+                self._store_history(symbol, df, error)
+    
+    def _store_history(self, symbol: str, df: Optional[pd.DataFrame],
+                       error: Optional[str] = None) -> bool:
+        """
+        다운로드 결과 DB 기록 + 로그
+        
+        Args:
+            symbol: 심볼
+            df: OHLCV DataFrame (None이면 데이터 없음)
+            error: 다운로드 오류 메시지
             
-            # DB에 저장
-            cursor = self.conn.cursor()
-            for date, row in df.iterrows():
-                try:
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO historical_prices 
-                        (symbol, date, open, high, low, close, volume)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        symbol,
-                        date.strftime("%Y-%m-%d"),
-                        row["Open"],
-                        row["High"],
-                        row["Low"],
-                        row["Close"],
-                        int(row["Volume"]) if row["Volume"] else 0
-                    ))
-                except Exception:
-                    continue
-            
-            self.conn.commit()
-            self.log_message.emit(f"✅ {symbol}: {len(df)}일치 데이터 저장됨")
+        Returns:
+            저장 성공 여부
+        """
+        if error:
+            self.log_message.emit(f"❌ {symbol} 다운로드 실패: {error}")
+            return False
+        
+        if df is None or df.empty:
+            self.log_message.emit(f"⚠️ {symbol}: 데이터 없음")
+            return False
+        
+        try:
+            changed = self._bulk_upsert(symbol, df)
+            self.log_message.emit(f"✅ {symbol}: {len(df)}일치 데이터 저장됨 (변경 {changed}행)")
             return True
-            
         except Exception as e:
-            self.log_message.emit(f"❌ {symbol} 다운로드 실패: {str(e)}")
+            self.log_message.emit(f"❌ {symbol} 저장 실패: {str(e)}")
             return False
     
+    def _download_historical(self, symbol: str, days: int = 252) -> bool:
+        """
+        yfinance로 히스토리컬 데이터 다운로드 (단일 심볼)
+        
+        IBKR API가 복잡하므로 yfinance 사용 (안정적)
+        """
+        try:
+            df = self._fetch_history(symbol, days)
+        except Exception as e:
+            return self._store_history(symbol, None, str(e))
+        
+        return self._store_history(symbol, df)
+    
+    def _bulk_upsert(self, symbol: str, df: pd.DataFrame) -> int:
+        """
+        OHLCV DataFrame 일괄 저장 (벡터화 + 단일 트랜잭션)
+        
+        - 행 단위 루프 대신 컬럼 배열로 한 번에 변환
+        - executemany로 한 트랜잭션 안에서 기록 (MarketDatabase)
+        - 값이 바뀐 행만 갱신 (ON CONFLICT ... WHERE)
+        
+        Args:
+            symbol: 심볼
+            df: yfinance history() 결과 (Open/High/Low/Close/Volume)
+            
+        Returns:
+            실제로 삽입/갱신된 행 수
+        """
+        # 가격이 없는 행 제거 (휴장일 등)
+        df = df.dropna(subset=["Open", "High", "Low", "Close"])
+        if df.empty:
+            return 0
+        
+        # 컬럼 배열로 1회 변환
+        # 날짜 → 정수 날짜 (1970-01-01 기준 일수)
+        dates = np.array(df.index.strftime("%Y-%m-%d"), dtype="datetime64[D]").astype(np.int64).tolist()
+        opens = df["Open"].astype(float).tolist()
+        highs = df["High"].astype(float).tolist()
+        lows = df["Low"].astype(float).tolist()
+        closes = df["Close"].astype(float).tolist()
+        volumes = df["Volume"].fillna(0).astype("int64").tolist()
+        
+        rows = zip(dates, opens, highs, lows, closes, volumes)
+        
+        # 단일 기록 커넥션, 단일 트랜잭션
+        changed = self.db.upsert_daily_bars(symbol, rows)
+        
+        # 행이 바뀐 경우에만 메모리 캐시 / 지표 메모 무효화
+        if changed > 0:
+            self.price_cache.invalidate(symbol)
+            self.indicators.invalidate(symbol)
+            if symbol == "^VIX":
+                with self._stats_lock:
+                    self._vix_rows_changed = True
+        
+        return changed
+    
     def update_historical_data(self) -> None:
         """
         증분 업데이트 (장 시작 전 호출)
         
         마지막 날짜 이후 데이터만 다운로드
         """
-        if not self.conn:
+        if not self._initialized or not self.db.is_open():
             self.initialize_database()
             return
         
+        plan: Dict[str, int] = {}
         for symbol in self.SYMBOLS:
             last_date = self._get_last_date(symbol)
             
             if not last_date:
                 # 데이터 없으면 전체 다운로드
-                self._download_historical(symbol, days=252)
+                plan[symbol] = 252
                 continue
             
             # 마지막 날짜 이후 데이터만 다운로드
@@ -220,12 +385,64 @@ class MarketDataManager(QThread):
             
             if days_diff > 1:  # 1일 이상 차이나면 업데이트
                 self.log_message.emit(f"📊 {symbol}: +{days_diff}일 업데이트 중...")
-                self._download_historical(symbol, days=days_diff + 5)  # 여유분 추가
+                plan[symbol] = days_diff + 5  # 여유분 추가
+        
+        # 병렬 백필 (겹치는 기간은 upsert가 변경분만 기록)
+        self._backfill(plan)
     
     # ============================================
     # 데이터 조회
     # ============================================
     
+    def _load_price_arrays(self, symbol: str) -> Dict[str, np.ndarray]:
+        """
+        심볼 전체 히스토리를 컬럼 배열로 로드 (PriceCache 로더)
+        
+        Args:
+            symbol: 심볼
+            
+        Returns:
+            {"date", "open", "high", "low", "close", "volume"} 배열 (날짜 오름차순)
+        """
+        rows = self.db.load_daily_bars(symbol)
+        
+        if not rows:
+            return {
+                "date": np.array([], dtype="datetime64[D]"),
+                "open": np.array([], dtype=np.float64),
+                "high": np.array([], dtype=np.float64),
+                "low": np.array([], dtype=np.float64),
+                "close": np.array([], dtype=np.float64),
+                "volume": np.array([], dtype=np.int64),
+            }
+        
+        dates, opens, highs, lows, closes, volumes = zip(*rows)
+        return {
+            "date": np.array(dates, dtype=np.int64).astype("datetime64[D]"),  # 정수 날짜 → 날짜
+            "open": np.array(opens, dtype=np.float64),
+            "high": np.array(highs, dtype=np.float64),
+            "low": np.array(lows, dtype=np.float64),
+            "close": np.array(closes, dtype=np.float64),
+            "volume": np.array([v or 0 for v in volumes], dtype=np.int64),
+        }
+    
+    def get_price_arrays(self, symbol: str, days: int = 252) -> Dict[str, np.ndarray]:
+        """
+        히스토리컬 가격 조회 (메모리 캐시, 배열 뷰)
+        
+        트레이딩 루프 등 자주 호출되는 경로용. SQL/날짜 파싱 없음.
+        반환된 배열은 읽기 전용 뷰입니다 (수정 금지).
+        
+        Args:
+            symbol: 심볼 (예: "SPY")
+            days: 조회 일수
+            
+        Returns:
+            {"date", "open", "high", "low", "close", "volume"} 배열 뷰
+        """
+        self._ensure_initialized()
+        return self.price_cache.get(symbol, days)
+    
     def get_historical_prices(self, symbol: str, days: int = 252) -> pd.DataFrame:
         """
         히스토리컬 가격 조회
@@ -237,29 +454,94 @@ class MarketDataManager(QThread):
         Returns:
             OHLCV DataFrame
         """
-        if not self.conn:
-            self.initialize_database()
+        bars = self.get_price_arrays(symbol, days)
         
-        query = """
-            SELECT date, open, high, low, close, volume
-            FROM historical_prices
-            WHERE symbol = ?
-            ORDER BY date DESC
-            LIMIT ?
+        df = pd.DataFrame(
+            {col: bars[col] for col in ("open", "high", "low", "close", "volume")},
+            index=pd.DatetimeIndex(bars["date"], name="date"),
+        )
+        
+        return df
+    
+    # ============================================
+    # 컬럼형 아카이브 (리서치/백테스트용)
+    # ============================================
+    
+    def export_archive(self, symbols: Optional[List[str]] = None,
+                       timeframes: tuple = ("1d", "1m")) -> Dict[str, int]:
         """
+        SQLite → 컬럼형 아카이브 내보내기 (아카이브 마지막 ts 이후만 추가)
         
-        df = pd.read_sql_query(
-            query, 
-            self.conn, 
-            params=(symbol, days),
-            parse_dates=["date"]
-        )
+        Args:
+            symbols: 내보낼 심볼 (None이면 DB 전체)
+            timeframes: "1d" (일봉) 및 장중 봉 이름 ("1s", "1m", "5m")
         
-        # 날짜 오름차순 정렬
-        df = df.sort_values("date").reset_index(drop=True)
-        df.set_index("date", inplace=True)
+        Returns:
+            {"심볼/봉": 추가된 행 수}
+        """
+        if not self.db.is_open():
+            self.db.open()
         
-        return df
+        result = {}
+        for symbol in symbols or self.db.list_symbols():
+            for timeframe in timeframes:
+                try:
+                    header = self.archive.read_header(symbol, timeframe)
+                    since = header["last_ts"] + 1 if header else 0
+                    
+                    if timeframe == "1d":
+                        rows = self.db.load_daily_bars(symbol, since)
+                    else:
+                        rows = self.db.load_intraday_bars(symbol, TIMEFRAMES[timeframe], since)
+                    
+                    if not rows:
+                        continue
+                    
+                    ts, opens, highs, lows, closes, volumes = zip(*rows)
+                    added = self.archive.append(symbol, timeframe, {
+                        "ts": ts,
+                        "open": opens,
+                        "high": highs,
+                        "low": lows,
+                        "close": closes,
+                        "volume": [v or 0 for v in volumes],
+                    })
+                    result[f"{symbol}/{timeframe}"] = added
+                
+                except Exception as e:
+                    self.log_message.emit(f"⚠️ {symbol} {timeframe} 아카이브 내보내기 실패: {str(e)}")
+        
+        total = sum(result.values())
+        self.log_message.emit(f"🗄 아카이브 내보내기 완료: {len(result)}개 시리즈, {total}행")
+        return result
+    
+    def load_archive(self, symbol: str, timeframe: str = "1d",
+                     start: Optional[str] = None, end: Optional[str] = None
+                     ) -> Dict[str, np.ndarray]:
+        """
+        컬럼형 아카이브 조회 (np.memmap 뷰, 복사 없음)
+        
+        Args:
+            symbol: 심볼
+            timeframe: "1d" 또는 장중 봉 이름
+            start: 시작 (포함, "YYYY-MM-DD" 또는 ISO 시각)
+            end: 종료 (미포함)
+        
+        Returns:
+            {"date", "open", "high", "low", "close", "volume"} 배열
+            (date: 일봉은 datetime64[D], 장중 봉은 datetime64[s] 뷰)
+        """
+        unit = "D" if timeframe == "1d" else "s"
+        
+        def to_ts(value: Optional[str]) -> Optional[int]:
+            if value is None:
+                return None
+            return int(np.datetime64(value, unit).astype(np.int64))
+        
+        bars = self.archive.read(symbol, timeframe, to_ts(start), to_ts(end))
+        ts = bars.pop("ts")
+        bars["date"] = ts.view(f"datetime64[{unit}]")   # 정수 ts → 날짜 (같은 버퍼)
+        return bars
     
     # ============================================
     # VIX 관련
@@ -267,48 +549,37 @@ class MarketDataManager(QThread):
     
     def get_vix_data(self) -> Dict[str, Any]:
         """
-        VIX 데이터 조회
+        VIX 데이터 조회 (메모리 스냅샷, 네트워크 없음)
+        
+        현물은 IBKR VIX 틱, 선물은 VX 선물 틱으로 갱신됩니다.
+        실시간 값이 끊긴 경우에만 VixSnapshotService가 백그라운드에서 yfinance로 보충합니다.
         
         Returns:
-            {"spot": float, "front_month": float, "back_month": float}
+            {"spot": float, "front_month": float, "back_month": float,
+             "curve": 30/60/90일 고정 만기 배열 또는 None}
         """
-        try:
-            # yfinance로 VIX 현물
-            vix = yf.Ticker("^VIX")
-            spot = vix.info.get("regularMarketPrice", 0)
-            
-            # IBKR에서 VIX 선물 가격 가져오기
-            front_month = spot or 0.0
-            back_month = spot or 0.0
-            
-            if self.bridge:
-                vix_futures = self.bridge.get_vix_futures()
-                if vix_futures.get("front_month", 0) > 0:
-                    front_month = vix_futures["front_month"]
-                if vix_futures.get("back_month", 0) > 0:
-                    back_month = vix_futures["back_month"]
-            
-            return {
-                "spot": spot or 0.0,
-                "front_month": front_month,
-                "back_month": back_month,
-            }
-            
-        except Exception as e:
-            self.log_message.emit(f"⚠️ VIX 조회 실패: {str(e)}")
-            return {"spot": 0.0, "front_month": 0.0, "back_month": 0.0}
+        return self.vix_snapshot.get_snapshot()
     
-    def get_vix_term_structure(self) -> str:
+    def get_vix_term_structure(self, vix_data: Optional[Dict[str, Any]] = None) -> str:
         """
         VIX 기간구조 판단
         
+        Args:
+            vix_data: 이미 조회한 VIX 스냅샷 (없으면 새로 조회)
+        
         Returns:
             "CONTANGO" 또는 "BACKWARDATION"
         """
-        vix_data = self.get_vix_data()
+        if vix_data is None:
+            vix_data = self.get_vix_data()
         
-        front = vix_data["front_month"]
-        back = vix_data["back_month"]
+        # 고정 만기 커브가 있으면 30일 vs 90일, 없으면 근월 vs 원월
+        curve = vix_data.get("curve")
+        if curve is not None:
+            front, back = float(curve[0]), float(curve[-1])
+        else:
+            front = vix_data["front_month"]
+            back = vix_data["back_month"]
         
         # 디버그 로그
         self.log_message.emit(f"📊 VIX Term: front={front:.2f}, back={back:.2f}")
@@ -320,7 +591,7 @@ class MarketDataManager(QThread):
     
     def calculate_z_score(self, window: int = 126) -> float:
         """
-        VIX Z-Score 계산
+        VIX Z-Score 계산 (최근 일봉 종가 기준)
         
         Args:
             window: 계산 기간 (기본 126일 = 6개월)
@@ -329,18 +600,28 @@ class MarketDataManager(QThread):
             Z-Score 값
         """
         try:
-            # VIX 히스토리 조회
-            df = self.get_historical_prices("^VIX", days=window)
+            self._refresh_cache_if_needed()
+            
+            # 롤링 통계가 관리하는 기간이면 O(1) 조회 (갱신과 같은 락 → 일관된 값)
+            if window in self.vix_stats.windows:
+                with self._stats_lock:
+                    if self.vix_stats.count(window) < 20:  # 최소 데이터 필요
+                        return 0.0
+                    current_vix = self.vix_stats.last()
+                    return round(self.vix_stats.z_score(current_vix, window), 2)
             
-            if len(df) < 20:  # 최소 데이터 필요
+            # 그 외 기간은 배열에서 직접 계산 (메모리 캐시)
+            closes = self.get_price_arrays("^VIX", days=window)["close"]
+            
+            if len(closes) < 20:  # 최소 데이터 필요
                 return 0.0
             
             # 현재 VIX
-            current_vix = df["close"].iloc[-1]
+            current_vix = closes[-1]
             
-            # 평균 및 표준편차
-            mean = df["close"].mean()
-            std = df["close"].std()
+            # 평균 및 표준편차 (표본 표준편차, pandas와 동일)
+            mean = closes.mean()
+            std = closes.std(ddof=1)
             
             if std == 0:
                 return 0.0
@@ -348,7 +629,7 @@ class MarketDataManager(QThread):
             # Z-Score 계산
             z_score = (current_vix - mean) / std
             
-            return round(z_score, 2)
+            return round(float(z_score), 2)
             
         except Exception as e:
             self.log_message.emit(f"⚠️ Z-Score 계산 실패: {str(e)}")
@@ -360,44 +641,80 @@ class MarketDataManager(QThread):
     
     def _refresh_cache_if_needed(self) -> bool:
         """
-        일봉 통계 캐시 갱신 (1일 1회)
+        VIX 롤링 통계를 일봉 데이터와 동기화
         
-        평균/표준편차를 하루에 한 번만 계산하여 캐싱합니다.
+        새 일봉 종가가 들어온 경우에만 해당 값들을 push (기간별 O(1)),
+        같은 날 종가만 바뀐 경우에는 마지막 값 교체 (O(1)).
+        DB의 VIX 행이 바뀐 뒤에는 반영된 과거 종가를 1회 대조해서
+        과거 행이 수정된 경우 전체 재초기화합니다.
         
         Returns:
-            True = 캐시 갱신됨, False = 기존 캐시 사용
+            True = 통계 갱신됨, False = 기존 통계 사용
         """
-        today = datetime.now().date()
-        
-        # 캐시가 오늘 날짜면 갱신 불필요
-        if self._cache_date and self._cache_date.date() == today:
-            return False
-        
         try:
-            # VIX 126일 히스토리 조회
-            df = self.get_historical_prices("^VIX", days=126)
+            bars = self.get_price_arrays("^VIX", days=self.vix_stats.windows[-1])
+            dates, closes = bars["date"], bars["close"]
             
-            if len(df) < 20:
-                self.log_message.emit("⚠️ VIX 데이터 부족, 캐시 갱신 실패")
+            if len(closes) == 0:
                 return False
             
-            # 평균/표준편차 캐싱
-            self._cached_mean = df["close"].mean()
-            self._cached_std = df["close"].std()
-            self._cache_date = datetime.now()
-            
-            self.log_message.emit(f"📊 일봉 통계 캐시 갱신: Mean={self._cached_mean:.2f}, Std={self._cached_std:.2f}")
+            with self._stats_lock:
+                revised = self._vix_rows_changed
+                self._vix_rows_changed = False
+                
+                # DB 변경이 없고 이미 최신이면 갱신 불필요
+                if (not revised and self._vix_stats_date is not None
+                        and dates[-1] == self._vix_stats_date
+                        and closes[-1] == self._vix_stats_close):
+                    return False
+                
+                # 마지막 반영 일자 위치 (과거 행이 그대로일 때만 증분)
+                pos = -1
+                if self._vix_stats_date is not None:
+                    found = int(np.searchsorted(dates, self._vix_stats_date))
+                    if found < len(dates) and dates[found] == self._vix_stats_date \
+                            and (not revised or self._vix_history_matches(closes[:found])):
+                        pos = found
+                
+                if pos < 0:
+                    self.vix_stats.seed(closes)
+                else:
+                    if closes[pos] != self._vix_stats_close:
+                        self.vix_stats.replace_last(closes[pos])   # 같은 날 종가 수정
+                    for close in closes[pos + 1:]:
+                        self.vix_stats.push(close)
+                
+                self._vix_stats_date = dates[-1]
+                self._vix_stats_close = float(closes[-1])
+                
+                if self.vix_stats.count(126) < 20:
+                    self.log_message.emit("⚠️ VIX 데이터 부족, 캐시 갱신 실패")
+                    self._cached_mean = None
+                    self._cached_std = None
+                    return False
+                
+                # 하이브리드 Z-Score용 126일 통계
+                mean = self._cached_mean = self.vix_stats.mean(126)
+                std = self._cached_std = self.vix_stats.std(126)
+            
+            self.log_message.emit(f"📊 일봉 통계 캐시 갱신: Mean={mean:.2f}, Std={std:.2f}")
             return True
             
         except Exception as e:
             self.log_message.emit(f"⚠️ 캐시 갱신 실패: {str(e)}")
             return False
     
+    def _vix_history_matches(self, closes: np.ndarray) -> bool:
+        """반영된 종가(마지막 제외)가 DB의 과거 종가와 같은지 (_stats_lock 안에서 호출)"""
+        kept = self.vix_stats.values()[:-1]
+        n = min(len(kept), len(closes))
+        return n == 0 or np.array_equal(np.asarray(kept[len(kept) - n:]), closes[len(closes) - n:])
+    
     def calculate_z_score_hybrid(self, realtime_vix: float) -> float:
         """
         하이브리드 Z-Score 계산
         
-        일봉 통계(캐시됨) + 실시간 VIX로 Z-Score 계산
+        일봉 통계(롤링, 캐시됨) + 실시간 VIX로 Z-Score 계산
         
         Args:
             realtime_vix: 실시간 VIX 가격
@@ -405,19 +722,39 @@ class MarketDataManager(QThread):
         Returns:
             Z-Score 값
         """
-        # 캐시 확인/갱신
+        # 캐시 확인/갱신 (새 일봉이 있을 때만 실제 갱신)
         self._refresh_cache_if_needed()
         
+        # 평균/표준편차는 갱신과 같은 락에서 함께 읽기 (다른 갱신의 값이 섞이지 않도록)
+        with self._stats_lock:
+            mean, std = self._cached_mean, self._cached_std
+        
         # 캐시가 없으면 기존 방식 사용
-        if self._cached_mean is None or self._cached_std is None:
+        if mean is None or std is None:
             return self.calculate_z_score()
         
-        if self._cached_std == 0:
+        if std == 0:
             return 0.0
         
-        z_score = (realtime_vix - self._cached_mean) / self._cached_std
+        z_score = (realtime_vix - mean) / std
         return round(z_score, 2)
     
+    def get_vix_multi_window(self, realtime_vix: float) -> Dict[int, Dict[str, float]]:
+        """
+        다중 기간 VIX 통계 (21/63/126/252일)
+        
+        한 번의 롤링 갱신으로 모든 기간 통계를 함께 제공합니다.
+        
+        Args:
+            realtime_vix: 실시간 VIX 가격
+            
+        Returns:
+            {window: {"mean", "std", "z_score", "percentile"}}
+        """
+        self._refresh_cache_if_needed()
+        with self._stats_lock:
+            return self.vix_stats.snapshot(realtime_vix)
+    
     def should_update_on_vix_change(self, current_vix: float) -> bool:
         """
         VIX 변동 시 즉시 업데이트 필요 여부
@@ -465,10 +802,12 @@ class MarketDataManager(QThread):
             # 증분 업데이트
             self.update_historical_data()
             
-            # VIX 데이터 전송
+            # VIX 데이터 전송 (실시간 틱 전이면 폴백 1회, 백그라운드 스레드)
+            if self.vix_snapshot.is_spot_stale():
+                self.vix_snapshot.refresh_fallback()
             vix_data = self.get_vix_data()
             vix_data["z_score"] = self.calculate_z_score()
-            vix_data["term_structure"] = self.get_vix_term_structure()
+            vix_data["term_structure"] = self.get_vix_term_structure(vix_data)
             self.vix_update.emit(vix_data)
             
             self.data_ready.emit("ALL")
@@ -481,8 +820,9 @@ class MarketDataManager(QThread):
     def stop(self) -> None:
         """스레드 중지"""
         self._is_running = False
-        if self.conn:
-            self.conn.close()
+        if self.vix_snapshot.isRunning():
+            self.vix_snapshot.stop()
+        self.db.close()
         self.wait(5000)
     
     # ============================================
@@ -504,22 +844,10 @@ class MarketDataManager(QThread):
             ATR 값 (소수점)
         """
         try:
-            df = self.get_historical_prices(symbol, days=period + 5)
-            
-            if len(df) < period:
-                return 0.0
-            
-            # True Range 계산
-            df["prev_close"] = df["close"].shift(1)
-            df["tr1"] = df["high"] - df["low"]
-            df["tr2"] = abs(df["high"] - df["prev_close"])
-            df["tr3"] = abs(df["low"] - df["prev_close"])
-            df["tr"] = df[["tr1", "tr2", "tr3"]].max(axis=1)
-            
-            # ATR = TR의 이동평균
-            atr = df["tr"].tail(period).mean()
+            # ATR = TR의 이동평균 (지표 파이프라인, 봉당 1회 계산)
+            atr = self.indicators.get(symbol, "atr", period)
             
-            return round(atr, 4)
+            return 0.0 if np.isnan(atr) else round(float(atr), 4)
             
         except Exception as e:
             self.log_message.emit(f"⚠️ ATR 계산 실패: {str(e)}")
@@ -538,25 +866,26 @@ class MarketDataManager(QThread):
         Returns:
             {"mean": float, "std": float}
         """
-        # 캐시 확인
+        # 롤링 통계 동기화
         self._refresh_cache_if_needed()
         
-        if self._cached_mean is not None and self._cached_std is not None:
-            return {
-                "mean": round(self._cached_mean, 2),
-                "std": round(self._cached_std, 2)
-            }
+        with self._stats_lock:
+            if window in self.vix_stats.windows and self.vix_stats.count(window) >= 20:
+                return {
+                    "mean": round(self.vix_stats.mean(window), 2),
+                    "std": round(self.vix_stats.std(window), 2)
+                }
         
         # 캐시가 없으면 직접 계산
         try:
-            df = self.get_historical_prices("^VIX", days=window)
+            closes = self.get_price_arrays("^VIX", days=window)["close"]
             
-            if len(df) < 20:
+            if len(closes) < 20:
                 return {"mean": 20.0, "std": 5.0}  # 기본값
             
             return {
-                "mean": round(df["close"].mean(), 2),
-                "std": round(df["close"].std(), 2)
+                "mean": round(float(closes.mean()), 2),
+                "std": round(float(closes.std(ddof=1)), 2)
             }
         except Exception:
             return {"mean": 20.0, "std": 5.0}
@@ -575,22 +904,21 @@ class MarketDataManager(QThread):
             변동폭 % (예: 0.015 = 1.5%)
         """
         try:
-            df = self.get_historical_prices(symbol, days=2)
+            bars = self.get_price_arrays(symbol, days=1)
             
-            if len(df) < 1:
+            if len(bars["close"]) < 1:
                 return 0.01  # 기본값 1%
             
-            latest = df.iloc[-1]
-            open_price = latest["open"]
-            high = latest["high"]
-            low = latest["low"]
+            open_price = bars["open"][-1]
+            high = bars["high"][-1]
+            low = bars["low"][-1]
             
             if open_price == 0:
                 return 0.01
             
             range_pct = (high - low) / open_price
             
-            return round(range_pct, 4)
+            return round(float(range_pct), 4)
             
         except Exception:
             return 0.01
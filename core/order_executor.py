@@ -7,18 +7,27 @@ IBKR API를 통해 실제 주문을 전송하고 관리합니다.
 ⚠️ 핵심 규칙:
 - 모든 주문은 approve_order() 통과 필수!
 - 실패 시 3회 재시도, 이후 팝업 알림
+
+스레드:
+- IB 객체를 직접 호출하지 않고 IBKRBridge.submit()으로 명령 전달
+- 주문 결과(Future)는 내부 시그널로 메인 스레드에 돌아와 처리
+- IB 주문/체결/포지션 이벤트도 내부 시그널로 메인 스레드에 넘겨 처리
+  (_pending_orders는 메인 스레드에서만 수정)
 ============================================
 """
 
 # ============================================
 # 필수 라이브러리 임포트
 # ============================================
+from concurrent.futures import Future
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from ib_insync import IB, Stock, MarketOrder, LimitOrder, Order, Trade
+from ib_insync import MarketOrder, LimitOrder, Order, Trade
 from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtWidgets import QMessageBox
 
+from core.ib_commands import PlaceOrder, CancelOrder, OpenOrders, Positions
+
 
 class OrderExecutor(QObject):
     """
@@ -38,51 +47,80 @@ class OrderExecutor(QObject):
     position_update = pyqtSignal(dict)   # 포지션 변경 {symbol, position, avg_cost}
     log_message = pyqtSignal(str)        # 로그 메시지
     
+    # 내부: 브릿지 루프에서 끝난 주문 Future → 메인 스레드로 전달
+    _order_done = pyqtSignal(object, object)   # (주문 정보 dict, Future)
+    
+    # 내부: 브릿지 루프의 IB 이벤트 → 메인 스레드로 전달 (값은 발생 시점 스냅샷)
+    _status_event = pyqtSignal(object, str, float, float)   # (Trade, 상태, 평균 체결가, 체결 수량)
+    _exec_event = pyqtSignal(object, object)                # (Trade, Fill)
+    _position_event = pyqtSignal(object)                    # Position
+    
     # === 상수 ===
     MAX_RETRY = 3                        # 최대 재시도 횟수
+    QUERY_TIMEOUT = 5.0                  # 조회 요청 대기 (초, 핫 패스 아님)
     
-    def __init__(self, ib: Optional[IB] = None, risk_manager=None, parent=None) -> None:
+    def __init__(self, bridge=None, risk_manager=None, parent=None) -> None:
         """
         초기화
         
         Args:
-            ib: IBKRBridge에서 전달받은 IB 객체
+            bridge: IBKRBridge (요청은 bridge.submit()으로 전달)
             risk_manager: RiskManager 인스턴스 (approve_order용)
             parent: 부모 QObject
         """
         super().__init__(parent)
-        self.ib = ib
+        self.bridge = None
         self.risk_manager = risk_manager
         
         # 주문 추적
         self._pending_orders: Dict[int, Trade] = {}
         
+        self._order_done.connect(self._on_order_done)
+        self._status_event.connect(self._on_order_status)
+        self._exec_event.connect(self._on_exec_details)
+        self._position_event.connect(self._on_position)
+        
         # IB 이벤트 연결
-        if self.ib:
-            self._connect_ib_events()
+        if bridge is not None:
+            self.set_bridge(bridge)
     
-    def set_ib(self, ib: IB) -> None:
+    def set_bridge(self, bridge) -> None:
         """
-        IB 객체 설정 (나중에 연결될 경우)
+        브릿지 설정 (연결된 뒤 호출)
         
         Args:
-            ib: IB 객체
+            bridge: IBKRBridge
         """
-        self.ib = ib
+        self.bridge = bridge
         self._connect_ib_events()
         self.log_message.emit("✅ OrderExecutor: IB 연결됨")
     
     def _connect_ib_events(self) -> None:
-        """IB 이벤트 핸들러 연결"""
-        if not self.ib:
+        """
+        IB 이벤트 연결
+        
+        콜백은 브릿지 루프 스레드에서 호출되므로 상태를 직접 만지지 않고
+        내부 시그널로 메인 스레드에 넘깁니다 (큐 연결).
+        """
+        ib = self.bridge.ib if self.bridge else None
+        if not ib:
             return
         
         # 주문 상태 이벤트
-        self.ib.orderStatusEvent += self._on_order_status
+        ib.orderStatusEvent += self._relay_order_status
         # 체결 이벤트
-        self.ib.execDetailsEvent += self._on_exec_details
+        ib.execDetailsEvent += self._exec_event.emit
         # 포지션 이벤트
-        self.ib.positionEvent += self._on_position
+        ib.positionEvent += self._position_event.emit
+    
+    def _relay_order_status(self, trade: Trade) -> None:
+        """주문 상태 이벤트 → 메인 스레드 (브릿지 루프 스레드, 상태 값은 지금 복사)"""
+        status = trade.orderStatus
+        self._status_event.emit(trade, status.status, float(status.avgFillPrice), float(status.filled))
+    
+    def _is_connected(self) -> bool:
+        """브릿지 연결 여부"""
+        return self.bridge is not None and self.bridge.is_connected()
     
     # ============================================
     # 주문 전송 메서드
@@ -96,7 +134,7 @@ class OrderExecutor(QObject):
         kill_status: str = "CLEAR",
         daily_loss: float = 0.0,
         account_balance: float = 0.0
-    ) -> Optional[Trade]:
+    ) -> Optional[Future]:
         """
         시장가 주문 전송
         
@@ -109,7 +147,7 @@ class OrderExecutor(QObject):
             account_balance: 계좌 잔고
             
         Returns:
-            Trade 객체 또는 None (실패 시)
+            브릿지 Future (결과: Trade) 또는 None (거부/미연결 시)
         """
         # === 1. approve_order 체크 (필수!) ===
         if self.risk_manager:
@@ -124,56 +162,19 @@ class OrderExecutor(QObject):
                 return None
         
         # === 2. IB 연결 확인 ===
-        if not self.ib or not self.ib.isConnected():
+        if not self._is_connected():
             self.log_message.emit("❌ IBKR 연결 안됨")
             return None
         
-        # === 3. 주문 실행 (재시도 로직) ===
-        for attempt in range(1, self.MAX_RETRY + 1):
-            try:
-                # 계약 생성 (미국 주식 기본)
-                contract = Stock(symbol, "SMART", "USD")
-                
-                # 시장가 주문
-                order = MarketOrder(action, quantity)
-                
-                # 주문 전송
-                trade = self.ib.placeOrder(contract, order)
-                
-                # 주문 추적에 추가
-                self._pending_orders[trade.order.orderId] = trade
-                
-                self.log_message.emit(
-                    f"📤 시장가 주문 전송: {action} {quantity} {symbol} (ID: {trade.order.orderId})"
-                )
-                
-                self.order_placed.emit({
-                    "order_id": trade.order.orderId,
-                    "symbol": symbol,
-                    "action": action,
-                    "quantity": quantity,
-                    "order_type": "MKT",
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-                return trade
-                
-            except Exception as e:
-                self.log_message.emit(
-                    f"⚠️ 주문 실패 (시도 {attempt}/{self.MAX_RETRY}): {str(e)}"
-                )
-                
-                if attempt == self.MAX_RETRY:
-                    # 3회 실패 → 팝업 알림
-                    self._show_failure_popup(symbol, action, quantity, str(e))
-                    self.order_failed.emit({
-                        "order_id": None,
-                        "reason": f"3회 실패: {str(e)}",
-                        "symbol": symbol,
-                        "action": action
-                    })
-        
-        return None
+        # === 3. 주문 제출 (결과/재시도는 _on_order_done) ===
+        return self._submit_order({
+            "symbol": symbol,
+            "action": action,
+            "quantity": quantity,
+            "order_type": "MKT",
+            "make_order": lambda: MarketOrder(action, quantity),
+            "attempt": 1,
+        })
     
     def place_limit_order(
         self, 
@@ -184,7 +185,7 @@ class OrderExecutor(QObject):
         kill_status: str = "CLEAR",
         daily_loss: float = 0.0,
         account_balance: float = 0.0
-    ) -> Optional[Trade]:
+    ) -> Optional[Future]:
         """
         지정가 주문 전송
         
@@ -198,7 +199,7 @@ class OrderExecutor(QObject):
             account_balance: 계좌 잔고
             
         Returns:
-            Trade 객체 또는 None (실패 시)
+            브릿지 Future (결과: Trade) 또는 None (거부/미연결 시)
         """
         # === 1. approve_order 체크 ===
         if self.risk_manager:
@@ -207,42 +208,88 @@ class OrderExecutor(QObject):
                 return None
         
         # === 2. IB 연결 확인 ===
-        if not self.ib or not self.ib.isConnected():
+        if not self._is_connected():
             self.log_message.emit("❌ IBKR 연결 안됨")
             return None
         
-        # === 3. 주문 실행 ===
-        for attempt in range(1, self.MAX_RETRY + 1):
-            try:
-                contract = Stock(symbol, "SMART", "USD")
-                order = LimitOrder(action, quantity, price)
-                trade = self.ib.placeOrder(contract, order)
-                
-                self._pending_orders[trade.order.orderId] = trade
-                
-                self.log_message.emit(
-                    f"📤 지정가 주문 전송: {action} {quantity} {symbol} @ ${price:.2f}"
-                )
-                
-                self.order_placed.emit({
-                    "order_id": trade.order.orderId,
-                    "symbol": symbol,
-                    "action": action,
-                    "quantity": quantity,
-                    "order_type": "LMT",
-                    "price": price,
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-                return trade
-                
-            except Exception as e:
-                self.log_message.emit(f"⚠️ 지정가 주문 실패 (시도 {attempt}): {str(e)}")
-                
-                if attempt == self.MAX_RETRY:
-                    self._show_failure_popup(symbol, action, quantity, str(e))
-        
-        return None
+        # === 3. 주문 제출 ===
+        return self._submit_order({
+            "symbol": symbol,
+            "action": action,
+            "quantity": quantity,
+            "order_type": "LMT",
+            "price": price,
+            "make_order": lambda: LimitOrder(action, quantity, price),
+            "attempt": 1,
+        })
+    
+    def _submit_order(self, request: Dict[str, Any]) -> Future:
+        """
+        주문 명령을 브릿지 대기열에 제출 (기다리지 않음)
+        
+        Args:
+            request: {symbol, action, quantity, order_type, make_order, attempt, [price]}
+        
+        Returns:
+            브릿지 Future (결과: Trade)
+        """
+        contract = self.bridge.contracts.contract(request["symbol"])   # 확인된 캐시 계약
+        future = self.bridge.submit(PlaceOrder(contract, request["make_order"]()))
+        future.add_done_callback(lambda f: self._order_done.emit(request, f))
+        return future
+    
+    def _on_order_done(self, request: Dict[str, Any], future: Future) -> None:
+        """주문 제출 결과 처리 (메인 스레드)"""
+        symbol = request["symbol"]
+        action = request["action"]
+        quantity = request["quantity"]
+        attempt = request["attempt"]
+        
+        error = future.exception()
+        if error is not None:
+            self.log_message.emit(
+                f"⚠️ 주문 실패 (시도 {attempt}/{self.MAX_RETRY}): {str(error)}"
+            )
+            
+            if attempt < self.MAX_RETRY and self._is_connected():
+                # 새 주문 객체로 재시도
+                self._submit_order(dict(request, attempt=attempt + 1))
+                return
+            
+            # 3회 실패 → 팝업 알림
+            self._show_failure_popup(symbol, action, quantity, str(error))
+            self.order_failed.emit({
+                "order_id": None,
+                "reason": f"{attempt}회 실패: {str(error)}",
+                "symbol": symbol,
+                "action": action
+            })
+            return
+        
+        # 주문 추적에 추가
+        trade: Trade = future.result()
+        self._pending_orders[trade.order.orderId] = trade
+        
+        if request["order_type"] == "LMT":
+            self.log_message.emit(
+                f"📤 지정가 주문 전송: {action} {quantity} {symbol} @ ${request['price']:.2f}"
+            )
+        else:
+            self.log_message.emit(
+                f"📤 시장가 주문 전송: {action} {quantity} {symbol} (ID: {trade.order.orderId})"
+            )
+        
+        placed = {
+            "order_id": trade.order.orderId,
+            "symbol": symbol,
+            "action": action,
+            "quantity": quantity,
+            "order_type": request["order_type"],
+            "timestamp": datetime.now().isoformat()
+        }
+        if "price" in request:
+            placed["price"] = request["price"]
+        self.order_placed.emit(placed)
     
     # ============================================
     # 주문 관리 메서드
@@ -258,7 +305,7 @@ class OrderExecutor(QObject):
         Returns:
             성공 여부
         """
-        if not self.ib or not self.ib.isConnected():
+        if not self._is_connected():
             return False
         
         trade = self._pending_orders.get(order_id)
@@ -266,38 +313,47 @@ class OrderExecutor(QObject):
             self.log_message.emit(f"⚠️ 주문 ID {order_id}를 찾을 수 없음")
             return False
         
-        try:
-            self.ib.cancelOrder(trade.order)
-            self.log_message.emit(f"🚫 주문 취소 요청: ID {order_id}")
-            return True
-        except Exception as e:
-            self.log_message.emit(f"❌ 주문 취소 실패: {str(e)}")
-            return False
+        future = self.bridge.submit(CancelOrder(trade.order))
+        future.add_done_callback(
+            lambda f: f.exception() and self.log_message.emit(f"❌ 주문 취소 실패: {str(f.exception())}")
+        )
+        self.log_message.emit(f"🚫 주문 취소 요청: ID {order_id}")
+        return True
     
-    def get_open_orders(self) -> List[Trade]:
+    def get_open_orders(self) -> List[Order]:
         """
-        미체결 주문 목록 조회
+        미체결 주문 목록 조회 (브릿지 왕복 대기 → 핫 패스에서 호출 금지)
         
         Returns:
-            미체결 주문 리스트
+            미체결 주문(Order) 리스트
         """
-        if not self.ib or not self.ib.isConnected():
+        if not self._is_connected():
             return []
         
-        return self.ib.openOrders()
+        try:
+            return self.bridge.submit(OpenOrders()).result(self.QUERY_TIMEOUT)
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 미체결 주문 조회 실패: {str(e)}")
+            return []
     
     def get_positions(self) -> Dict[str, Dict[str, Any]]:
         """
-        현재 보유 포지션 조회
+        현재 보유 포지션 조회 (브릿지 왕복 대기 → 핫 패스에서 호출 금지)
         
         Returns:
             {symbol: {position, avg_cost, market_value}} 형태 딕셔너리
         """
-        if not self.ib or not self.ib.isConnected():
+        if not self._is_connected():
+            return {}
+        
+        try:
+            ib_positions = self.bridge.submit(Positions()).result(self.QUERY_TIMEOUT)
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 포지션 조회 실패: {str(e)}")
             return {}
         
         positions = {}
-        for pos in self.ib.positions():
+        for pos in ib_positions:
             symbol = pos.contract.symbol
             positions[symbol] = {
                 "position": pos.position,
@@ -307,13 +363,36 @@ class OrderExecutor(QObject):
         
         return positions
     
+    def on_reconciled(self, state: Dict[str, Any]) -> None:
+        """
+        재연결 후 주문/포지션 대조 (bridge.reconciled)
+        
+        Args:
+            state: {"open_trades": [Trade, ...], "positions": [Position, ...]}
+        """
+        open_trades = state.get("open_trades", [])
+        live_ids = {trade.order.orderId for trade in open_trades}
+        
+        # 끊긴 동안 체결/취소된 주문은 추적에서 제거
+        for order_id in list(self._pending_orders):
+            if order_id not in live_ids:
+                self._pending_orders.pop(order_id, None)
+                self.log_message.emit(f"🧾 주문 ID {order_id}: 재연결 시 미체결 목록에 없음 → 추적 종료")
+        
+        # 서버 기준 미체결 주문으로 갱신 (다른 세션에서 낸 주문 포함)
+        for trade in open_trades:
+            self._pending_orders[trade.order.orderId] = trade
+        
+        for position in state.get("positions", []):
+            self._on_position(position)
+    
     # ============================================
     # IB 이벤트 핸들러
     # ============================================
     
-    def _on_order_status(self, trade: Trade) -> None:
-        """주문 상태 변경 이벤트"""
-        status = trade.orderStatus.status
+    def _on_order_status(self, trade: Trade, status: str,
+                         avg_fill_price: float, filled: float) -> None:
+        """주문 상태 변경 이벤트 (메인 스레드)"""
         order_id = trade.order.orderId
         
         self.log_message.emit(f"📊 주문 상태: ID {order_id} → {status}")
@@ -322,8 +401,8 @@ class OrderExecutor(QObject):
             # 완전 체결
             self.order_filled.emit({
                 "order_id": order_id,
-                "fill_price": trade.orderStatus.avgFillPrice,
-                "filled_qty": trade.orderStatus.filled,
+                "fill_price": avg_fill_price,
+                "filled_qty": filled,
                 "symbol": trade.contract.symbol
             })
             # 추적에서 제거
@@ -334,13 +413,13 @@ class OrderExecutor(QObject):
             self._pending_orders.pop(order_id, None)
     
     def _on_exec_details(self, trade: Trade, fill) -> None:
-        """체결 상세 이벤트"""
+        """체결 상세 이벤트 (메인 스레드)"""
         self.log_message.emit(
             f"💰 체결: {fill.execution.side} {fill.execution.shares} @ ${fill.execution.price:.2f}"
         )
     
     def _on_position(self, position) -> None:
-        """포지션 변경 이벤트"""
+        """포지션 변경 이벤트 (메인 스레드)"""
         self.position_update.emit({
             "symbol": position.contract.symbol,
             "position": position.position,
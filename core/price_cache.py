@@ -0,0 +1,129 @@
+"""
+============================================
+가격 캐시 - 심볼별 메모리 컬럼 배열
+============================================
+- 심볼별 OHLCV를 연속된 NumPy 배열로 1회 로드
+- 조회는 슬라이스 뷰 (복사 없음, SQL 파싱 없음)
+- update_historical_data()가 행을 추가할 때만 무효화
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import threading
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+# 캐시 컬럼 (date: datetime64[D], 나머지: 숫자)
+PRICE_COLUMNS = ("date", "open", "high", "low", "close", "volume")
+
+
+class PriceCache:
+    """
+    심볼별 OHLCV 메모리 캐시
+    
+    loader(symbol)는 PRICE_COLUMNS 키를 가진 배열 딕셔너리를
+    날짜 오름차순으로 반환해야 합니다.
+    
+    사용법:
+        cache = PriceCache(loader)
+        bars = cache.get("SPY", days=30)   # {"close": ndarray(view), ...}
+        cache.invalidate("SPY")            # DB 갱신 후
+    """
+    
+    def __init__(self, loader: Callable[[str], Dict[str, np.ndarray]]) -> None:
+        """
+        초기화
+        
+        Args:
+            loader: 심볼 → 컬럼 배열 딕셔너리 (DB에서 1회 로드)
+        """
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._series: Dict[str, Dict[str, np.ndarray]] = {}
+    
+    def get(self, symbol: str, days: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        최근 days개 봉 조회 (읽기 전용 뷰)
+        
+        Args:
+            symbol: 심볼
+            days: 조회 개수 (None이면 전체)
+        
+        Returns:
+            {"date", "open", "high", "low", "close", "volume"} 배열 뷰
+        """
+        series = self._series.get(symbol)
+        if series is None:
+            series = self._load(symbol)
+        
+        if days is None:
+            return dict(series)
+        return {col: arr[-days:] if days > 0 else arr[:0] for col, arr in series.items()}
+    
+    def _load(self, symbol: str) -> Dict[str, np.ndarray]:
+        """DB에서 1회 로드 (스레드 간 중복 로드 방지)"""
+        with self._lock:
+            series = self._series.get(symbol)
+            if series is not None:
+                return series
+            
+            raw = self._loader(symbol)
+            series = {}
+            for col in PRICE_COLUMNS:
+                arr = np.ascontiguousarray(raw[col])
+                arr.flags.writeable = False   # 뷰를 받은 쪽에서 수정 금지
+                series[col] = arr
+            
+            self._series[symbol] = series
+            return series
+    
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """
+        캐시 무효화 (다음 조회 시 다시 로드)
+        
+        Args:
+            symbol: 무효화할 심볼 (None이면 전체)
+        """
+        with self._lock:
+            if symbol is None:
+                self._series.clear()
+            else:
+                self._series.pop(symbol, None)
+    
+    def is_loaded(self, symbol: str) -> bool:
+        """심볼이 메모리에 로드되어 있는지 확인"""
+        return symbol in self._series
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    calls = []
+    
+    def fake_loader(symbol: str) -> Dict[str, np.ndarray]:
+        calls.append(symbol)
+        n = 10
+        return {
+            "date": np.arange(np.datetime64("2024-01-01"), np.datetime64("2024-01-11")),
+            "open": np.arange(n, dtype=float),
+            "high": np.arange(n, dtype=float) + 1,
+            "low": np.arange(n, dtype=float) - 1,
+            "close": np.arange(n, dtype=float) + 0.5,
+            "volume": np.full(n, 1000, dtype=np.int64),
+        }
+    
+    cache = PriceCache(fake_loader)
+    bars = cache.get("SPY", days=3)
+    print(f"최근 3일 종가: {bars['close']}")
+    print(f"뷰 여부: {bars['close'].base is not None}")
+    
+    cache.get("SPY", days=5)
+    print(f"로더 호출 횟수: {len(calls)} (1회 예상)")
+    
+    cache.invalidate("SPY")
+    cache.get("SPY")
+    print(f"무효화 후 로더 호출 횟수: {len(calls)} (2회 예상)")
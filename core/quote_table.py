@@ -0,0 +1,230 @@
+"""
+============================================
+시세 테이블 - 심볼별 최신 호가 (NumPy 구조화 배열)
+============================================
+- 심볼마다 정수 ID를 부여하고 구조화 배열의 한 행에 최신 시세 보관
+  (bid/ask/last/size/volume/ts, 심볼당 48바이트)
+- 브릿지는 틱마다 해당 행을 제자리 갱신 (틱 경로에서 객체 생성 없음)
+- 소비자는 심볼별로 1회 만든 QuoteView(__slots__)로 읽기
+- 행 추가(구독)는 드물게 발생 → 용량이 차면 2배로 확장
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 행 구조 (심볼당 48바이트)
+QUOTE_DTYPE = np.dtype([
+    ("bid", "<f8"),
+    ("ask", "<f8"),
+    ("last", "<f8"),
+    ("size", "<f8"),      # 마지막 체결 수량
+    ("volume", "<f8"),    # 당일 누적 거래량
+    ("ts", "<f8"),        # 마지막 틱 시각 (epoch 초)
+])
+
+
+class QuoteView:
+    """
+    심볼 1개의 시세 읽기 전용 뷰 (테이블 행을 직접 참조)
+    
+    사용법:
+        spy = table.view("SPY")
+        price = spy.last
+    """
+    
+    __slots__ = ("_table", "sid", "symbol")
+    
+    def __init__(self, table: "QuoteTable", sid: int, symbol: str) -> None:
+        self._table = table
+        self.sid = sid
+        self.symbol = symbol
+    
+    @property
+    def bid(self) -> float:
+        return float(self._table.bid[self.sid])
+    
+    @property
+    def ask(self) -> float:
+        return float(self._table.ask[self.sid])
+    
+    @property
+    def last(self) -> float:
+        return float(self._table.last[self.sid])
+    
+    @property
+    def size(self) -> float:
+        return float(self._table.size[self.sid])
+    
+    @property
+    def volume(self) -> float:
+        return float(self._table.volume[self.sid])
+    
+    @property
+    def ts(self) -> float:
+        return float(self._table.ts[self.sid])
+    
+    def __repr__(self) -> str:
+        return (f"QuoteView({self.symbol}, bid={self.bid}, ask={self.ask}, "
+                f"last={self.last}, volume={self.volume})")
+
+
+class QuoteTable:
+    """
+    심볼별 최신 시세 테이블
+    
+    사용법:
+        table = QuoteTable()
+        sid = table.register("SPY")                   # 구독 시 1회
+        table.update(sid, bid, ask, last, size, volume, ts)   # 틱마다 (제자리)
+        table.view("SPY").last                        # 소비자
+    
+    스레드:
+        쓰기(update/register)는 락으로 직렬화합니다.
+        읽기는 필드 단위로만 원자적이며, 행 전체의 일관성은 보장하지 않습니다.
+    """
+    
+    def __init__(self, capacity: int = 64) -> None:
+        """
+        초기화
+        
+        Args:
+            capacity: 초기 심볼 수 (넘으면 2배로 확장)
+        """
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._views: List[QuoteView] = []
+        self._allocate(max(1, capacity))
+    
+    def _allocate(self, capacity: int) -> None:
+        """행 배열 (재)할당 + 컬럼 뷰 갱신 (락 안에서 호출)"""
+        rows = np.zeros(capacity, dtype=QUOTE_DTYPE)
+        if hasattr(self, "rows"):
+            rows[:len(self.rows)] = self.rows
+        self.rows = rows
+        
+        # 컬럼 뷰 (구조화 배열의 필드 뷰, 복사 없음)
+        self.bid = rows["bid"]
+        self.ask = rows["ask"]
+        self.last = rows["last"]
+        self.size = rows["size"]
+        self.volume = rows["volume"]
+        self.ts = rows["ts"]
+    
+    # ============================================
+    # 심볼 등록 / 조회
+    # ============================================
+    
+    def register(self, symbol: str) -> int:
+        """
+        심볼 등록 (이미 있으면 기존 ID)
+        
+        Returns:
+            심볼 ID (행 번호)
+        """
+        with self._lock:
+            sid = self._ids.get(symbol)
+            if sid is not None:
+                return sid
+            
+            sid = len(self._symbols)
+            if sid >= len(self.rows):
+                self._allocate(len(self.rows) * 2)
+            
+            self._ids[symbol] = sid
+            self._symbols.append(symbol)
+            self._views.append(QuoteView(self, sid, symbol))
+            return sid
+    
+    def symbol_id(self, symbol: str) -> Optional[int]:
+        """심볼 → ID (미등록이면 None)"""
+        return self._ids.get(symbol)
+    
+    def symbol(self, sid: int) -> str:
+        """ID → 심볼"""
+        return self._symbols[sid]
+    
+    def symbols(self) -> List[str]:
+        """등록된 심볼 목록 (ID 순)"""
+        return list(self._symbols)
+    
+    def view(self, symbol: str) -> QuoteView:
+        """심볼 뷰 (없으면 등록, 같은 심볼은 항상 같은 객체)"""
+        sid = self._ids.get(symbol)
+        if sid is None:
+            sid = self.register(symbol)
+        return self._views[sid]
+    
+    def view_by_id(self, sid: int) -> QuoteView:
+        """ID 뷰"""
+        return self._views[sid]
+    
+    def __len__(self) -> int:
+        return len(self._symbols)
+    
+    # ============================================
+    # 갱신 (틱 경로)
+    # ============================================
+    
+    def update(self, sid: int, bid: float, ask: float, last: float,
+               size: float, volume: float, ts: float) -> None:
+        """
+        행 제자리 갱신 (NaN/None 값은 기존 값 유지)
+        
+        Args:
+            sid: 심볼 ID
+            bid, ask, last: 호가/체결가
+            size: 마지막 체결 수량
+            volume: 당일 누적 거래량
+            ts: 틱 시각 (epoch 초)
+        """
+        with self._lock:
+            if bid and bid == bid:
+                self.bid[sid] = bid
+            if ask and ask == ask:
+                self.ask[sid] = ask
+            if last and last == last:
+                self.last[sid] = last
+            if size and size == size:
+                self.size[sid] = size
+            if volume and volume == volume:
+                self.volume[sid] = volume
+            if ts:
+                self.ts[sid] = ts
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import tracemalloc
+    
+    table = QuoteTable(capacity=2)
+    spy = table.register("SPY")
+    table.register("QQQ")
+    table.register("VIX")   # 용량 2 → 4로 확장
+    
+    view = table.view("SPY")
+    table.update(spy, 499.9, 500.1, 500.0, 100, 1_000_000, 1_700_000_000.0)
+    print(f"SPY 뷰: {view}")
+    print(f"같은 뷰 객체: {table.view('SPY') is view}")
+    print(f"심볼당 메모리: {QUOTE_DTYPE.itemsize}바이트 (48 예상)")
+    
+    # 틱 경로 할당 측정
+    price = 500.25
+    table.update(spy, price, price, price, 1.0, 1.0, 1.0)   # 워밍업
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(10_000):
+        table.update(spy, price, price, price, 1.0, 1.0, 1.0)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename")
+                 if stat.traceback[0].filename == __file__)
+    print(f"10,000틱 누적 할당 증가: {growth}바이트 (0 근처 예상)")
@@ -3,6 +3,9 @@
 레짐 판단 로직 (Regime Detector)
 ============================================
 VIX Z-Score, KER, ADX를 사용하여 시장 레짐을 판단합니다.
+KER/ADX는 core/indicators.py의 순수 NumPy 계산기 사용 (pandas-ta 미사용).
+일봉이 추가/갱신될 때만 증분 반영 (KER 여러 기간 동시, 기간별 O(1)).
+레짐 전환은 RegimeStateMachine(히스테리시스 + 확인 횟수 + 최소 체류)으로 확정.
 
 레짐 종류:
 - GREEN: 평균회귀 (저변동성, 횡보)
@@ -14,13 +17,18 @@ VIX Z-Score, KER, ADX를 사용하여 시장 레짐을 판단합니다.
 # ============================================
 # 필수 라이브러리 임포트
 # ============================================
-from typing import Optional, List
+import math
+from typing import Dict, Optional, List, Tuple
 
 import numpy as np
-import pandas as pd
-import pandas_ta as ta
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from core.indicators import StreamingKER, WilderADX, adx_batch, ker_batch
+from core.regime_state_machine import RegimeStateMachine, RegimeTransition
+
+# 레짐 코드 (봉별 라벨 저장용, 인덱스 = 코드)
+REGIME_NAMES = ("횡보", "상승", "위기")
+
 
 class RegimeDetector(QObject):
     """
@@ -44,10 +52,28 @@ class RegimeDetector(QObject):
     KER_THRESHOLD = 0.3         # 골디락스 KER 임계값
     ADX_THRESHOLD = 25          # 골디락스 ADX 임계값
     
+    # === KER 기간 (가격 개수) ===
+    KER_PERIOD = 20             # 레짐 판단용
+    KER_PERIODS = (10, 20, 60)  # 함께 추적하는 기간
+    
     def __init__(self, parent=None) -> None:
         """초기화"""
         super().__init__(parent)
         self._current_regime: str = "횡보"  # 기본값 (저변동성)
+        
+        # --- 전환 상태 머신 (임계값 근처 흔들림 억제) ---
+        self.state_machine = RegimeStateMachine(
+            z_black=self.Z_THRESHOLD_BLACK,
+            z_red=self.Z_THRESHOLD_RED,
+            ker=self.KER_THRESHOLD,
+            adx=self.ADX_THRESHOLD,
+            initial=self._current_regime,
+        )
+        
+        # --- 증분 지표 (일봉 1개당 O(1)) ---
+        self._adx = WilderADX(period=14)
+        self._ker = StreamingKER(self.KER_PERIODS)
+        self._last_bars: Dict[str, Tuple] = {}   # 지표 → (마지막 반영 봉 날짜, 봉 값)
     
     # ============================================
     # KER (Kaufman's Efficiency Ratio) 계산
@@ -71,24 +97,57 @@ class RegimeDetector(QObject):
         if len(prices) < period:
             return 0.0
         
-        # 최근 period 기간만 사용
-        recent_prices = prices[-period:]
+        # 최근 period 기간만 사용 (변화가 없으면 0)
+        ker = ker_batch(prices[-period:], (period,))[period][-1]
+        return round(float(ker), 4)
+    
+    def update_ker(self, bars: Dict[str, np.ndarray]) -> Dict[int, float]:
+        """
+        스트리밍 KER (KER_PERIODS 전체) - 새 일봉만 반영
         
-        # 총 가격 변화 (시작 → 끝)
-        total_change = abs(recent_prices[-1] - recent_prices[0])
+        Args:
+            bars: {"date", "close"} 배열 (오래된 순서)
         
-        # 총 변화량 합 (일별 변화의 절대값 합)
-        daily_changes = [abs(recent_prices[i] - recent_prices[i-1]) 
-                        for i in range(1, len(recent_prices))]
-        total_volatility = sum(daily_changes)
+        Returns:
+            {기간: KER} (가격이 모자란 기간은 0.0)
+        """
+        try:
+            close = bars["close"]
+            step = self._bar_step("ker", bars["date"], (float(close[-1]),) if len(close) else ())
+            if step == "replace":
+                self._ker.replace_last(float(close[-1]))
+            elif step == "push":
+                self._ker.push(float(close[-1]))
+            elif step == "seed":
+                self._ker.seed(close)
+            
+            return {p: (round(v, 4) if v == v else 0.0) for p, v in self._ker.values().items()}
+            
+        except Exception as e:
+            self.log_message.emit(f"⚠️ KER 계산 오류: {str(e)}")
+            return {p: 0.0 for p in self.KER_PERIODS}
+    
+    def _bar_step(self, name: str, dates: np.ndarray, last_bar: Tuple) -> str:
+        """
+        일봉 배열과 마지막 반영 상태 비교 → 증분 방식 결정
         
-        # KER 계산 (0으로 나누기 방지)
-        if total_volatility == 0:
-            return 0.0
+        Returns:
+            "same" (그대로), "replace" (당일 봉 값만 변경), "push" (새 봉 1개),
+            "seed" (처음/불연속 → 배열로 다시 초기화), "empty"
+        """
+        if len(dates) == 0:
+            return "empty"
         
-        ker = total_change / total_volatility
+        last_date, previous_bar = self._last_bars.get(name, (None, None))
+        if dates[-1] == last_date:
+            step = "same" if last_bar == previous_bar else "replace"
+        elif len(dates) > 1 and dates[-2] == last_date:
+            step = "push"
+        else:
+            step = "seed"
         
-        return round(ker, 4)
+        self._last_bars[name] = (dates[-1], last_bar)
+        return step
     
     # ============================================
     # ADX (Average Directional Index) 계산
@@ -112,26 +171,39 @@ class RegimeDetector(QObject):
             ADX 값
         """
         try:
-            # pandas DataFrame으로 변환
-            df = pd.DataFrame({
-                "high": high,
-                "low": low,
-                "close": close
-            })
-            
-            # pandas-ta로 ADX 계산
-            adx_result = ta.adx(df["high"], df["low"], df["close"], length=period)
-            
-            if adx_result is None or adx_result.empty:
-                return 0.0
-            
-            # ADX 값 반환 (마지막 값)
-            adx_col = f"ADX_{period}"
-            if adx_col in adx_result.columns:
-                adx_value = adx_result[adx_col].iloc[-1]
-                return round(float(adx_value), 2) if not pd.isna(adx_value) else 0.0
+            adx_value = adx_batch(high, low, close, period)["adx"][-1] if len(close) else np.nan
+            return round(float(adx_value), 2) if not np.isnan(adx_value) else 0.0
             
+        except Exception as e:
+            self.log_message.emit(f"⚠️ ADX 계산 오류: {str(e)}")
             return 0.0
+    
+    def update_adx(self, bars: Dict[str, np.ndarray]) -> float:
+        """
+        증분 ADX (14일) - 새 일봉만 반영
+        
+        - 마지막 봉이 그대로면 이전 값 재사용
+        - 새 봉 1개면 push (O(1)), 당일 봉 값만 바뀌었으면 replace_last (O(1))
+        - 그 외 (첫 호출, 봉 누락 등)는 배열로 다시 초기화
+        
+        Args:
+            bars: {"date", "high", "low", "close"} 배열 (오래된 순서)
+        
+        Returns:
+            ADX 값 (워밍업 중이면 0.0)
+        """
+        try:
+            high, low, close = bars["high"], bars["low"], bars["close"]
+            last_bar = (float(high[-1]), float(low[-1]), float(close[-1])) if len(close) else ()
+            step = self._bar_step("adx", bars["date"], last_bar)
+            if step == "replace":
+                self._adx.replace_last(*last_bar)        # 당일 봉 갱신
+            elif step == "push":
+                self._adx.push(*last_bar)                # 새 봉 1개
+            elif step == "seed":
+                self._adx.seed(high, low, close)         # 처음 / 불연속
+            
+            return round(self._adx.adx, 2) if self._adx.ready else 0.0
             
         except Exception as e:
             self.log_message.emit(f"⚠️ ADX 계산 오류: {str(e)}")
@@ -161,48 +233,111 @@ class RegimeDetector(QObject):
     # 최종 레짐 판단
     # ============================================
     
-    def get_regime(self, z_score: float, ker: float, adx: float) -> str:
+    def get_regime(self, z_score: float, ker: float, adx: float,
+                   now: Optional[float] = None) -> str:
         """
-        시장 레짐 판단
+        시장 레짐 판단 (상태 머신으로 확정된 레짐)
         
-        판단 우선순위:
+        판단 우선순위 (진입 임계값, 머무는 레짐은 이탈 여유만큼 완화):
         1. BLACK: Z-Score ≥ 2.0 (공포 상태)
         2. RED: Z-Score ≥ 1.0 AND 골디락스 (추세 추종 적합)
         3. GREEN: 그 외 (평균 회귀 적합)
         
+        후보 레짐은 연속 확인 횟수와 최소 체류 시간을 채워야 전환
+        (위기 진입은 체류 시간 무시).
+        
         Args:
             z_score: VIX Z-Score
             ker: 효율비
             adx: 추세 강도
+            now: 평가 시각 (epoch 초, 기본 현재)
             
         Returns:
             "위기", "상승", 또는 "횡보"
         """
+        transition = self.state_machine.update(z_score, ker, adx, now)
+        regime = self.state_machine.state
+        
         # 1. 위기 모드 (공포)
-        if z_score >= self.Z_THRESHOLD_BLACK:
-            regime = "위기"
-            self.log_message.emit(f"🔴 위기 모드: Z-Score {z_score:.2f} ≥ {self.Z_THRESHOLD_BLACK}")
+        if regime == "위기":
+            self.log_message.emit(f"🔴 위기 모드: Z-Score {z_score:.2f}")
         
         # 2. 상승 모드 (추세 추종)
-        elif z_score >= self.Z_THRESHOLD_RED and self.is_goldilocks(ker, adx):
-            regime = "상승"
+        elif regime == "상승":
             self.log_message.emit(f"🔵 상승 모드: Z-Score {z_score:.2f}, KER {ker:.2f}, ADX {adx:.2f}")
         
         # 3. 횡보 모드 (평균 회귀)
         else:
-            regime = "횡보"
             self.log_message.emit(f"🟡 횡보 모드: Z-Score {z_score:.2f}")
         
-        # 레짐 변경 알림
-        if regime != self._current_regime:
-            self._current_regime = regime
-            self.regime_changed.emit(regime)
-        
+        self._report(transition)
         return regime
     
+    def force_regime(self, regime: str, reason: str, z_score: float = math.nan,
+                     now: Optional[float] = None) -> str:
+        """
+        외부 조건으로 레짐 강제 (킬 스위치 → 위기)
+        
+        상태 머신을 거치므로 진입 확인 횟수와 전환 기록/알림이 일반 전환과 같고,
+        해제 후 get_regime()으로 돌아가면 이탈도 디바운스됩니다.
+        
+        Args:
+            regime: 목표 레짐
+            reason: 로그용 사유 (예: "킬 스위치 STOP")
+            z_score: 기록용 Z-Score
+            now: 평가 시각 (epoch 초, 기본 현재)
+            
+        Returns:
+            확정된 레짐
+        """
+        transition = self.state_machine.force(regime, z_score, now=now)
+        if transition is not None:
+            self.log_message.emit(f"🛑 {reason} → {regime} 강제")
+        self._report(transition)
+        return self.state_machine.state
+    
+    def _report(self, transition: Optional[RegimeTransition]) -> None:
+        """전환 대기/확정 로그 + 확정 시 regime_changed"""
+        # 전환 후보 대기 중
+        pending = self.state_machine.pending
+        if pending is not None:
+            self.log_message.emit(
+                f"⏳ {pending} 전환 대기: 확인 {self.state_machine.pending_count}회")
+        
+        # 레짐 변경 알림 (확정된 전환만)
+        if transition is not None:
+            self._current_regime = transition.to_regime
+            self.log_message.emit(
+                f"🔁 레짐 전환: {transition.from_regime} → {transition.to_regime} "
+                f"(확인 {transition.confirmations}회, 체류 {transition.dwell_s:.0f}초)")
+            self.regime_changed.emit(transition.to_regime)
+    
+    def classify(self, z_score: np.ndarray, ker: np.ndarray, adx: np.ndarray) -> np.ndarray:
+        """
+        봉별 레짐 코드 (진입 임계값 규칙, 히스테리시스/디바운스 없음, 벡터 계산)
+        
+        Args:
+            z_score, ker, adx: 같은 길이 배열 (NaN은 0으로 취급)
+        
+        Returns:
+            REGIME_NAMES 인덱스 배열 (int8)
+        """
+        z = np.nan_to_num(np.asarray(z_score, dtype=float))
+        goldilocks = (np.nan_to_num(np.asarray(ker, dtype=float)) > self.KER_THRESHOLD) & \
+                     (np.nan_to_num(np.asarray(adx, dtype=float)) > self.ADX_THRESHOLD)
+        
+        codes = np.zeros(len(z), dtype=np.int8)                       # 횡보
+        codes[(z >= self.Z_THRESHOLD_RED) & goldilocks] = 1           # 상승
+        codes[z >= self.Z_THRESHOLD_BLACK] = 2                        # 위기
+        return codes
+    
     def get_current_regime(self) -> str:
         """현재 레짐 반환"""
         return self._current_regime
+    
+    def transitions(self) -> List[RegimeTransition]:
+        """최근 레짐 전환 기록 (오래된 순서)"""
+        return self.state_machine.events()
 
 
 # ============================================
@@ -230,7 +365,7 @@ if __name__ == "__main__":
     all_passed = True
     
     for z, ker, adx, expected in test_cases:
-        result = detector.get_regime(z, ker, adx)
+        result = RegimeDetector().get_regime(z, ker, adx)    # 첫 평가 = 규칙 그대로
         passed = result == expected
         status = "✅" if passed else "❌"
         print(f"  {status} get_regime({z}, {ker}, {adx}) = {result} (예상: {expected})")
@@ -243,6 +378,19 @@ if __name__ == "__main__":
     else:
         print("❌ 일부 테스트 실패")
     
+    # 임계값 근처 흔들림 (Z 0.99 ↔ 1.01, 10초 간격)
+    print("\n📋 전환 디바운스 테스트:")
+    quiet = RegimeDetector()
+    changes = []
+    quiet.regime_changed.connect(changes.append)
+    t = 1_000_000.0
+    for i in range(30):
+        quiet.get_regime(1.01 if i % 2 == 0 else 0.99, 0.4, 30, now=t + i * 10)
+    print(f"  흔들림 30회 → regime_changed {len(changes)}회 (현재 {quiet.get_current_regime()})")
+    quiet.get_regime(2.3, 0.4, 30, now=t + 400)
+    print(f"  위기 진입 → {quiet.get_current_regime()}, 기록: "
+          f"{[(e.from_regime, e.to_regime) for e in quiet.transitions()]}")
+    
     # KER 테스트
     print("\n📊 KER 테스트:")
     prices_trend = [100, 102, 104, 106, 108, 110, 112, 114, 116, 118, 120]
@@ -253,3 +401,24 @@ if __name__ == "__main__":
     
     print(f"  추세 시장 KER: {ker_trend:.4f} (1에 가까움)")
     print(f"  횡보 시장 KER: {ker_sideways:.4f} (0에 가까움)")
+    
+    # ADX 테스트 (증분 = 배치)
+    print("\n📊 ADX 테스트:")
+    rng = np.random.default_rng(1)
+    close = 400 + np.linspace(0, 30, 60) + rng.standard_normal(60)
+    bars = {
+        "date": np.arange("2026-01-01", 60, dtype="datetime64[D]"),
+        "high": close + 1.0,
+        "low": close - 1.0,
+        "close": close,
+    }
+    partial = {key: values[:-1] for key, values in bars.items()}
+    detector.update_adx(partial)                 # 초기화
+    adx_incremental = detector.update_adx(bars)  # 새 봉 1개 → O(1)
+    adx_batch_value = detector.calculate_adx(bars["high"], bars["low"], bars["close"])
+    print(f"  상승 추세 ADX: {adx_incremental:.2f} (배치 {adx_batch_value:.2f}, 25 초과 예상)")
+    
+    # 다중 기간 KER (스트리밍 = 스칼라)
+    detector.update_ker(partial)
+    kers = detector.update_ker(bars)
+    print(f"  다중 기간 KER: {kers} (20일 스칼라 {detector.calculate_ker(close, 20):.4f})")
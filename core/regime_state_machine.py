@@ -0,0 +1,278 @@
+"""
+============================================
+레짐 상태 머신 - 히스테리시스 + 디바운스
+============================================
+- 진입/이탈 임계값 분리 (히스테리시스)
+  예) 위기 진입 Z ≥ 2.0, 이탈은 Z < 1.8 이 되어야 함
+- 후보 레짐이 연속 N회 평가에서 유지되어야 전환 (확인 횟수)
+- 현재 레짐에 최소 체류 시간이 지나야 전환 (위기 진입은 예외: 안전 우선)
+- 전환마다 이벤트 1건 기록 (최근 N건 보관)
+- 외부 강제 레짐 (킬 스위치 → 위기)도 같은 확인/기록 경로 사용
+  → 해제 후 이탈은 일반 평가처럼 확인 횟수 + 최소 체류를 채워야 함
+- 시그널/로그 없음 → RegimeDetector가 결과를 받아 알림
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional
+
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+CALM = "횡보"
+TREND = "상승"
+CRISIS = "위기"
+
+
+@dataclass(frozen=True)
+class RegimeTransition:
+    """레짐 전환 이벤트"""
+    ts: float               # 전환 시각 (epoch 초)
+    from_regime: str
+    to_regime: str
+    z_score: float
+    ker: float
+    adx: float
+    confirmations: int      # 전환까지 연속 확인 횟수
+    dwell_s: float          # 이전 레짐 체류 시간 (초, 첫 평가면 0)
+
+
+class RegimeStateMachine:
+    """
+    레짐 전환 상태 머신
+    
+    사용법:
+        machine = RegimeStateMachine(z_black=2.0, z_red=1.0, ker=0.3, adx=25)
+        transition = machine.update(z_score, ker, adx)   # 평가마다
+        transition = machine.force(CRISIS, z_score)      # 킬 스위치 발동 중
+        machine.state                                    # 확정 레짐
+        machine.events()                                 # 최근 전환 기록
+    """
+    
+    # === 설정값 (.env에서 로드) ===
+    MIN_DWELL_S = float(os.getenv("REGIME_MIN_DWELL_S", "300"))             # 최소 체류 시간 (초)
+    CONFIRMATIONS = int(os.getenv("REGIME_CONFIRMATIONS", "3"))             # 전환 확인 횟수
+    CRISIS_CONFIRMATIONS = int(os.getenv("REGIME_CRISIS_CONFIRMATIONS", "1"))   # 위기 진입 확인 횟수
+    Z_EXIT_MARGIN = float(os.getenv("REGIME_Z_EXIT_MARGIN", "0.2"))         # Z-Score 이탈 여유
+    KER_EXIT_MARGIN = float(os.getenv("REGIME_KER_EXIT_MARGIN", "0.05"))    # KER 이탈 여유
+    ADX_EXIT_MARGIN = float(os.getenv("REGIME_ADX_EXIT_MARGIN", "5"))       # ADX 이탈 여유
+    EVENT_LOG_SIZE = int(os.getenv("REGIME_EVENT_LOG_SIZE", "50"))          # 전환 기록 보관 수
+    
+    def __init__(self, z_black: float, z_red: float, ker: float, adx: float,
+                 initial: str = CALM) -> None:
+        """
+        초기화
+        
+        Args:
+            z_black: 위기 진입 Z-Score
+            z_red: 상승 진입 Z-Score
+            ker: 상승 진입 KER (초과)
+            adx: 상승 진입 ADX (초과)
+            initial: 초기 레짐 (첫 평가 결과는 확인 없이 바로 채택)
+        """
+        # --- 진입 임계값 ---
+        self.z_black = z_black
+        self.z_red = z_red
+        self.ker = ker
+        self.adx = adx
+        
+        # --- 상태 ---
+        self.state = initial
+        self._entered_at: Optional[float] = None    # 현재 레짐 진입 시각 (None = 평가 전)
+        self._pending: Optional[str] = None         # 전환 후보
+        self._pending_count = 0                     # 후보 연속 확인 횟수
+        self._events: Deque[RegimeTransition] = deque(maxlen=self.EVENT_LOG_SIZE)
+    
+    # ============================================
+    # 히스테리시스 (평가 1회의 목표 레짐)
+    # ============================================
+    
+    def target(self, z_score: float, ker: float, adx: float) -> str:
+        """
+        현재 레짐 기준 목표 레짐 (머무는 쪽은 이탈 임계값, 들어가는 쪽은 진입 임계값)
+        
+        Returns:
+            "위기", "상승", 또는 "횡보"
+        """
+        # 1. 위기: 진입 z_black, 이탈 z_black - 여유
+        z_black = self.z_black - self.Z_EXIT_MARGIN if self.state == CRISIS else self.z_black
+        if z_score >= z_black:
+            return CRISIS
+        
+        # 2. 상승: 모든 조건에 이탈 여유 적용
+        if self.state == TREND:
+            trending = z_score >= self.z_red - self.Z_EXIT_MARGIN and \
+                       ker > self.ker - self.KER_EXIT_MARGIN and \
+                       adx > self.adx - self.ADX_EXIT_MARGIN
+        else:
+            trending = z_score >= self.z_red and ker > self.ker and adx > self.adx
+        return TREND if trending else CALM
+    
+    # ============================================
+    # 디바운스 (확인 횟수 + 최소 체류)
+    # ============================================
+    
+    def update(self, z_score: float, ker: float, adx: float,
+               now: Optional[float] = None) -> Optional[RegimeTransition]:
+        """
+        평가 1회 반영
+        
+        Args:
+            z_score, ker, adx: 레짐 입력
+            now: 평가 시각 (epoch 초, 기본 현재)
+        
+        Returns:
+            전환이 확정되면 RegimeTransition, 아니면 None
+        """
+        return self._step(self.target(z_score, ker, adx), z_score, ker, adx, now)
+    
+    def force(self, target: str, z_score: float = math.nan, ker: float = math.nan,
+              adx: float = math.nan, now: Optional[float] = None) -> Optional[RegimeTransition]:
+        """
+        외부 조건으로 목표 레짐 지정 (예: 킬 스위치 발동 → 위기)
+        
+        임계값 대신 target을 후보로 쓰는 것 외에는 update()와 같음
+        (확인 횟수/체류 시간/이벤트 기록). 해제 후에는 update()로 돌아가면
+        이탈도 일반 전환처럼 디바운스됨.
+        
+        Args:
+            target: 목표 레짐
+            z_score, ker, adx: 기록용 입력 (모르면 NaN)
+            now: 평가 시각 (epoch 초, 기본 현재)
+        
+        Returns:
+            전환이 확정되면 RegimeTransition, 아니면 None
+        """
+        return self._step(target, z_score, ker, adx, now)
+    
+    def _step(self, target: str, z_score: float, ker: float, adx: float,
+              now: Optional[float]) -> Optional[RegimeTransition]:
+        """목표 레짐 1회 반영 (확인 횟수 + 최소 체류)"""
+        now = time.time() if now is None else now
+        
+        # 첫 평가 → 확인 없이 채택 (시작 직후 잘못된 기본값 유지 방지)
+        if self._entered_at is None:
+            self._entered_at = now
+            if target == self.state:
+                return None
+            return self._transition(target, z_score, ker, adx, now, confirmations=1, dwell_s=0.0)
+        
+        # 현재 레짐 유지 → 후보 취소
+        if target == self.state:
+            self._pending = None
+            self._pending_count = 0
+            return None
+        
+        # 후보 연속 확인
+        if target == self._pending:
+            self._pending_count += 1
+        else:
+            self._pending = target
+            self._pending_count = 1
+        
+        required = self.CRISIS_CONFIRMATIONS if target == CRISIS else self.CONFIRMATIONS
+        dwell_s = now - self._entered_at
+        if self._pending_count < required:
+            return None
+        if target != CRISIS and dwell_s < self.MIN_DWELL_S:
+            return None     # 확인은 됐지만 체류 시간 부족 → 후보 유지
+        
+        return self._transition(target, z_score, ker, adx, now, self._pending_count, dwell_s)
+    
+    def _transition(self, target: str, z_score: float, ker: float, adx: float,
+                    now: float, confirmations: int, dwell_s: float) -> RegimeTransition:
+        """전환 확정 + 이벤트 기록"""
+        event = RegimeTransition(
+            ts=now, from_regime=self.state, to_regime=target,
+            z_score=z_score, ker=ker, adx=adx,
+            confirmations=confirmations, dwell_s=dwell_s,
+        )
+        self._events.append(event)
+        
+        self.state = target
+        self._entered_at = now
+        self._pending = None
+        self._pending_count = 0
+        return event
+    
+    # ============================================
+    # 조회
+    # ============================================
+    
+    @property
+    def pending(self) -> Optional[str]:
+        """전환 후보 (없으면 None)"""
+        return self._pending
+    
+    @property
+    def pending_count(self) -> int:
+        """후보 연속 확인 횟수"""
+        return self._pending_count
+    
+    def events(self) -> List[RegimeTransition]:
+        """최근 전환 기록 (오래된 순서)"""
+        return list(self._events)
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    machine = RegimeStateMachine(z_black=2.0, z_red=1.0, ker=0.3, adx=25)
+    machine.MIN_DWELL_S = 60
+    
+    # 임계값 근처 흔들림: 상승 조건에서 Z가 0.99 ↔ 1.01 반복 (10초 간격)
+    t = 1_000_000.0
+    machine.update(0.5, 0.4, 30, now=t)
+    raw_flips = 0
+    previous = CALM
+    for i in range(60):
+        t += 10
+        z = 1.01 if i % 2 == 0 else 0.99
+        raw = TREND if z >= 1.0 else CALM
+        raw_flips += raw != previous
+        previous = raw
+        machine.update(z, 0.4, 30, now=t)
+    print(f"흔들림 60회: 임계값 직접 비교 전환 {raw_flips}회 → 상태 머신 전환 {len(machine.events())}회 "
+          f"(현재 {machine.state})")
+    
+    # 추세 확정: 연속 3회 + 체류 60초
+    for _ in range(3):
+        t += 30
+        machine.update(1.3, 0.4, 30, now=t)
+    print(f"추세 확정 후: {machine.state}")
+    
+    # 이탈 여유: Z 0.85 (≥ 0.8) → 상승 유지
+    t += 120
+    machine.update(0.85, 0.4, 30, now=t)
+    print(f"Z 0.85 (이탈 0.8): {machine.state} (상승 유지 예상)")
+    
+    # 위기 진입은 즉시 (체류/확인 무시)
+    t += 1
+    machine.update(2.1, 0.4, 30, now=t)
+    print(f"Z 2.1 즉시: {machine.state}")
+    
+    # 킬 스위치 강제 위기 → 해제 후 이탈도 확인 + 체류 필요
+    forced = RegimeStateMachine(z_black=2.0, z_red=1.0, ker=0.3, adx=25)
+    forced.MIN_DWELL_S = 60
+    t = 2_000_000.0
+    forced.update(0.5, 0.2, 20, now=t)
+    forced.force(CRISIS, 0.5, now=t + 10)
+    states = []
+    for i in range(1, 5):
+        forced.update(0.5, 0.2, 20, now=t + 10 + i * 20)
+        states.append(forced.state)
+    print(f"킬 스위치 위기 → 해제 후 20초 간격 평가: {states} (체류 60초 후 횡보 예상)")
+    
+    for event in machine.events():
+        print(f"  {event.from_regime} → {event.to_regime} (Z {event.z_score:.2f}, "
+              f"확인 {event.confirmations}회, 체류 {event.dwell_s:.0f}초)")
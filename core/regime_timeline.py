@@ -0,0 +1,407 @@
+"""
+============================================
+레짐 타임라인 - 봉별 레짐 라벨 기록/조회
+============================================
+- 일봉: SPY/VIX 일봉 배열로 Z-Score/KER/ADX 시리즈를 벡터 계산
+  → RegimeDetector.classify()로 봉별 레짐 코드 일괄 산출
+- 장중: 엔진이 레짐을 재평가할 때마다 1분 버킷 라벨 갱신
+  (버킷이 바뀌면 직전 버킷 1행만 기록)
+- 저장: regime_labels 테이블 (바뀐 행만 upsert, 재시작 시 로드)
+- 조회: regime_at(ts) = 시각 배열 이진 탐색 (지표 재계산 없음)
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.indicators import adx_batch, ker_batch
+from core.regime_detector import REGIME_NAMES, RegimeDetector
+
+# .env 파일 로드
+load_dotenv()
+
+# 봉 길이 (초)
+DAILY = 86400
+INTRADAY = 60
+
+# 레짐 이름 → 코드
+REGIME_CODES: Dict[str, int] = {name: code for code, name in enumerate(REGIME_NAMES)}
+
+
+def rolling_z_score(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    롤링 Z-Score 시리즈 (표본 표준편차 ddof=1, 누적합 벡터 계산)
+
+    Args:
+        values: 오래된 순서의 값
+        window: 기간
+
+    Returns:
+        같은 길이 배열 (앞 window-1개는 NaN, 표준편차 0이면 0)
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    z = np.full(n, np.nan)
+    if n < window or window < 2:
+        return z
+
+    # 평균을 빼고 누적 → 큰 값의 누적합 상쇄 오차 완화
+    centered = values - values.mean()
+    cum = np.concatenate(([0.0], np.cumsum(centered)))
+    cum_sq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+    total = cum[window:] - cum[:-window]
+    total_sq = cum_sq[window:] - cum_sq[:-window]
+
+    mean = total / window
+    var = np.maximum(total_sq - total * mean, 0.0) / (window - 1)
+    std = np.sqrt(var)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z[window - 1:] = np.where(std > 0, (centered[window - 1:] - mean) / std, 0.0)
+    return z
+
+
+class _LabelSeries:
+    """봉 길이 1개의 라벨 배열 (용량이 차면 2배로 확장)"""
+
+    __slots__ = ("ts", "regime", "z_score", "ker", "adx", "count")
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.regime = np.zeros(capacity, dtype=np.int8)
+        self.z_score = np.zeros(capacity, dtype=np.float64)
+        self.ker = np.zeros(capacity, dtype=np.float64)
+        self.adx = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+
+    def assign(self, ts, regime, z_score, ker, adx) -> None:
+        """전체 교체"""
+        n = len(ts)
+        self._reserve(n)
+        self.ts[:n] = ts
+        self.regime[:n] = regime
+        self.z_score[:n] = z_score
+        self.ker[:n] = ker
+        self.adx[:n] = adx
+        self.count = n
+
+    def put(self, ts: int, regime: int, z_score: float, ker: float, adx: float) -> bool:
+        """
+        마지막 봉 갱신 또는 새 봉 추가
+
+        Returns:
+            새 봉 추가 여부
+        """
+        appended = self.count == 0 or ts > self.ts[self.count - 1]
+        if appended:
+            self._reserve(self.count + 1)
+            self.count += 1
+        i = self.count - 1
+        self.ts[i] = ts
+        self.regime[i] = regime
+        self.z_score[i] = z_score
+        self.ker[i] = ker
+        self.adx[i] = adx
+        return appended
+
+    def row(self, i: int) -> Tuple:
+        """저장용 행 (ts, regime, z_score, ker, adx)"""
+        return (int(self.ts[i]), int(self.regime[i]), float(self.z_score[i]),
+                float(self.ker[i]), float(self.adx[i]))
+
+    def _reserve(self, n: int) -> None:
+        """용량 확보 (부족하면 2배 확장)"""
+        capacity = len(self.ts)
+        if n <= capacity:
+            return
+        while capacity < n:
+            capacity *= 2
+        for name in ("ts", "regime", "z_score", "ker", "adx"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+
+class RegimeTimeline(QObject):
+    """
+    레짐 타임라인
+
+    사용법:
+        timeline = RegimeTimeline(db, detector)
+        timeline.update_daily(spy_bars, vix_bars)       # 일봉 갱신 시
+        timeline.record_intraday(ts, regime, z, ker, adx)   # 장중 레짐 재평가 시
+        timeline.regime_at(ts)                          # "상승" 등 (없으면 None)
+        timeline.labels(DAILY, start_ts, end_ts)        # 백테스트/분석용 배열
+
+    Signals:
+        log_message(str): 로그 메시지
+    """
+
+    # === PyQt Signals ===
+    log_message = pyqtSignal(str)       # 로그 메시지
+
+    # === 설정값 (.env에서 로드) ===
+    Z_WINDOW = int(os.getenv("Z_WINDOW", "126"))    # VIX Z-Score 기간
+
+    def __init__(self, db, detector: RegimeDetector, parent=None) -> None:
+        """
+        초기화
+
+        Args:
+            db: MarketDatabase (열린 뒤 첫 갱신 때 저장된 라벨 로드)
+            detector: 레짐 규칙/임계값 (classify)
+            parent: 부모 QObject
+        """
+        super().__init__(parent)
+        self.db = db
+        self.detector = detector
+        self._lock = threading.Lock()
+        self._series: Dict[int, _LabelSeries] = {DAILY: _LabelSeries(), INTRADAY: _LabelSeries()}
+        self._loaded = False
+
+    # ============================================
+    # 저장소 로드
+    # ============================================
+
+    def _ensure_loaded(self) -> None:
+        """저장된 라벨을 1회 로드 (DB가 열린 뒤)"""
+        if self._loaded or not self.db.is_open():
+            return
+
+        # 전부 읽은 뒤 반영 (읽기 실패 시 다음 갱신에서 다시 시도)
+        loaded = {timeframe: self.db.load_regime_labels(timeframe) for timeframe in self._series}
+        for timeframe, rows in loaded.items():
+            if not rows:
+                continue
+            ts, regime, z_score, ker, adx = (np.array(col) for col in zip(*rows))
+            with self._lock:
+                self._series[timeframe].assign(ts, regime, z_score, ker, adx)
+        self._loaded = True
+
+    # ============================================
+    # 일봉 라벨 (벡터 계산)
+    # ============================================
+
+    def compute_daily(self, spy_bars: Dict[str, np.ndarray],
+                      vix_bars: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        일봉 라벨 시리즈 계산 (저장 없음, 백테스트에서도 사용)
+
+        Args:
+            spy_bars: SPY {"date", "high", "low", "close"}
+            vix_bars: VIX {"date", "close"}
+
+        Returns:
+            {"ts", "regime", "z_score", "ker", "adx"} (SPY 일봉과 같은 길이)
+        """
+        dates = spy_bars["date"]
+        close = spy_bars["close"]
+
+        # VIX Z-Score → SPY 날짜에 정렬 (그 날짜 이전 마지막 VIX 값)
+        vix_z = rolling_z_score(vix_bars["close"], self.Z_WINDOW)
+        pos = np.searchsorted(vix_bars["date"], dates, side="right") - 1
+        z_score = np.where(pos >= 0, vix_z[np.maximum(pos, 0)], np.nan) if len(vix_z) \
+            else np.full(len(dates), np.nan)
+
+        ker = ker_batch(close, (self.detector.KER_PERIOD,))[self.detector.KER_PERIOD]
+        adx = adx_batch(spy_bars["high"], spy_bars["low"], close)["adx"]
+
+        return {
+            "ts": dates.astype("datetime64[s]").astype(np.int64),
+            "regime": self.detector.classify(z_score, ker, adx),
+            "z_score": np.nan_to_num(z_score),
+            "ker": np.nan_to_num(ker),
+            "adx": np.nan_to_num(adx),
+        }
+
+    def update_daily(self, spy_bars: Dict[str, np.ndarray],
+                     vix_bars: Dict[str, np.ndarray]) -> int:
+        """
+        일봉 라벨 갱신 → 바뀐/새 행만 저장
+
+        Returns:
+            저장된 행 수
+        """
+        self._ensure_loaded()
+        if len(spy_bars["date"]) == 0:
+            return 0
+
+        labels = self.compute_daily(spy_bars, vix_bars)
+        series = self._series[DAILY]
+
+        # 기존 라벨과 처음 달라지는 위치부터만 기록 (보통 마지막 1~2행)
+        start = self._first_change(series, labels)
+        if start >= len(labels["ts"]):
+            return 0
+
+        # 저장이 성공한 뒤에만 메모리 반영 (실패하면 다음 갱신에서 같은 행 재시도)
+        rows = list(zip(*(labels[name][start:].tolist()
+                          for name in ("ts", "regime", "z_score", "ker", "adx"))))
+        written = self.db.upsert_regime_labels(DAILY, rows)
+        with self._lock:
+            series.assign(labels["ts"], labels["regime"], labels["z_score"],
+                          labels["ker"], labels["adx"])
+        if start == 0 and written:
+            self.log_message.emit(f"🗂️ 레짐 타임라인: 일봉 {len(rows)}개 라벨 기록")
+        return written
+
+    @staticmethod
+    def _first_change(series: _LabelSeries, labels: Dict[str, np.ndarray]) -> int:
+        """기존 라벨과 새 라벨이 처음 다른 인덱스"""
+        n = min(series.count, len(labels["ts"]))
+        if n == 0:
+            return 0
+        same = (series.ts[:n] == labels["ts"][:n]) & \
+               (series.regime[:n] == labels["regime"][:n]) & \
+               np.isclose(series.z_score[:n], labels["z_score"][:n]) & \
+               np.isclose(series.ker[:n], labels["ker"][:n]) & \
+               np.isclose(series.adx[:n], labels["adx"][:n])
+        mismatch = np.flatnonzero(~same)
+        return int(mismatch[0]) if len(mismatch) else n
+
+    # ============================================
+    # 장중 라벨 (증분)
+    # ============================================
+
+    def record_intraday(self, ts: float, regime: str, z_score: float,
+                        ker: float, adx: float) -> None:
+        """
+        장중 레짐 기록 (1분 버킷의 마지막 값, 버킷이 바뀌면 직전 버킷 저장)
+
+        Args:
+            ts: 평가 시각 (epoch 초)
+            regime: 레짐 이름
+            z_score, ker, adx: 판단에 쓴 입력
+        """
+        self._ensure_loaded()
+        bucket = int(ts) // INTRADAY * INTRADAY
+        series = self._series[INTRADAY]
+
+        with self._lock:
+            if series.count and bucket < series.ts[series.count - 1]:
+                return  # 시계 역행 무시
+            appended = series.put(bucket, REGIME_CODES.get(regime, 0), z_score, ker, adx)
+            closed = series.row(series.count - 2) if appended and series.count > 1 else None
+
+        if closed is not None and self.db.is_open():
+            self.db.upsert_regime_labels(INTRADAY, [closed])
+
+    def flush(self) -> None:
+        """진행 중인 장중 버킷 저장 (종료 시)"""
+        series = self._series[INTRADAY]
+        with self._lock:
+            row = series.row(series.count - 1) if series.count else None
+        if row is not None and self.db.is_open():
+            self.db.upsert_regime_labels(INTRADAY, [row])
+
+    # ============================================
+    # 조회
+    # ============================================
+
+    def regime_at(self, ts: float, timeframe: int = DAILY) -> Optional[str]:
+        """
+        시각 ts의 레짐 (그 시각 이전에 시작한 마지막 봉의 라벨)
+
+        Args:
+            ts: epoch 초
+            timeframe: DAILY 또는 INTRADAY
+
+        Returns:
+            레짐 이름 (라벨이 없으면 None)
+        """
+        series = self._series[timeframe]
+        with self._lock:
+            i = int(np.searchsorted(series.ts[:series.count], ts, side="right")) - 1
+            return REGIME_NAMES[series.regime[i]] if i >= 0 else None
+
+    def labels(self, timeframe: int = DAILY, start_ts: Optional[float] = None,
+               end_ts: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        구간 라벨 배열 (복사본)
+
+        Args:
+            timeframe: DAILY 또는 INTRADAY
+            start_ts: 시작 (포함, None이면 처음부터)
+            end_ts: 종료 (미포함, None이면 끝까지)
+
+        Returns:
+            {"ts", "regime", "z_score", "ker", "adx"}
+        """
+        series = self._series[timeframe]
+        with self._lock:
+            ts = series.ts[:series.count]
+            lo = 0 if start_ts is None else int(np.searchsorted(ts, start_ts, side="left"))
+            hi = series.count if end_ts is None else int(np.searchsorted(ts, end_ts, side="left"))
+            return {name: getattr(series, name)[lo:hi].copy()
+                    for name in ("ts", "regime", "z_score", "ker", "adx")}
+
+    def switches(self, timeframe: int = DAILY) -> List[Tuple[int, str]]:
+        """레짐이 바뀐 시점 목록 [(ts, 새 레짐), ...]"""
+        series = self._series[timeframe]
+        with self._lock:
+            regime = series.regime[:series.count]
+            idx = np.flatnonzero(np.diff(regime)) + 1
+            return [(int(series.ts[i]), REGIME_NAMES[regime[i]]) for i in idx]
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from pathlib import Path
+
+    from core.storage import MarketDatabase
+
+    rng = np.random.default_rng(3)
+    n = 2000
+    dates = np.arange("2018-01-01", n, dtype="datetime64[D]")
+    spy_close = 250 + rng.standard_normal(n).cumsum()
+    spy = {"date": dates, "high": spy_close + 1, "low": spy_close - 1, "close": spy_close}
+    vix = {"date": dates, "close": 18 + np.abs(rng.standard_normal(n).cumsum()) * 0.3}
+
+    # 롤링 Z-Score vs 직접 계산
+    z = rolling_z_score(vix["close"], 126)
+    window = vix["close"][-126:]
+    direct = (window[-1] - window.mean()) / window.std(ddof=1)
+    print(f"{'✅' if abs(z[-1] - direct) < 1e-9 else '❌'} 롤링 Z-Score = 직접 계산 ({direct:.3f})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MarketDatabase(Path(tmp) / "test.db")
+        db.open()
+        timeline = RegimeTimeline(db, RegimeDetector())
+
+        start = time.perf_counter()
+        written = timeline.update_daily(spy, vix)
+        print(f"일봉 {n}개 라벨: {written}행 기록, {(time.perf_counter() - start) * 1e3:.1f}ms")
+
+        # 당일 봉만 바뀜 → 1행만 기록
+        spy["close"] = spy["close"].copy()
+        spy["close"][-1] += 0.5
+        print(f"당일 봉 갱신: {timeline.update_daily(spy, vix)}행 기록 (1 예상)")
+
+        # 조회 (인덱스 탐색)
+        mid = int(dates[1000].astype("datetime64[s]").astype(np.int64)) + 3600
+        print(f"레짐 전환 {len(timeline.switches())}회, 2020-09-27 레짐: {timeline.regime_at(mid)}")
+
+        # 장중 라벨 + 재시작 후 로드
+        now = int(time.time()) // 60 * 60
+        timeline.record_intraday(now, "횡보", 0.5, 0.2, 18.0)
+        timeline.record_intraday(now + 30, "상승", 1.2, 0.4, 30.0)    # 같은 버킷 → 교체
+        timeline.record_intraday(now + 60, "위기", 2.4, 0.4, 30.0)    # 새 버킷 → 직전 저장
+        timeline.flush()
+
+        reloaded = RegimeTimeline(db, RegimeDetector())
+        reloaded._ensure_loaded()
+        print(f"재시작 후 장중 {now}: {reloaded.regime_at(now + 10, INTRADAY)} (상승 예상), "
+              f"일봉 라벨 {len(reloaded.labels()['ts'])}개")
+        db.close()
@@ -22,6 +22,8 @@ import pandas as pd
 from dotenv import load_dotenv
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from core.indicators import yang_zhang_components, yang_zhang_volatility
+
 # .env 파일 로드
 load_dotenv()
 
@@ -65,7 +67,8 @@ class RiskManager(QObject):
     def check_kill_switch(self, vix_1m: float, vix_3m: float, 
                          tnx_change: float = 0.0,
                          spy_up: bool = False, 
-                         hyg_ief_down: bool = False) -> str:
+                         hyg_ief_down: bool = False,
+                         curve: Optional[np.ndarray] = None) -> str:
         """
         킬 스위치 상태 확인
         
@@ -81,10 +84,15 @@ class RiskManager(QObject):
             tnx_change: 10년 국채 수익률 변화율
             spy_up: SPY 당일 상승 여부
             hyg_ief_down: HYG/IEF 하락 여부 (신용 리스크)
+            curve: VX 30/60/90일 고정 만기 커브 (있으면 근월/원월 대신 30일 vs 90일 비교)
             
         Returns:
             킬 스위치 상태
         """
+        # 기간구조 입력: 미리 계산된 고정 만기 커브 우선
+        if curve is not None and len(curve) >= 2:
+            vix_1m, vix_3m = float(curve[0]), float(curve[-1])
+        
         # 1. HALT_ALL: VIX 백워데이션 (최우선)
         if vix_1m > vix_3m:
             self._current_kill_status = "HALT_ALL"
@@ -142,30 +150,11 @@ class RiskManager(QObject):
             if n < 5:
                 return 0.0
             
-            # 최근 n일 데이터
-            h = np.array(high[-n:])
-            l = np.array(low[-n:])
-            c = np.array(close[-n:])
-            o = np.array(open_[-n:])
-            
-            # 로그 수익률
-            log_hl = np.log(h / l)           # High-Low
-            log_co = np.log(c / o)           # Close-Open
-            log_oc = np.log(o[1:] / c[:-1])  # Overnight
-            
-            # 분산 계산
-            var_close = np.var(log_co, ddof=1)
-            var_open = np.var(log_oc, ddof=1) if len(log_oc) > 1 else 0
-            var_rs = np.mean(log_hl ** 2) / (4 * np.log(2))  # Rogers-Satchell
-            
-            # Yang-Zhang 공식
-            k = 0.34 / (1.34 + (n + 1) / (n - 1))
-            yz_var = var_open + k * var_close + (1 - k) * var_rs
-            
-            # 연환산 (일일 → 연간, 252 거래일)
-            annual_vol = np.sqrt(yz_var * 252)
+            # 최근 n일 로그 수익률 → 연환산 (공용 지표 함수, 252 거래일)
+            components = yang_zhang_components(open_[-n:], high[-n:], low[-n:], close[-n:])
+            annual_vol = yang_zhang_volatility(components)
             
-            return round(float(annual_vol), 4)
+            return round(annual_vol, 4)
             
         except Exception as e:
             self.log_message.emit(f"⚠️ 변동성 계산 오류: {str(e)}")
@@ -348,6 +337,7 @@ if __name__ == "__main__":
     print(f"  HALT_LONG: {rm.check_kill_switch(15, 18, 0.06)}")  # 금리 급등
     print(f"  HALT_NEW: {rm.check_kill_switch(15, 18, 0, True, True)}")  # 다이버전스
     print(f"  CLEAR: {rm.check_kill_switch(15, 18)}")            # 정상
+    print(f"  커브 HALT_ALL: {rm.check_kill_switch(15, 18, curve=np.array([21.0, 20.0, 19.5]))}")  # 30일 > 90일
     
     # 포지션 사이징 테스트
     print("\n📋 포지션 사이징 테스트:")
@@ -0,0 +1,262 @@
+"""
+============================================
+롤링 통계 엔진 - 증분 평균/표준편차/백분위
+============================================
+- 링 버퍼 1개로 여러 기간(21/63/126/252일)을 동시에 관리
+- 새 종가 1개 추가 시 기간별 평균/분산을 O(1)로 갱신
+  (슬라이딩 윈도우 Welford 갱신식)
+- 백분위 순위는 기간별 정렬 리스트 + 이진 탐색
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import bisect
+import math
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class _WindowState:
+    """단일 기간 상태 (개수, 평균, 편차 제곱합, 정렬 리스트)"""
+    
+    __slots__ = ("size", "count", "mean", "m2", "sorted_values")
+    
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sorted_values: list = []
+
+
+class RollingStats:
+    """
+    다중 기간 롤링 통계
+    
+    사용법:
+        stats = RollingStats(windows=(21, 63, 126, 252))
+        stats.seed(vix_closes)        # 과거 종가로 초기화
+        stats.push(new_close)         # 새 일봉 종가 도착 시
+        stats.replace_last(close)     # 같은 날 종가 수정 시
+        stats.z_score(realtime_vix, 126)
+    """
+    
+    DEFAULT_WINDOWS: Tuple[int, ...] = (21, 63, 126, 252)
+    
+    def __init__(self, windows: Iterable[int] = DEFAULT_WINDOWS) -> None:
+        """
+        초기화
+        
+        Args:
+            windows: 관리할 기간 목록 (일)
+        """
+        self.windows: Tuple[int, ...] = tuple(sorted(set(windows)))
+        if not self.windows or self.windows[0] < 2:
+            raise ValueError("기간은 2 이상이어야 합니다")
+        
+        # 가장 긴 기간만큼만 보관하는 링 버퍼
+        self._buffer: deque = deque(maxlen=self.windows[-1])
+        self._states: Dict[int, _WindowState] = {w: _WindowState(w) for w in self.windows}
+    
+    # ============================================
+    # 갱신
+    # ============================================
+    
+    def push(self, value: float) -> None:
+        """
+        새 값 추가 (기간별 O(1) 평균/분산 갱신)
+        
+        Args:
+            value: 새 종가
+        """
+        value = float(value)
+        buffer = self._buffer
+        
+        for state in self._states.values():
+            if state.count < state.size:
+                # 윈도우가 아직 차지 않음 → 일반 Welford
+                state.count += 1
+                delta = value - state.mean
+                state.mean += delta / state.count
+                state.m2 += delta * (value - state.mean)
+            else:
+                # 윈도우가 가득 참 → 가장 오래된 값을 빼고 새 값 추가
+                old = buffer[-state.size]
+                old_mean = state.mean
+                state.mean += (value - old) / state.size
+                state.m2 += (value - old) * (value - state.mean + old - old_mean)
+                del state.sorted_values[bisect.bisect_left(state.sorted_values, old)]
+            
+            bisect.insort(state.sorted_values, value)
+        
+        buffer.append(value)
+    
+    def replace_last(self, value: float) -> None:
+        """
+        가장 최근 값 교체 (같은 날 종가 수정, 기간별 O(1) 평균/분산 갱신)
+        
+        Args:
+            value: 수정된 종가
+        """
+        if not self._buffer:
+            self.push(value)
+            return
+        
+        value = float(value)
+        old = self._buffer[-1]
+        for state in self._states.values():
+            # 마지막 값은 모든 기간에 포함 → 빼고 넣기
+            old_mean = state.mean
+            state.mean += (value - old) / state.count
+            state.m2 += (value - old) * (value - state.mean + old - old_mean)
+            del state.sorted_values[bisect.bisect_left(state.sorted_values, old)]
+            bisect.insort(state.sorted_values, value)
+        
+        self._buffer[-1] = value
+    
+    def seed(self, values: Iterable[float]) -> None:
+        """
+        과거 값으로 초기화 (기존 상태 제거)
+        
+        Args:
+            values: 오래된 순서의 값 목록
+        """
+        self.reset()
+        for value in values:
+            self.push(value)
+    
+    def reset(self) -> None:
+        """모든 상태 초기화"""
+        self._buffer.clear()
+        self._states = {w: _WindowState(w) for w in self.windows}
+    
+    # ============================================
+    # 조회
+    # ============================================
+    
+    def _state(self, window: int) -> _WindowState:
+        """기간 상태 조회 (지원하지 않는 기간이면 KeyError)"""
+        state = self._states.get(window)
+        if state is None:
+            raise KeyError(f"지원하지 않는 기간: {window} (지원: {self.windows})")
+        return state
+    
+    def count(self, window: int) -> int:
+        """기간 내 값 개수"""
+        return self._state(window).count
+    
+    def last(self) -> Optional[float]:
+        """가장 최근 값"""
+        return self._buffer[-1] if self._buffer else None
+    
+    def values(self) -> list:
+        """보관 중인 값 (오래된 순서, 가장 긴 기간만큼)"""
+        return list(self._buffer)
+    
+    def mean(self, window: int) -> float:
+        """기간 평균"""
+        return self._state(window).mean
+    
+    def std(self, window: int) -> float:
+        """기간 표본 표준편차 (ddof=1, pandas와 동일)"""
+        state = self._state(window)
+        if state.count < 2:
+            return 0.0
+        return math.sqrt(max(state.m2, 0.0) / (state.count - 1))
+    
+    def z_score(self, value: float, window: int) -> float:
+        """
+        Z-Score 계산
+        
+        Args:
+            value: 비교할 값 (예: 실시간 VIX)
+            window: 기간
+        
+        Returns:
+            (value - mean) / std, 표준편차가 0이면 0.0
+        """
+        std = self.std(window)
+        if std == 0:
+            return 0.0
+        return (value - self.mean(window)) / std
+    
+    def percentile_rank(self, value: float, window: int) -> float:
+        """
+        백분위 순위 (기간 내 value 이하인 값의 비율)
+        
+        Args:
+            value: 비교할 값
+            window: 기간
+        
+        Returns:
+            0.0 ~ 1.0
+        """
+        state = self._state(window)
+        if state.count == 0:
+            return 0.0
+        return bisect.bisect_right(state.sorted_values, value) / state.count
+    
+    def snapshot(self, value: float) -> Dict[int, Dict[str, float]]:
+        """
+        모든 기간 통계를 한 번에 반환
+        
+        Args:
+            value: Z-Score/백분위 기준값
+        
+        Returns:
+            {window: {"mean", "std", "z_score", "percentile"}}
+        """
+        return {
+            w: {
+                "mean": self.mean(w),
+                "std": self.std(w),
+                "z_score": self.z_score(value, w),
+                "percentile": self.percentile_rank(value, w),
+            }
+            for w in self.windows
+        }
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import numpy as np
+    
+    print("=" * 50)
+    print("롤링 통계 엔진 테스트")
+    print("=" * 50)
+    
+    rng = np.random.default_rng(42)
+    closes = 18 + rng.standard_normal(400).cumsum() * 0.5
+    
+    stats = RollingStats()
+    stats.seed(closes)
+    
+    all_passed = True
+    for w in stats.windows:
+        window = closes[-w:]
+        ok_mean = abs(stats.mean(w) - window.mean()) < 1e-9
+        ok_std = abs(stats.std(w) - window.std(ddof=1)) < 1e-9
+        ok_pct = abs(stats.percentile_rank(closes[-1], w) - np.mean(window <= closes[-1])) < 1e-12
+        status = "✅" if ok_mean and ok_std and ok_pct else "❌"
+        all_passed &= ok_mean and ok_std and ok_pct
+        print(f"  {status} {w}일: mean={stats.mean(w):.4f}, std={stats.std(w):.4f}, "
+              f"z={stats.z_score(closes[-1], w):.2f}")
+    
+    # 같은 날 종가 수정 → 마지막 값 교체 = 재초기화 결과
+    revised = closes.copy()
+    revised[-1] += 1.7
+    stats.replace_last(revised[-1])
+    reseeded = RollingStats()
+    reseeded.seed(revised)
+    ok_replace = all(abs(stats.mean(w) - reseeded.mean(w)) < 1e-9
+                     and abs(stats.std(w) - reseeded.std(w)) < 1e-9
+                     and stats.percentile_rank(revised[-1], w) == reseeded.percentile_rank(revised[-1], w)
+                     for w in stats.windows)
+    all_passed &= ok_replace
+    print(f"  {'✅' if ok_replace else '❌'} 마지막 값 교체 = 재초기화")
+    
+    print("\n✅ 모든 테스트 통과!" if all_passed else "\n❌ 일부 테스트 실패")
@@ -15,9 +15,10 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 
 import pandas as pd
-import yfinance as yf
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from core.yf_client import get_yf_client
+
 
 class UniverseSelector(QThread):
     """
@@ -62,8 +63,7 @@ class UniverseSelector(QThread):
             모멘텀 스코어 (높을수록 강함)
         """
         try:
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="6mo")
+            hist = get_yf_client().history(symbol, period="6mo")
             
             if len(hist) < 20:
                 self.log_message.emit(f"⚠️ {symbol}: 데이터 부족")
@@ -187,10 +187,10 @@ class GrowthStockScanner(QThread):
         
         for symbol in self.SCAN_UNIVERSE:
             try:
-                ticker = yf.Ticker(symbol)
+                client = get_yf_client()
                 
                 # === 필터 1: 기본 데이터 확인 ===
-                hist = ticker.history(period="3mo")
+                hist = client.history(symbol, period="3mo")
                 if len(hist) < 20:
                     continue
                 
@@ -205,7 +205,7 @@ class GrowthStockScanner(QThread):
                 
                 # === 필터 3: 52주 신고가 근접 ===
                 try:
-                    high_52w = ticker.info.get("fiftyTwoWeekHigh", 0)
+                    high_52w = client.info(symbol).get("fiftyTwoWeekHigh", 0)
                     if high_52w > 0:
                         proximity = current_price / high_52w
                         if proximity < 0.85:  # 85% 이상이어야 함
@@ -0,0 +1,568 @@
+"""
+============================================
+시장 데이터 저장소 - SQLite (WAL + 커넥션 풀)
+============================================
+- WAL 모드: 기록 중에도 읽기가 막히지 않음
+- 기록 전용 커넥션 1개 (락으로 직렬화)
+- 읽기 전용 커넥션 풀 (스레드별로 빌려 쓰고 반납)
+- pragma 튜닝: synchronous, mmap_size, cache_size
+- 모든 SQL은 이 모듈에만 둠 (MarketDataManager는 호출만)
+- 압축 스키마: (symbol_id, date_int) 클러스터드 WITHOUT ROWID 테이블
+  + symbols 사전 테이블 + 정수 날짜 (1970-01-01 기준 일수)
+- 구버전 DB(AUTOINCREMENT id, TEXT 날짜)는 열 때 자동 마이그레이션 (단일 트랜잭션, 중단 시 재개)
+- 장중 봉: (symbol_id, timeframe, ts) 클러스터드 WITHOUT ROWID 테이블
+- 레짐 라벨: (timeframe, ts) 클러스터드 WITHOUT ROWID 테이블 (봉별 레짐 + 입력 지표)
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+# 기본 데이터베이스 경로
+DB_PATH = Path(__file__).parent.parent / "data" / "market_data.db"
+
+# 스키마 버전 (PRAGMA user_version)
+# 0: 구버전 (id AUTOINCREMENT, symbol TEXT, date TEXT)
+# 2: symbols 사전 + historical_prices(symbol_id, date_int) WITHOUT ROWID
+# 3: intraday_bars(symbol_id, timeframe, ts) WITHOUT ROWID 추가
+# 4: regime_labels(timeframe, ts) WITHOUT ROWID 추가
+SCHEMA_VERSION = 4
+
+# 정수 날짜 기준일 (date_int = 1970-01-01로부터 일수)
+EPOCH = date(1970, 1, 1)
+
+
+def to_date_int(value: str) -> int:
+    """"YYYY-MM-DD" → 정수 날짜 (epoch-day)"""
+    return (date.fromisoformat(value) - EPOCH).days
+
+
+def from_date_int(value: int) -> str:
+    """정수 날짜 (epoch-day) → "YYYY-MM-DD" """
+    return (EPOCH + timedelta(days=int(value))).isoformat()
+
+
+class MarketDatabase:
+    """
+    시장 데이터 SQLite 저장소
+    
+    사용법:
+        db = MarketDatabase()
+        db.open()
+        db.upsert_daily_bars("SPY", rows)
+        rows = db.load_daily_bars("SPY")
+        db.close()
+    """
+    
+    # === 설정값 (.env에서 로드) ===
+    READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "4"))        # 읽기 커넥션 수
+    MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256MB
+    CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "65536"))      # 64MB
+    BUSY_TIMEOUT_MS = 5000                                           # 락 대기 최대 5초
+    
+    def __init__(self, path: Path = DB_PATH) -> None:
+        """
+        초기화
+        
+        Args:
+            path: 데이터베이스 파일 경로
+        """
+        self.path = Path(path)
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        
+        # 심볼 → symbol_id 캐시
+        self._symbol_ids: Dict[str, int] = {}
+        
+        # 읽기 커넥션 풀 (필요할 때 생성, 최대 READ_POOL_SIZE개)
+        self._read_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._read_conns: List[sqlite3.Connection] = []
+    
+    # ============================================
+    # 연결 관리
+    # ============================================
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """튜닝된 pragma를 적용한 커넥션 생성"""
+        conn = sqlite3.connect(
+            str(self.path),
+            timeout=self.BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,   # 풀에서 스레드 간 이동 (동시 사용은 없음)
+        )
+        conn.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous = NORMAL")      # WAL에서 안전 + 빠름
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA mmap_size = {self.MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size = -{self.CACHE_SIZE_KB}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        return conn
+    
+    def open(self) -> None:
+        """
+        데이터베이스 열기 (이미 열려 있으면 무시)
+        
+        - data 폴더 생성
+        - WAL 모드 전환 (파일에 영구 저장됨)
+        - 스키마 생성 / 구버전 마이그레이션
+        """
+        with self._open_lock:
+            if self._writer is not None:
+                return
+            
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            writer = self._connect()
+            writer.execute("PRAGMA journal_mode = WAL")
+            self._writer = writer
+            try:
+                self._create_schema()
+            except Exception:
+                # 스키마/마이그레이션 실패 → 열리지 않은 상태로 (다음 open()에서 재시도)
+                self._writer = None
+                writer.close()
+                raise
+    
+    def is_open(self) -> bool:
+        """열려 있는지 확인"""
+        return self._writer is not None
+    
+    def close(self) -> None:
+        """모든 커넥션 닫기"""
+        with self._open_lock:
+            with self._write_lock:
+                if self._writer is not None:
+                    self._writer.close()
+                    self._writer = None
+            
+            self._symbol_ids = {}
+            for conn in self._read_conns:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._read_conns = []
+            self._read_pool = queue.LifoQueue()
+    
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """
+        기록 커넥션 (단일 기록자, 트랜잭션)
+        
+        with 블록이 끝나면 commit, 예외 시 rollback 됩니다.
+        """
+        if self._writer is None:
+            self.open()
+        with self._write_lock:
+            with self._writer:
+                yield self._writer
+    
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        읽기 커넥션 대여 (풀에서 빌리고 반납)
+        
+        풀이 비어 있고 최대 개수 미만이면 새로 만들고,
+        최대 개수에 도달했으면 반납될 때까지 기다립니다.
+        """
+        if self._writer is None:
+            self.open()
+        
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._open_lock:
+                if len(self._read_conns) < self.READ_POOL_SIZE:
+                    conn = self._connect(read_only=True)
+                    self._read_conns.append(conn)
+            if conn is None:
+                conn = self._read_pool.get()
+        
+        try:
+            yield conn
+        finally:
+            self._read_pool.put(conn)
+    
+    # ============================================
+    # 스키마
+    # ============================================
+    
+    def _create_schema(self) -> None:
+        """테이블 생성 + 구버전 자동 마이그레이션"""
+        conn = self._writer
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(historical_prices)")]
+        is_legacy = "date" in columns    # 구버전: TEXT date 컬럼
+        
+        # 중단된 마이그레이션 (이름만 바뀐 구버전 테이블이 남아 있음) → 이어서 이전
+        leftover = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'historical_prices_legacy'"
+        ).fetchone() is not None
+        migrate = is_legacy or leftover
+        
+        # sqlite3 모듈은 DDL에 트랜잭션을 자동으로 열지 않음
+        # → 명시적 BEGIN으로 이름 변경/생성/복사/삭제를 하나의 트랜잭션으로 묶음
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 심볼 사전 테이블
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS symbols (
+                    symbol_id INTEGER PRIMARY KEY,
+                    symbol TEXT NOT NULL UNIQUE
+                )
+            """)
+            
+            if is_legacy:
+                conn.execute("ALTER TABLE historical_prices RENAME TO historical_prices_legacy")
+            
+            # 일봉 테이블 (클러스터드: 심볼별 날짜 순으로 연속 저장)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS historical_prices (
+                    symbol_id INTEGER NOT NULL,
+                    date_int INTEGER NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume INTEGER,
+                    PRIMARY KEY (symbol_id, date_int)
+                ) WITHOUT ROWID
+            """)
+            
+            # 장중 봉 테이블 (timeframe: 봉 길이 초, ts: 봉 시작 epoch 초)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS intraday_bars (
+                    symbol_id INTEGER NOT NULL,
+                    timeframe INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume INTEGER,
+                    PRIMARY KEY (symbol_id, timeframe, ts)
+                ) WITHOUT ROWID
+            """)
+            
+            # 레짐 라벨 테이블 (timeframe: 봉 길이 초, ts: 봉 시작 epoch 초, regime: 레짐 코드)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS regime_labels (
+                    timeframe INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    regime INTEGER NOT NULL,
+                    z_score REAL,
+                    ker REAL,
+                    adx REAL,
+                    PRIMARY KEY (timeframe, ts)
+                ) WITHOUT ROWID
+            """)
+            
+            if migrate:
+                self._migrate_legacy(conn)
+            
+            if version < SCHEMA_VERSION:
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        
+        # 마이그레이션으로 비워진 페이지 반환 (트랜잭션 밖에서만 가능)
+        if migrate:
+            conn.execute("VACUUM")
+    
+    def _migrate_legacy(self, conn: sqlite3.Connection) -> None:
+        """
+        구버전 테이블 → 압축 스키마로 이전 (_create_schema의 명시적 트랜잭션 안에서 실행)
+        
+        중단된 이전(historical_prices_legacy만 남은 상태)도 같은 방식으로 이어서 처리
+        (INSERT OR REPLACE라 이미 복사된 행과 겹쳐도 안전)
+        
+        - 심볼 문자열 → symbols 사전
+        - TEXT 날짜 → 정수 날짜 (julianday 기준 변환)
+        - 구버전 테이블/인덱스 삭제
+        """
+        conn.execute("""
+            INSERT OR IGNORE INTO symbols (symbol)
+            SELECT DISTINCT symbol FROM historical_prices_legacy
+        """)
+        conn.execute("""
+            INSERT OR REPLACE INTO historical_prices
+            (symbol_id, date_int, open, high, low, close, volume)
+            SELECT s.symbol_id,
+                   CAST(julianday(h.date) - 2440587.5 AS INTEGER),
+                   h.open, h.high, h.low, h.close, h.volume
+            FROM historical_prices_legacy AS h
+            JOIN symbols AS s ON s.symbol = h.symbol
+            WHERE julianday(h.date) IS NOT NULL
+        """)
+        conn.execute("DROP INDEX IF EXISTS idx_symbol_date")
+        conn.execute("DROP TABLE historical_prices_legacy")
+    
+    def _symbol_id(self, symbol: str, create: bool = False) -> Optional[int]:
+        """
+        심볼 → symbol_id 조회 (메모리 캐시)
+        
+        Args:
+            symbol: 심볼
+            create: 없으면 새로 등록 (기록 트랜잭션 안에서만 True)
+        """
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is not None:
+            return symbol_id
+        
+        if create:
+            self._writer.execute(
+                "INSERT OR IGNORE INTO symbols (symbol) VALUES (?)", (symbol,)
+            )
+            row = self._writer.execute(
+                "SELECT symbol_id FROM symbols WHERE symbol = ?", (symbol,)
+            ).fetchone()
+        else:
+            with self.reader() as conn:
+                row = conn.execute(
+                    "SELECT symbol_id FROM symbols WHERE symbol = ?", (symbol,)
+                ).fetchone()
+        
+        if row is None:
+            return None
+        
+        self._symbol_ids[symbol] = row[0]
+        return row[0]
+    
+    def list_symbols(self) -> List[str]:
+        """저장된 심볼 목록"""
+        with self.reader() as conn:
+            return [row[0] for row in conn.execute("SELECT symbol FROM symbols ORDER BY symbol")]
+    
+    # ============================================
+    # 일봉 데이터
+    # ============================================
+    
+    def count_daily_bars(self, symbol: str) -> int:
+        """심볼의 데이터 개수 조회"""
+        symbol_id = self._symbol_id(symbol)
+        if symbol_id is None:
+            return 0
+        with self.reader() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM historical_prices WHERE symbol_id = ?",
+                (symbol_id,)
+            ).fetchone()
+        return row[0]
+    
+    def last_daily_date(self, symbol: str) -> Optional[str]:
+        """심볼의 마지막 날짜 조회 ("YYYY-MM-DD")"""
+        symbol_id = self._symbol_id(symbol)
+        if symbol_id is None:
+            return None
+        with self.reader() as conn:
+            row = conn.execute(
+                "SELECT MAX(date_int) FROM historical_prices WHERE symbol_id = ?",
+                (symbol_id,)
+            ).fetchone()
+        return None if row[0] is None else from_date_int(row[0])
+    
+    def load_daily_bars(self, symbol: str, since_date: int = 0) -> List[Tuple]:
+        """
+        심볼 일봉 조회 (날짜 오름차순, 연속 페이지 범위 스캔)
+        
+        Args:
+            symbol: 심볼
+            since_date: 이 날짜(1970-01-01 기준 일수) 이후 봉만 (기본 전체)
+        
+        Returns:
+            [(date_int, open, high, low, close, volume), ...]
+        """
+        symbol_id = self._symbol_id(symbol)
+        if symbol_id is None:
+            return []
+        with self.reader() as conn:
+            return conn.execute("""
+                SELECT date_int, open, high, low, close, volume
+                FROM historical_prices
+                WHERE symbol_id = ? AND date_int >= ?
+                ORDER BY date_int ASC
+            """, (symbol_id, since_date)).fetchall()
+    
+    def upsert_daily_bars(self, symbol: str, rows: Iterable[Tuple]) -> int:
+        """
+        일봉 일괄 저장 (단일 트랜잭션, 변경된 행만 갱신)
+        
+        Args:
+            symbol: 심볼
+            rows: [(date_int, open, high, low, close, volume), ...]
+        
+        Returns:
+            실제로 삽입/갱신된 행 수
+        """
+        with self.writer() as conn:
+            symbol_id = self._symbol_id(symbol, create=True)
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT INTO historical_prices
+                (symbol_id, date_int, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(symbol_id, date_int) DO UPDATE SET
+                    open = excluded.open,
+                    high = excluded.high,
+                    low = excluded.low,
+                    close = excluded.close,
+                    volume = excluded.volume
+                WHERE open IS NOT excluded.open
+                   OR high IS NOT excluded.high
+                   OR low IS NOT excluded.low
+                   OR close IS NOT excluded.close
+                   OR volume IS NOT excluded.volume
+            """, ((symbol_id,) + tuple(row) for row in rows))
+            return conn.total_changes - before
+
+
+    # ============================================
+    # 장중 봉 데이터
+    # ============================================
+    
+    def load_intraday_bars(self, symbol: str, timeframe: int,
+                           since_ts: int = 0) -> List[Tuple]:
+        """
+        장중 봉 조회 (시작 시각 오름차순)
+        
+        Args:
+            symbol: 심볼
+            timeframe: 봉 길이 (초)
+            since_ts: 이 시각(epoch 초) 이후 봉만
+        
+        Returns:
+            [(ts, open, high, low, close, volume), ...]
+        """
+        symbol_id = self._symbol_id(symbol)
+        if symbol_id is None:
+            return []
+        with self.reader() as conn:
+            return conn.execute("""
+                SELECT ts, open, high, low, close, volume
+                FROM intraday_bars
+                WHERE symbol_id = ? AND timeframe = ? AND ts >= ?
+                ORDER BY ts ASC
+            """, (symbol_id, timeframe, since_ts)).fetchall()
+    
+    def upsert_intraday_bars(self, bars: Iterable[Tuple]) -> int:
+        """
+        마감된 장중 봉 일괄 저장 (단일 트랜잭션)
+        
+        Args:
+            bars: [(symbol, timeframe, ts, open, high, low, close, volume), ...]
+        
+        Returns:
+            삽입/갱신된 행 수
+        """
+        with self.writer() as conn:
+            rows = [
+                (self._symbol_id(bar[0], create=True),) + tuple(bar[1:])
+                for bar in bars
+            ]
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT INTO intraday_bars
+                (symbol_id, timeframe, ts, open, high, low, close, volume)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(symbol_id, timeframe, ts) DO UPDATE SET
+                    open = excluded.open,
+                    high = excluded.high,
+                    low = excluded.low,
+                    close = excluded.close,
+                    volume = excluded.volume
+            """, rows)
+            return conn.total_changes - before
+    
+    # ============================================
+    # 레짐 라벨
+    # ============================================
+    
+    def load_regime_labels(self, timeframe: int, since_ts: int = 0) -> List[Tuple]:
+        """
+        레짐 라벨 조회 (시각 오름차순)
+        
+        Args:
+            timeframe: 봉 길이 (초, 일봉 86400)
+            since_ts: 이 시각(epoch 초) 이후 라벨만
+        
+        Returns:
+            [(ts, regime, z_score, ker, adx), ...]
+        """
+        with self.reader() as conn:
+            return conn.execute("""
+                SELECT ts, regime, z_score, ker, adx
+                FROM regime_labels
+                WHERE timeframe = ? AND ts >= ?
+                ORDER BY ts ASC
+            """, (timeframe, since_ts)).fetchall()
+    
+    def upsert_regime_labels(self, timeframe: int, rows: Iterable[Tuple]) -> int:
+        """
+        레짐 라벨 일괄 저장 (단일 트랜잭션, 변경된 행만 갱신)
+        
+        Args:
+            timeframe: 봉 길이 (초)
+            rows: [(ts, regime, z_score, ker, adx), ...]
+        
+        Returns:
+            실제로 삽입/갱신된 행 수
+        """
+        with self.writer() as conn:
+            before = conn.total_changes
+            conn.executemany("""
+                INSERT INTO regime_labels (timeframe, ts, regime, z_score, ker, adx)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(timeframe, ts) DO UPDATE SET
+                    regime = excluded.regime,
+                    z_score = excluded.z_score,
+                    ker = excluded.ker,
+                    adx = excluded.adx
+                WHERE regime IS NOT excluded.regime
+                   OR z_score IS NOT excluded.z_score
+                   OR ker IS NOT excluded.ker
+                   OR adx IS NOT excluded.adx
+            """, ((timeframe,) + tuple(row) for row in rows))
+            return conn.total_changes - before
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db = MarketDatabase(Path(tmp) / "test.db")
+        db.open()
+        
+        with db.reader() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        print(f"저널 모드: {mode} (wal 예상)")
+        
+        rows = [(to_date_int("2024-01-02"), 1.0, 2.0, 0.5, 1.5, 100),
+                (to_date_int("2024-01-03"), 1.5, 2.5, 1.0, 2.0, 200)]
+        print(f"첫 저장: {db.upsert_daily_bars('SPY', rows)}행 (2 예상)")
+        print(f"재저장: {db.upsert_daily_bars('SPY', rows)}행 (0 예상)")
+        print(f"개수: {db.count_daily_bars('SPY')}, 마지막: {db.last_daily_date('SPY')}")
+        print(f"조회: {db.load_daily_bars('SPY')}")
+        
+        db.close()
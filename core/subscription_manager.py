@@ -0,0 +1,210 @@
+"""
+============================================
+시세 회선 관리자 - IB 동시 구독 한도 안에서 우선순위 배분
+============================================
+- IB 계정은 동시 스트리밍 시세 회선 수가 제한됨 (기본 100)
+- 요청 심볼마다 우선순위: 보유/거래 > 레짐 입력 > 스캐너 후보
+- 회선이 모자라면 낮은 우선순위 → 같은 우선순위에서는 가장 오래 요청이
+  없던 심볼(LRU)부터 스트리밍에서 제외
+- 제외된 심볼은 스냅샷 요청으로 돌아가며 갱신 (순환)
+- 요청은 우선순위별로 따로 기록 → 보유가 끝난 종목은 거래 요청만 철회
+  (레짐/스캐너 요청이 남아 있으면 그 우선순위로 내려감)
+- 실제 IB 호출은 하지 않음 → 브릿지 루프가 plan() 결과대로 실행
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import os
+import time
+from typing import Dict, Iterable, List, Set, Tuple
+
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+# 우선순위 (작을수록 중요)
+PRIORITY_TRADED = 0      # 주문/보유 종목
+PRIORITY_REGIME = 1      # 레짐/킬 스위치 입력 (SPY, VIX 등)
+PRIORITY_SCANNER = 2     # 스캐너 후보 (레버리지/인버스 ETF 등)
+
+
+class SubscriptionManager:
+    """
+    시세 회선 배분기
+    
+    사용법:
+        lines = SubscriptionManager()
+        lines.request(["SPY", "VIX"], PRIORITY_REGIME)
+        lines.request(["SOXL", "TECL"], PRIORITY_SCANNER)
+        to_add, to_drop = lines.plan(streaming=current, capacity=98)
+        rotation = lines.next_snapshot_batch(streaming=current)
+    """
+    
+    # === 설정값 (.env에서 로드) ===
+    MAX_LINES = int(os.getenv("IB_MAX_LINES", "100"))                   # 동시 시세 회선 한도
+    SNAPSHOT_BATCH = int(os.getenv("IB_SNAPSHOT_BATCH", "5"))           # 순환 1회당 스냅샷 수
+    ROTATION_S = float(os.getenv("IB_SNAPSHOT_ROTATION_S", "10"))       # 스냅샷 순환 주기 (초)
+    
+    def __init__(self) -> None:
+        """초기화"""
+        self._claims: Dict[str, Set[int]] = {}     # 심볼 → 요청된 우선순위들
+        self._priority: Dict[str, int] = {}        # 심볼 → 유효 우선순위 (요청 중 최우선)
+        self._last_request: Dict[str, float] = {}  # 심볼 → 마지막 요청 (monotonic, LRU)
+        self._rotation_cursor = 0
+    
+    # ============================================
+    # 요청 / 해제
+    # ============================================
+    
+    def request(self, symbols: Iterable[str], priority: int) -> None:
+        """
+        심볼 요청 (유효 우선순위는 요청 중 최우선, LRU 갱신)
+        
+        Args:
+            symbols: 심볼 목록
+            priority: PRIORITY_TRADED / PRIORITY_REGIME / PRIORITY_SCANNER
+        """
+        now = time.monotonic()
+        for symbol in symbols:
+            claims = self._claims.setdefault(symbol, set())
+            claims.add(priority)
+            self._priority[symbol] = min(claims)
+            self._last_request[symbol] = now
+    
+    def withdraw(self, symbol: str, priority: int) -> bool:
+        """
+        한 우선순위의 요청만 철회 (다른 요청이 남으면 그 우선순위로 내려감)
+        
+        Args:
+            symbol: 심볼
+            priority: 철회할 우선순위 (예: 보유 종료 → PRIORITY_TRADED)
+        
+        Returns:
+            유효 우선순위가 바뀌었거나 요청이 없어졌으면 True
+        """
+        claims = self._claims.get(symbol)
+        if not claims or priority not in claims:
+            return False
+        
+        claims.discard(priority)
+        if not claims:
+            self.release(symbol)
+            return True
+        
+        before = self._priority[symbol]
+        self._priority[symbol] = min(claims)
+        return self._priority[symbol] != before
+    
+    def release(self, symbol: str) -> None:
+        """심볼 요청 전체 해제"""
+        self._claims.pop(symbol, None)
+        self._priority.pop(symbol, None)
+        self._last_request.pop(symbol, None)
+    
+    def priority(self, symbol: str) -> int:
+        """심볼 우선순위 (미요청이면 -1)"""
+        return self._priority.get(symbol, -1)
+    
+    def wanted(self) -> List[str]:
+        """요청된 심볼 (중요한 순: 우선순위 → 최근 요청)"""
+        return sorted(
+            self._priority,
+            key=lambda s: (self._priority[s], -self._last_request.get(s, 0.0)),
+        )
+    
+    # ============================================
+    # 배분 계획
+    # ============================================
+    
+    def plan(self, streaming: Iterable[str], capacity: int) -> Tuple[List[str], List[str]]:
+        """
+        회선 배분 계획
+        
+        Args:
+            streaming: 현재 스트리밍 중인 (관리 대상) 심볼
+            capacity: 관리 대상에 쓸 수 있는 회선 수
+        
+        Returns:
+            (새로 스트리밍할 심볼, 스트리밍을 끊을 심볼)
+        """
+        streaming_set: Set[str] = set(streaming)
+        keep = set(self.wanted()[:max(0, capacity)])
+        
+        to_add = [s for s in self.wanted() if s in keep and s not in streaming_set]
+        to_drop = [s for s in streaming_set if s not in keep]
+        return to_add, to_drop
+    
+    def overflow(self, streaming: Iterable[str]) -> List[str]:
+        """요청됐지만 스트리밍하지 못한 심볼 (중요한 순)"""
+        streaming_set = set(streaming)
+        return [s for s in self.wanted() if s not in streaming_set]
+    
+    def next_snapshot_batch(self, streaming: Iterable[str]) -> List[str]:
+        """
+        이번 순환에서 스냅샷으로 갱신할 심볼 (넘친 심볼을 돌아가며)
+        
+        Args:
+            streaming: 현재 스트리밍 중인 심볼
+        
+        Returns:
+            최대 SNAPSHOT_BATCH개 심볼
+        """
+        overflow = self.overflow(streaming)
+        if not overflow:
+            self._rotation_cursor = 0
+            return []
+        
+        start = self._rotation_cursor % len(overflow)
+        count = min(self.SNAPSHOT_BATCH, len(overflow))
+        batch = [overflow[(start + i) % len(overflow)] for i in range(count)]
+        self._rotation_cursor = start + count
+        return batch
+    
+    def streaming_capacity(self, free_lines: int) -> int:
+        """
+        스트리밍에 쓸 회선 수
+        
+        Args:
+            free_lines: 관리 대상에 남은 회선 (한도 - 별도 구독)
+        
+        Returns:
+            요청이 회선보다 많으면 스냅샷 순환분(SNAPSHOT_BATCH)을 비워둔 값
+        """
+        if len(self._priority) <= free_lines:
+            return free_lines
+        return max(0, free_lines - self.SNAPSHOT_BATCH)
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    lines = SubscriptionManager()
+    lines.SNAPSHOT_BATCH = 2
+    
+    lines.request(["SPY", "QQQ", "VIX"], PRIORITY_REGIME)
+    lines.request(["TQQQ", "SOXL", "TECL", "FNGU", "SQQQ", "SPXS", "SDOW"], PRIORITY_SCANNER)
+    lines.request(["SOXL"], PRIORITY_TRADED)     # 주문 → 최우선
+    
+    streaming: Set[str] = set()
+    to_add, to_drop = lines.plan(streaming, capacity=6)
+    streaming.update(to_add)
+    print(f"스트리밍: {to_add}")
+    print(f"넘침: {lines.overflow(streaming)}")
+    
+    # 스캐너가 FNGU를 다시 요청 → LRU 갱신으로 스트리밍 진입, 가장 오래된 후보가 빠짐
+    lines.request(["FNGU"], PRIORITY_SCANNER)
+    to_add, to_drop = lines.plan(streaming, capacity=6)
+    print(f"재배분: +{to_add} -{to_drop}")
+    streaming.difference_update(to_drop)
+    streaming.update(to_add)
+    
+    for i in range(3):
+        print(f"스냅샷 순환 {i + 1}: {lines.next_snapshot_batch(streaming)}")
+    
+    # 보유 종료 → 거래 요청만 철회 (스캐너 요청은 남음)
+    lines.withdraw("SOXL", PRIORITY_TRADED)
+    print(f"SOXL 보유 종료: 우선순위 {lines.priority('SOXL')} (스캐너 {PRIORITY_SCANNER} 예상)")
@@ -0,0 +1,540 @@
+"""
+============================================
+트레이딩 엔진 - GUI 스레드와 분리된 의사결정 워커
+============================================
+- 전용 QThread에서 실행 (moveToThread)
+- 시장 데이터 / 레짐 탐지 / 리스크 / 전략을 소유
+- 틱·VIX 선물·일봉 갱신 → EventScheduler → 필요한 단계만 재평가
+- 대시보드와는 상태 스냅샷 시그널로만 통신 (주기 제한, 변경 시에만)
+- 주문은 order_requested 시그널로 메인 스레드(OrderExecutor)에 전달
+
+⚠️ 핵심 규칙:
+- 엔진 스레드에서 GUI 위젯 직접 호출 금지!
+- 킬 스위치가 항상 1순위
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import math
+import os
+import time
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+from core.bar_aggregator import session_start_ts
+from core.event_scheduler import EventScheduler
+from core.regime_detector import RegimeDetector
+from core.regime_timeline import RegimeTimeline
+from core.risk_manager import RiskManager
+from core.scanner import UniverseSelector
+from strategy.green_mode import GreenModeStrategy
+from strategy.red_mode import RedModeStrategy
+from strategy.black_mode import BlackModeStrategy
+
+# .env 파일 로드
+load_dotenv()
+
+
+class TradingEngine(QObject):
+    """
+    트레이딩 엔진 (워커 객체)
+    
+    사용법:
+        engine = TradingEngine(market_data)
+        thread = QThread()
+        engine.move_to_thread(thread)
+        thread.start()
+        QMetaObject.invokeMethod(engine, "start", Qt.ConnectionType.QueuedConnection)
+    
+    Signals:
+        state_snapshot(dict): 대시보드 표시 상태 (주기 제한)
+        order_requested(dict): 전략 주문 신호 (메인 스레드에서 실행)
+        log_message(str): 로그 메시지
+    """
+    
+    # === PyQt Signals ===
+    state_snapshot = pyqtSignal(dict)     # 대시보드 상태
+    order_requested = pyqtSignal(dict)    # 주문 신호
+    log_message = pyqtSignal(str)         # 로그
+    
+    # === 재평가 입력 이름 (EventScheduler 더티 플래그) ===
+    INPUT_SPY = "SPY"                  # SPY 실시간 가격
+    INPUT_VIX = "VIX"                  # VIX 현물
+    INPUT_VIX_FUTURES = "VIX_FUTURES"  # VIX 선물 (기간구조)
+    INPUT_DAILY = "DAILY"              # 일봉 DB 갱신
+    
+    # === Green Mode VWAP ===
+    MIN_INTRADAY_BARS = 5     # 당일 1분봉이 이만큼 쌓이면 장중 VWAP 사용
+    
+    # === 레짐 지표 ===
+    INDICATOR_HISTORY_DAYS = 126   # KER/ADX 초기화용 일봉 수 (Wilder 평활 수렴)
+    
+    # === 설정값 (.env에서 로드) ===
+    SNAPSHOT_INTERVAL_MS = int(os.getenv("UI_SNAPSHOT_MS", "250"))   # 대시보드 갱신 최소 간격
+    
+    def __init__(self, market_data, parent=None) -> None:
+        """
+        초기화
+        
+        Args:
+            market_data: MarketDataManager (DB 초기화 스레드는 호출자가 시작)
+            parent: 부모 QObject
+        """
+        super().__init__(parent)
+        
+        # --- 소유 모듈 ---
+        self.market_data = market_data
+        self.regime_detector = RegimeDetector()
+        self.regime_timeline = RegimeTimeline(market_data.db, self.regime_detector)
+        self.risk_manager = RiskManager()
+        self.universe_selector = UniverseSelector()
+        
+        # --- 전략 모듈 ---
+        self.green_strategy = GreenModeStrategy(self.risk_manager)
+        self.red_strategy = RedModeStrategy(self.risk_manager)
+        self.black_strategy = BlackModeStrategy(self.risk_manager)
+        
+        # 전략 시그널 → 주문 요청 (메인 스레드로 전달)
+        self.green_strategy.signal_generated.connect(self.order_requested)
+        self.red_strategy.signal_generated.connect(self.order_requested)
+        self.black_strategy.signal_generated.connect(self.order_requested)
+        
+        # --- 상태 변수 ---
+        self._is_running = False
+        self._current_regime = "횡보"
+        self._account_balance = 0.0
+        self._daily_loss = 0.0
+        
+        # --- 최신 시세 (브릿지가 제자리 갱신하는 공용 테이블) ---
+        self.quotes = market_data.quotes
+        self._spy_quote = self.quotes.view("SPY")
+        
+        # --- 마지막 평가 결과 (입력이 안 바뀐 단계는 재사용) ---
+        self._kill_status: Optional[str] = None
+        self._z_score = 0.0
+        self._spy_bars: Optional[dict] = None
+        self._timeline_synced = False
+        
+        # --- 이벤트 스케줄러 (엔진 스레드로 함께 이동) ---
+        self.event_scheduler = EventScheduler(self)
+        self.event_scheduler.evaluate.connect(self._trading_iteration)
+        
+        # --- 대시보드 상태 (변경 시에만 주기적으로 전송) ---
+        self._state: Dict[str, Any] = {
+            "kill_status": "CLEAR",
+            "regime": self._current_regime,
+            "vix": 0.0,
+            "z_score": 0.0,
+            "term_structure": "",
+            "spy_last": 0.0,
+        }
+        self._state_dirty = False
+        self._snapshot_timer = QTimer(self)
+        self._snapshot_timer.timeout.connect(self._emit_snapshot)
+    
+    def move_to_thread(self, thread) -> None:
+        """엔진과 엔진 스레드에서 타이머를 쓰는 하위 객체를 함께 이동"""
+        self.moveToThread(thread)
+        self.market_data.bar_aggregator.moveToThread(thread)
+    
+    # ============================================
+    # 시작/중지 (엔진 스레드에서 실행)
+    # ============================================
+    
+    @pyqtSlot()
+    def start(self) -> None:
+        """트레이딩 시작 (유니버스 선정 → 이벤트 루프)"""
+        # --- 유니버스 선정 (네트워크, 엔진 스레드에서) ---
+        target_etf = self.universe_selector.get_target_etf()
+        self.log_message.emit(f"🎯 타겟 ETF: {target_etf}")
+        
+        # --- 장중 봉 주기 저장 ---
+        self.market_data.bar_aggregator.start()
+        
+        # --- 이벤트 루프 (첫 평가는 전체 실행) ---
+        self._is_running = True
+        self._kill_status = None
+        self._spy_bars = None
+        self._timeline_synced = False
+        self.event_scheduler.start()
+        self._snapshot_timer.start(self.SNAPSHOT_INTERVAL_MS)
+        self.log_message.emit("🔄 이벤트 루프 시작 (틱 구동, 병합 재평가)")
+    
+    @pyqtSlot()
+    def stop(self) -> None:
+        """트레이딩 중지 (남은 장중 봉 저장)"""
+        self._is_running = False
+        self.event_scheduler.stop()
+        self._snapshot_timer.stop()
+        self.market_data.bar_aggregator.stop()
+        self.regime_timeline.flush()
+    
+    # ============================================
+    # 입력 (다른 스레드 시그널 → 엔진 스레드 큐)
+    # ============================================
+    
+    @pyqtSlot(list)
+    def on_price_batch(self, symbol_ids: list) -> None:
+        """
+        실시간 시세 배치 (브릿지 병합 창마다 1회)
+        
+        Args:
+            symbol_ids: 바뀐 심볼 ID 목록 (값은 self.quotes에서 읽음)
+        """
+        bar_aggregator = self.market_data.bar_aggregator
+        
+        for sid in symbol_ids:
+            quote = self.quotes.view_by_id(sid)
+            symbol = quote.symbol
+            last_price = quote.last
+            
+            # 장중 봉 집계 (1초/1분/5분)
+            bar_aggregator.add_tick(symbol, last_price, quote.volume, quote.ts)
+            
+            # VIX 실시간 업데이트 (스냅샷 갱신)
+            if symbol == "VIX" and last_price > 0:
+                self.market_data.vix_snapshot.update_spot(last_price)
+                self.event_scheduler.mark_dirty(self.INPUT_VIX)
+            
+            # SPY 가격 변경 → 전략 재평가 예약 + 차트 가격
+            if symbol == "SPY" and last_price > 0:
+                self._set_state(spy_last=last_price)
+                self.event_scheduler.mark_dirty(self.INPUT_SPY)
+    
+    @pyqtSlot(dict)
+    def on_vix_futures_update(self, futures: dict) -> None:
+        """VIX 선물 갱신 → 킬 스위치 재평가 예약"""
+        self.market_data.vix_snapshot.update_futures(futures)
+        self.event_scheduler.mark_dirty(self.INPUT_VIX_FUTURES)
+    
+    @pyqtSlot(str)
+    def on_daily_update(self, _symbol: str) -> None:
+        """일봉 DB 갱신 → 레짐 재평가 예약"""
+        self.event_scheduler.mark_dirty(self.INPUT_DAILY)
+    
+    @pyqtSlot(float)
+    def set_account_balance(self, balance: float) -> None:
+        """계좌 잔고 갱신"""
+        self._account_balance = balance
+    
+    # ============================================
+    # 대시보드 상태 스냅샷
+    # ============================================
+    
+    def _set_state(self, **values: Any) -> None:
+        """표시 상태 갱신 (바뀐 값이 있을 때만 전송 예약)"""
+        for key, value in values.items():
+            if self._state.get(key) != value:
+                self._state[key] = value
+                self._state_dirty = True
+    
+    def _emit_snapshot(self) -> None:
+        """주기적으로 바뀐 상태만 1회 전송"""
+        if self._state_dirty:
+            self._state_dirty = False
+            self.state_snapshot.emit(dict(self._state))
+    
+    # ============================================
+    # 메인 트레이딩 루프
+    # ============================================
+    
+    def _trading_iteration(self, dirty: set) -> None:
+        """
+        이벤트 구동 트레이딩 루프
+        
+        바뀐 입력에 해당하는 단계만 다시 계산하고,
+        나머지는 마지막 결과를 재사용합니다.
+        
+        Args:
+            dirty: 바뀐 입력 이름 집합 (EventScheduler)
+        """
+        if not self._is_running:
+            return
+        
+        full = EventScheduler.HEARTBEAT in dirty
+        
+        try:
+            vix_data = self.market_data.get_vix_data()
+            vix_spot = vix_data.get("spot", 0)
+            
+            # === 1. 킬 스위치 체크 (1순위!, VIX 변경 시) ===
+            vix_changed = bool(dirty & {self.INPUT_VIX, self.INPUT_VIX_FUTURES})
+            if full or vix_changed or self._kill_status is None:
+                self._kill_status = self.risk_manager.check_kill_switch(
+                    vix_1m=vix_data.get("front_month", 0),
+                    vix_3m=vix_data.get("back_month", 0),
+                    curve=vix_data.get("curve"),
+                )
+                self._set_state(kill_status=self._kill_status)
+            kill_status = self._kill_status
+            
+            # === 2. 킬 스위치 발동 시 Black Mode (상태 머신 경유 → 해제 후 이탈도 디바운스) ===
+            if kill_status != "CLEAR":
+                regime = self.regime_detector.force_regime(
+                    "위기", f"킬 스위치 {kill_status}", self._z_score)
+                self._current_regime = regime
+                self._set_state(regime=regime)
+                return
+            
+            # === 3. 레짐 재계산 (VIX 현물 / 일봉 변경 시) ===
+            regime_before = self._current_regime
+            regime_inputs = dirty & {self.INPUT_VIX, self.INPUT_DAILY}
+            if full or regime_inputs or self._spy_bars is None:
+                # 하이브리드 Z-Score 계산 (캐시 사용)
+                self._z_score = self.market_data.calculate_z_score_hybrid(vix_spot)
+                
+                # SPY 데이터로 KER, ADX 계산 (메모리 캐시 뷰)
+                self._spy_bars = self.market_data.get_price_arrays("SPY", days=30)
+                spy_close = self._spy_bars["close"]
+                if len(spy_close) > 0:
+                    # 증분 KER/ADX (새 일봉만 O(1) 반영, 처음에는 긴 히스토리로 초기화)
+                    daily = self.market_data.get_price_arrays("SPY", days=self.INDICATOR_HISTORY_DAYS)
+                    kers = self.regime_detector.update_ker(daily)
+                    ker = kers[self.regime_detector.KER_PERIOD]
+                    adx = self.regime_detector.update_adx(daily)
+                    
+                    regime = self.regime_detector.get_regime(self._z_score, ker, adx)
+                    self._current_regime = regime
+                    self._set_state(regime=regime)
+                    
+                    # 레짐 타임라인 (일봉 라벨은 일봉이 바뀔 때만, 장중은 1분 버킷)
+                    if self.INPUT_DAILY in dirty or not self._timeline_synced:
+                        self.regime_timeline.update_daily(
+                            self.market_data.get_price_arrays("SPY", days=None),
+                            self.market_data.get_price_arrays("^VIX", days=None),
+                        )
+                        self._timeline_synced = True
+                    self.regime_timeline.record_intraday(
+                        time.time(), regime, self._z_score, ker, adx)
+            
+            # === 4. VIX 정보 (같은 스냅샷 재사용) ===
+            if full or vix_changed:
+                self._set_state(
+                    vix=vix_spot,
+                    z_score=self._z_score,
+                    term_structure=self.market_data.get_vix_term_structure(vix_data),
+                )
+            
+            # === 5. 레짐별 전략 실행 (SPY 가격 / 레짐 변경 시) ===
+            regime_changed = self._current_regime != regime_before
+            if full or regime_changed or self.INPUT_SPY in dirty:
+                self._execute_strategy(self._spy_bars, kill_status)
+        
+        except Exception as e:
+            self.log_message.emit(f"❌ 루프 오류: {str(e)}")
+    
+    def _execute_strategy(self, spy_bars: dict, kill_status: str) -> None:
+        """
+        레짐별 전략 실행
+        
+        전략이 만든 신호는 signal_generated → order_requested로 전달됩니다.
+        
+        Args:
+            spy_bars: SPY 히스토리컬 배열 {"open", "high", "low", "close", "volume"}
+            kill_status: 킬 스위치 상태
+        """
+        closes = spy_bars["close"] if spy_bars else []
+        
+        # 현재 가격 (실시간 가격 없으면 DB 종가)
+        current_price = self._spy_quote.last
+        if current_price <= 0 and len(closes) > 0:
+            current_price = float(closes[-1])
+        
+        if current_price <= 0:
+            return  # 가격 없으면 전략 실행 안함
+        
+        if self._current_regime == "횡보":
+            # Green Mode: VWAP 밴드 매매
+            if len(closes) > 0:
+                vwap, upper, lower = self._calculate_green_vwap(spy_bars)
+                
+                self.green_strategy.generate_signal(
+                    current_price=current_price,
+                    vwap=vwap,
+                    lower_band=lower,
+                    kill_status=kill_status,
+                    daily_loss=self._daily_loss,
+                    account=self._account_balance
+                )
+        
+        elif self._current_regime == "상승":
+            # Red Mode: 3x 레버리지 모멘텀 (전일 고가 돌파 / MA 이탈)
+            if len(closes) > 0:
+                self.red_strategy.generate_signal(
+                    current_price=current_price,
+                    prev_high=float(spy_bars["high"][-1]),
+                    prices=closes,
+                    kill_status=kill_status,
+                    daily_loss=self._daily_loss,
+                    account=self._account_balance,
+                    ma=self._red_ma("SPY"),
+                )
+        
+        elif self._current_regime == "위기":
+            # Black Mode: 방어 (현금화)
+            self.black_strategy.generate_signal(
+                current_price=current_price,
+                kill_status=kill_status,
+                account=self._account_balance
+            )
+    
+    def _red_ma(self, symbol: str) -> float:
+        """Red Mode 이동평균 (지표 파이프라인, 일봉이 바뀔 때만 계산 / 봉 부족 시 0)"""
+        ma = self.market_data.indicators.get(symbol, "sma", self.red_strategy.MA_PERIOD)
+        return 0.0 if math.isnan(ma) else round(ma, 2)
+    
+    def _calculate_green_vwap(self, spy_bars: dict) -> tuple:
+        """
+        Green Mode VWAP 밴드 계산
+        
+        당일 SPY 1분봉이 충분하면 장중 VWAP (대표가격 × 봉 거래량),
+        아니면 일봉 종가/거래량으로 대체합니다.
+        
+        Returns:
+            (vwap, upper_band, lower_band)
+        """
+        bars = self.market_data.bar_aggregator.get_bars(
+            "SPY", "1m", since=session_start_ts(), include_partial=True
+        )
+        if len(bars["close"]) >= self.MIN_INTRADAY_BARS and bars["volume"].sum() > 0:
+            # 미완성 봉이 틱마다 바뀌어 봉 키로 메모 불가 → 직접 계산 (당일 1분봉 ≤ 390개)
+            typical = (bars["high"] + bars["low"] + bars["close"]) / 3
+            return self.green_strategy.calculate_vwap_bands(typical, bars["volume"])
+        
+        # 일봉 대체: 지표 파이프라인 (일봉이 바뀔 때만 계산)
+        bands = self.market_data.indicators.get(
+            "SPY", "vwap_bands", len(spy_bars["close"]), self.green_strategy.BAND_MULTIPLIER
+        )
+        return tuple(round(value, 2) for value in bands)
+    
+    # ============================================
+    # 스케줄러 핸들러
+    # ============================================
+    
+    @pyqtSlot()
+    def handle_pre_close(self) -> None:
+        """장 마감 10분 전 처리 (적응형 오버나이트)"""
+        self.log_message.emit("⏰ 장 마감 10분 전 - 적응형 오버나이트 결정")
+        
+        # === 위기 모드: 즉시 청산 (기존 유지) ===
+        if self._current_regime == "위기":
+            self.log_message.emit("🌑 위기 모드: 즉시 청산")
+            return
+        
+        # === 컨텍스트 수집 (적응형 파라미터) ===
+        try:
+            vix_stats = self.market_data.get_vix_stats()
+            atr = self.market_data.get_atr("SPY")
+            daily_range = self.market_data.get_daily_range_pct("SPY")
+            
+            # 금요일 체크 (US Eastern)
+            import pytz
+            from datetime import datetime
+            us_eastern = pytz.timezone("US/Eastern")
+            is_friday = datetime.now(us_eastern).weekday() == 4
+        
+        except Exception as e:
+            self.log_message.emit(f"⚠️ 컨텍스트 수집 실패: {e}")
+            return
+        
+        # === 횡보 모드: 조건부 오버나이트 ===
+        if self._current_regime == "횡보" and self.green_strategy.has_position():
+            spy_bars = self.market_data.get_price_arrays("SPY", days=30)
+            vwap = self._calculate_green_vwap(spy_bars)[0] if len(spy_bars["close"]) > 0 else 0
+            context = {
+                "current_price": 0,  # TODO: 실시간 가격
+                "entry_price": self.green_strategy._entry_price,
+                "vwap": vwap,
+                "daily_range_pct": daily_range,
+                "is_friday": is_friday
+            }
+            
+            keep = self.green_strategy.should_keep_overnight(context)
+            if not keep:
+                self.log_message.emit("🌑 횡보: 청산 실행")
+                # TODO: 실제 청산 주문
+        
+        # === 상승 모드: 조건부 오버나이트 ===
+        elif self._current_regime == "상승" and self.red_strategy.has_position():
+            spy_bars = self.market_data.get_price_arrays("SPY", days=30)
+            current_price = self._spy_quote.last
+            if current_price <= 0 and len(spy_bars["close"]) > 0:
+                current_price = float(spy_bars["close"][-1])
+            context = {
+                "current_price": current_price,
+                "ma20": self._red_ma("SPY"),
+                "vix": self.market_data.get_vix_data().get("spot") or 15,
+                "vix_mean": vix_stats["mean"],
+                "vix_std": vix_stats["std"],
+                "daily_return": 0,  # TODO: 당일 수익률
+                "atr": atr,
+                "is_friday": is_friday
+            }
+            
+            action = self.red_strategy.should_keep_overnight(context)
+            if action == "LIQUIDATE_ALL":
+                self.log_message.emit("🌑 상승: 전량 청산 실행")
+                # TODO: 전량 청산 주문
+            elif action == "KEEP_HALF":
+                self.log_message.emit("🌓 상승: 50% 청산 실행")
+                # TODO: 50% 청산 주문
+    
+    @pyqtSlot()
+    def handle_market_close(self) -> None:
+        """장 마감 처리"""
+        self.log_message.emit("🔔 장 마감 - 일일 정산")
+        
+        # 전략 리셋
+        self.green_strategy.reset()
+        self.red_strategy.reset()
+        self.black_strategy.reset()
+        
+        self.log_message.emit("🔄 전략 초기화 완료")
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import sys
+    from PyQt6.QtCore import QCoreApplication, QMetaObject, QThread, Qt
+    
+    from core.market_data import MarketDataManager
+    
+    app = QCoreApplication(sys.argv)
+    
+    engine = TradingEngine(MarketDataManager())
+    engine.log_message.connect(lambda x: print(f"[LOG] {x}"))
+    engine.state_snapshot.connect(lambda s: print(f"[SNAPSHOT] {s}"))
+    
+    thread = QThread()
+    engine.move_to_thread(thread)
+    thread.start()
+    
+    print(f"엔진 스레드 분리: {engine.thread() is not app.thread()}")
+    
+    class TickFeed(QObject):
+        """브릿지 대신 시세 배치를 보내는 테스트용 객체"""
+        price_batch = pyqtSignal(list)
+    
+    feed = TickFeed()
+    feed.price_batch.connect(engine.on_price_batch)
+    
+    engine.universe_selector._target_etf = "TQQQ"   # 네트워크 없이 테스트
+    QMetaObject.invokeMethod(engine, "start", Qt.ConnectionType.QueuedConnection)
+    spy = engine.quotes.register("SPY")
+    engine.quotes.update(spy, 0.0, 0.0, 500.0, 0.0, 0.0, 0.0)
+    feed.price_batch.emit([spy])
+    
+    def finish():
+        QMetaObject.invokeMethod(engine, "stop", Qt.ConnectionType.BlockingQueuedConnection)
+        thread.quit()
+        thread.wait()
+        app.quit()
+    
+    QTimer.singleShot(800, finish)
+    app.exec()
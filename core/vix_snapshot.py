@@ -0,0 +1,191 @@
+"""
+============================================
+VIX 스냅샷 서비스 - 메모리 캐시
+============================================
+- VIX 현물/근월물/원월물 + 30/60/90일 고정 만기 커브 최신값을 메모리에 보관
+- 1순위: IBKR 실시간 틱 (VIX 인덱스, VX 선물)
+- 2순위: yfinance 폴백 (백그라운드, 호출 간격 제한)
+- 트레이딩 루프는 네트워크 대기 없이 스냅샷만 읽음
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from dotenv import load_dotenv
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from core.yf_client import get_yf_client
+
+# .env 파일 로드
+load_dotenv()
+
+
+class VixSnapshotService(QThread):
+    """
+    VIX 스냅샷 서비스
+    
+    브릿지 틱으로 갱신되는 VIX 값을 메모리에 보관합니다.
+    실시간 현물이 끊기면 백그라운드에서만 yfinance로 보충합니다.
+    
+    Signals:
+        log_message(str): 로그 메시지
+    """
+    
+    # === PyQt Signals ===
+    log_message = pyqtSignal(str)       # 로그 메시지
+    
+    # === 설정값 (.env에서 로드) ===
+    STALE_SECONDS = float(os.getenv("VIX_STALE_SECONDS", "30"))          # 실시간 값 유효 시간
+    FALLBACK_INTERVAL = float(os.getenv("VIX_FALLBACK_INTERVAL", "60"))  # yfinance 최소 호출 간격
+    POLL_MS = 1000                                                       # 폴백 스레드 점검 주기
+    
+    def __init__(self, parent=None) -> None:
+        """초기화"""
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._is_running = False
+        
+        # === 최신 값 (메모리) ===
+        self._spot: float = 0.0
+        self._front_month: float = 0.0
+        self._back_month: float = 0.0
+        self._curve: Optional[np.ndarray] = None   # 30/60/90일 고정 만기 (브릿지가 미리 계산)
+        
+        # === 갱신 시각 (monotonic 초) ===
+        self._spot_time: float = 0.0         # 마지막 현물 갱신
+        self._last_fallback: float = 0.0     # 마지막 yfinance 호출
+    
+    # ============================================
+    # 갱신 (브릿지 틱 → 스냅샷)
+    # ============================================
+    
+    def update_spot(self, price: float) -> None:
+        """
+        VIX 현물 갱신 (IBKR 실시간 틱)
+        
+        Args:
+            price: VIX 현물 가격
+        """
+        if price <= 0:
+            return
+        with self._lock:
+            self._spot = price
+            self._spot_time = time.monotonic()
+    
+    def update_futures(self, futures: Dict[str, float]) -> None:
+        """
+        VIX 선물 갱신 (IBKR VX 선물 틱)
+        
+        Args:
+            futures: {"front_month": float, "back_month": float, "curve": np.ndarray 또는 None}
+                     (curve가 없거나 유효하지 않으면 보관 중인 커브도 지움 → 근월/원월 비교로 대체)
+        """
+        with self._lock:
+            front = futures.get("front_month", 0.0)
+            back = futures.get("back_month", 0.0)
+            if front > 0:
+                self._front_month = front
+            if back > 0:
+                self._back_month = back
+            curve = futures.get("curve")
+            if curve is not None and (curve > 0).all():
+                self._curve = curve   # 전송마다 새 배열 → 복사 없이 보관
+            else:
+                self._curve = None    # 오래된 커브를 남기지 않음
+    
+    # ============================================
+    # 조회 (트레이딩 루프용, 네트워크 없음)
+    # ============================================
+    
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        최신 VIX 스냅샷 반환
+        
+        선물 값이 아직 없으면 현물로 대체합니다 (기존 동작 유지).
+        
+        Returns:
+            {"spot": float, "front_month": float, "back_month": float,
+             "curve": 30/60/90일 배열 또는 None}
+        """
+        with self._lock:
+            spot = self._spot
+            return {
+                "spot": spot,
+                "front_month": self._front_month or spot,
+                "back_month": self._back_month or spot,
+                "curve": self._curve,
+            }
+    
+    def is_spot_stale(self) -> bool:
+        """실시간 현물이 오래되었는지 확인"""
+        with self._lock:
+            return time.monotonic() - self._spot_time > self.STALE_SECONDS
+    
+    # ============================================
+    # yfinance 폴백 (백그라운드 스레드)
+    # ============================================
+    
+    def refresh_fallback(self) -> None:
+        """yfinance로 VIX 현물 조회 (호출 간격 제한)"""
+        now = time.monotonic()
+        if now - self._last_fallback < self.FALLBACK_INTERVAL:
+            return
+        self._last_fallback = now
+        
+        try:
+            info = get_yf_client().info("^VIX", ttl=self.FALLBACK_INTERVAL)
+            spot = info.get("regularMarketPrice", 0)
+            if not spot:
+                return
+            
+            with self._lock:
+                # 대기 중 실시간 틱이 들어왔으면 덮어쓰지 않음
+                if time.monotonic() - self._spot_time > self.STALE_SECONDS:
+                    self._spot = float(spot)
+        except Exception as e:
+            self.log_message.emit(f"⚠️ VIX 폴백 조회 실패: {str(e)}")
+    
+    def run(self) -> None:
+        """스레드 메인 (실시간 값이 끊겼을 때만 폴백)"""
+        self._is_running = True
+        
+        while self._is_running:
+            if self.is_spot_stale():
+                self.refresh_fallback()
+            QThread.msleep(self.POLL_MS)  # time.sleep 대신!
+    
+    def stop(self) -> None:
+        """스레드 중지 (진행 중인 폴백 조회가 끝날 때까지 대기)"""
+        self._is_running = False
+        if not self.wait(self.POLL_MS * 2):
+            self.log_message.emit("⏳ VIX 폴백 조회 종료 대기 중...")
+            self.wait()
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    service = VixSnapshotService()
+    service.log_message.connect(lambda x: print(f"[LOG] {x}"))
+    
+    print(f"초기 스냅샷: {service.get_snapshot()}")
+    
+    service.update_spot(18.5)
+    print(f"현물 갱신: {service.get_snapshot()}")
+    
+    service.update_futures({"front_month": 19.2, "back_month": 20.1,
+                            "curve": np.array([19.4, 20.0, 20.3])})
+    print(f"선물 갱신: {service.get_snapshot()}")
+    
+    service.update_futures({"front_month": 22.0, "back_month": 0.0, "curve": None})
+    print(f"커브 없는 갱신: {service.get_snapshot()} (curve None 예상)")
+    print(f"현물 오래됨: {service.is_spot_stale()}")
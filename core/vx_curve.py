@@ -0,0 +1,241 @@
+"""
+============================================
+VX 선물 커브 - 월물 체인 + 고정 만기(30/60/90일) 보간
+============================================
+- 연결 후 reqContractDetails 1회로 VX 월물 체인 조회
+  (만기일은 거래소 데이터 그대로 → 공휴일로 당겨진 만기도 정확)
+- 만기가 남은 앞쪽 N개 월물만 구독 대상 (VX_CURVE_MONTHS)
+- 근월물 만기일이 되면 자동 롤오버 (빠진 월물 해지, 다음 월물 추가)
+- 틱마다 월물 가격 배열 갱신 → np.interp로 30/60/90일 고정 만기 커브 미리 계산
+  (가격이 있는 월물 만기가 30일~90일을 감싸지 않으면 커브 없음 → 근월/원월 비교로 대체)
+- 실제 IB 구독은 하지 않음 → 브릿지 루프가 roll() 결과대로 실행
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from ib_insync import Contract, Future
+
+from core.contract_cache import contract_key
+
+# .env 파일 로드
+load_dotenv()
+
+# 고정 만기 (일)
+CM_TENORS = np.array([30.0, 60.0, 90.0])
+
+
+def contract_expiry(contract: Contract) -> datetime:
+    """계약 만기일 (lastTradeDateOrContractMonth "YYYYMMDD")"""
+    return datetime.strptime(contract.lastTradeDateOrContractMonth[:8], "%Y%m%d")
+
+
+class VXCurve:
+    """
+    VX 선물 기간구조
+    
+    사용법:
+        curve = VXCurve()
+        await curve.load_chain_async(ib)            # 연결 후 1회
+        added, removed = curve.roll()               # 구독할 계약 / 해지할 키
+        curve.update("VX:202611", 19.2)             # 틱마다
+        curve.constant_maturity                     # [30일, 60일, 90일] 가격 (보간 불가면 None)
+    """
+    
+    # === 설정값 (.env에서 로드) ===
+    MONTHS = int(os.getenv("VX_CURVE_MONTHS", "5"))    # 구독할 월물 수
+    
+    def __init__(self, months: Optional[int] = None) -> None:
+        """
+        초기화
+        
+        Args:
+            months: 구독할 월물 수 (기본 VX_CURVE_MONTHS)
+        """
+        self.months = months or self.MONTHS
+        self._lock = threading.Lock()
+        
+        # --- 월물 체인 (만기순, 만기 지난 계약 포함) ---
+        self._chain: List[Contract] = []
+        
+        # --- 구독 중인 월물 (앞에서부터 최대 months개) ---
+        self.keys: List[str] = []
+        self.expiries: List[datetime] = []
+        self.prices = np.zeros(0)                          # 월물별 최신 가격 (0 = 미수신)
+        self.constant_maturity: Optional[np.ndarray] = None   # 30/60/90일 보간 가격 (None = 보간 불가)
+    
+    # ============================================
+    # 월물 체인
+    # ============================================
+    
+    async def load_chain_async(self, ib) -> int:
+        """
+        VX 월물 체인 조회 (reqContractDetails 1회)
+        
+        Args:
+            ib: 연결된 IB 객체
+        
+        Returns:
+            월물 계약 수
+        """
+        details = await ib.reqContractDetailsAsync(Future("VX", exchange="CFE"))
+        self.set_chain(d.contract for d in details)
+        return len(self._chain)
+    
+    def set_chain(self, contracts: Iterable[Contract]) -> None:
+        """월물 체인 설정 (주간물 제외, 만기순 정렬)"""
+        monthly = [c for c in contracts
+                   if c.tradingClass in ("", "VX") and c.lastTradeDateOrContractMonth]
+        monthly.sort(key=lambda c: c.lastTradeDateOrContractMonth)
+        with self._lock:
+            self._chain = monthly
+    
+    def has_chain(self, now: Optional[datetime] = None) -> bool:
+        """구독할 월물이 체인에 충분히 남아 있는지 (모자라면 체인 재조회)"""
+        return len(self._live_contracts(now)) >= self.months
+    
+    def _live_contracts(self, now: Optional[datetime] = None) -> List[Contract]:
+        """만기가 남은 월물 (오늘이 만기일이면 제외)"""
+        today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        return [c for c in self._chain if contract_expiry(c) > today]
+    
+    # ============================================
+    # 롤오버
+    # ============================================
+    
+    def roll(self, now: Optional[datetime] = None) -> Tuple[List[Contract], List[str]]:
+        """
+        구독 월물을 앞에서부터 months개로 맞춤 (유지되는 월물의 가격은 보존)
+        
+        Returns:
+            (새로 구독할 계약, 해지할 키)
+        """
+        wanted = self._live_contracts(now)[:self.months]
+        wanted_keys = [contract_key(c) for c in wanted]
+        
+        with self._lock:
+            old = dict(zip(self.keys, self.prices))
+            added = [c for c, key in zip(wanted, wanted_keys) if key not in old]
+            removed = [key for key in self.keys if key not in wanted_keys]
+            
+            self.keys = wanted_keys
+            self.expiries = [contract_expiry(c) for c in wanted]
+            self.prices = np.array([old.get(key, 0.0) for key in wanted_keys], dtype=float)
+            self._recompute(now)
+        
+        return added, removed
+    
+    def seconds_to_roll(self, now: Optional[datetime] = None) -> float:
+        """근월물 만기일 0시까지 남은 초 (구독 월물이 없으면 inf)"""
+        if not self.expiries:
+            return float("inf")
+        return max(0.0, (self.expiries[0] - (now or datetime.now())).total_seconds())
+    
+    # ============================================
+    # 갱신 (틱 경로)
+    # ============================================
+    
+    def update(self, key: str, price: float, now: Optional[datetime] = None) -> bool:
+        """
+        월물 가격 갱신 → 고정 만기 커브 재계산
+        
+        Args:
+            key: "VX:YYYYMM"
+            price: 최신 가격
+        
+        Returns:
+            갱신 여부 (구독 월물이 아니거나 가격이 유효하지 않으면 False)
+        """
+        if not price or price <= 0:
+            return False
+        with self._lock:
+            try:
+                index = self.keys.index(key)
+            except ValueError:
+                return False
+            self.prices[index] = price
+            self._recompute(now)
+        return True
+    
+    def _recompute(self, now: Optional[datetime] = None) -> None:
+        """
+        고정 만기 커브 재계산 (락 안에서 호출)
+        
+        가격이 있는 월물 만기가 30일과 90일을 모두 감싸야 계산합니다.
+        일부 월물만 가격이 있으면 np.interp가 끝 값으로 고정해
+        [f, f, f] 같은 평평한 커브가 되어 백워데이션을 가리므로 None으로 둡니다.
+        """
+        valid = self.prices > 0
+        if not valid.any():
+            self.constant_maturity = None
+            return
+        
+        now = now or datetime.now()
+        days = np.array([(expiry - now).total_seconds() / 86400 for expiry in self.expiries])[valid]
+        if days.min() > CM_TENORS[0] or days.max() < CM_TENORS[-1]:
+            self.constant_maturity = None
+            return
+        self.constant_maturity = np.interp(CM_TENORS, days, self.prices[valid])
+    
+    # ============================================
+    # 조회
+    # ============================================
+    
+    def snapshot(self) -> Dict[str, object]:
+        """
+        커브 스냅샷 (스레드 간 전달용 복사본)
+        
+        Returns:
+            {"front_month": 근월물, "back_month": 근월물+2개월,
+             "curve": [30일, 60일, 90일] 배열 (보간 불가면 None), "keys": 월물 키}
+        """
+        with self._lock:
+            prices = self.prices
+            return {
+                "front_month": float(prices[0]) if len(prices) > 0 else 0.0,
+                "back_month": float(prices[2]) if len(prices) > 2 else 0.0,
+                "curve": None if self.constant_maturity is None else self.constant_maturity.copy(),
+                "keys": list(self.keys),
+            }
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    def vx(expiry: str, trading_class: str = "VX") -> Contract:
+        return Future("VX", expiry, "CFE", tradingClass=trading_class)
+    
+    curve = VXCurve(months=4)
+    curve.set_chain([
+        vx("20261021"), vx("20261118"), vx("20261216"), vx("20270120"),
+        vx("20261028", "VX43"),    # 주간물 (제외)
+        vx("20270217"),
+    ])
+    
+    now = datetime(2026, 10, 17, 10, 0)
+    added, removed = curve.roll(now)
+    print(f"구독: {[contract_key(c) for c in added]}, 해지: {removed}")
+    
+    # 근월물만 가격 있음 → 30/90일을 감싸지 못함 → 커브 없음
+    curve.update(curve.keys[0], 18.0, now)
+    print(f"근월물만 수신: 커브 {curve.constant_maturity} (None 예상)")
+    
+    for key, price in zip(curve.keys, [18.0, 19.5, 20.4, 21.0]):
+        curve.update(key, price, now)
+    print(f"30/60/90일 커브: {np.round(curve.constant_maturity, 2)}")
+    print(f"다음 롤까지: {curve.seconds_to_roll(now) / 86400:.1f}일")
+    
+    # 근월물 만기일 → 롤오버 (유지 월물 가격 보존)
+    expiry_day = datetime(2026, 10, 21, 9, 0)
+    added, removed = curve.roll(expiry_day)
+    print(f"롤오버 구독: {[contract_key(c) for c in added]}, 해지: {removed}")
+    print(f"보존된 가격: {curve.prices}, 스냅샷: {curve.snapshot()}")
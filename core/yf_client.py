@@ -0,0 +1,380 @@
+"""
+============================================
+yfinance 공용 접근 계층 - 디스크 캐시 + 요청 병합 + 호출 제한
+============================================
+- 응답을 (symbol, endpoint, params) 키로 디스크에 저장 (data/yf_cache)
+- 엔드포인트별 TTL (history / info / download)
+- 같은 요청이 동시에 들어오면 네트워크 호출 1회만 (나머지는 대기 후 공유)
+- 네트워크 호출 제한: 토큰 버킷 (YF_BURST개까지 동시에, 이후 평균 간격 유지)
+  → 백필 워커 풀의 병렬 다운로드가 한 줄로 늘어서지 않음 (QThread.msleep, time.sleep 금지)
+- 재시작해도 TTL 안의 응답은 디스크에서 바로 반환
+- 가장 긴 TTL도 지난 항목은 저장 시 주기적으로 삭제 (TTL당 최대 1회, 디스크 캐시 크기 제한)
+- 읽을 수 없는 캐시 파일은 미스로 처리하고 삭제
+============================================
+"""
+
+# ============================================
+# 필수 라이브러리 임포트
+# ============================================
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yfinance as yf
+from dotenv import load_dotenv
+from PyQt6.QtCore import QThread
+
+# .env 파일 로드
+load_dotenv()
+
+# 기본 캐시 경로
+CACHE_DIR = Path(__file__).parent.parent / "data" / "yf_cache"
+
+# 엔드포인트별 TTL (초)
+DEFAULT_TTLS: Dict[str, float] = {
+    "history": float(os.getenv("YF_TTL_HISTORY", "900")),     # 15분
+    "download": float(os.getenv("YF_TTL_HISTORY", "900")),    # history와 동일
+    "info": float(os.getenv("YF_TTL_INFO", "3600")),          # 1시간
+}
+
+
+class _InflightCall:
+    """진행 중인 네트워크 호출 (같은 키의 후속 요청이 대기)"""
+    
+    __slots__ = ("done", "value", "error")
+    
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class YFinanceClient:
+    """
+    yfinance 캐시 클라이언트
+    
+    사용법:
+        client = get_yf_client()
+        df = client.history("SPY", period="6mo")
+        info = client.info("^VIX", ttl=60)
+    """
+    
+    # === 설정값 (.env에서 로드) ===
+    MIN_INTERVAL_MS = int(os.getenv("YF_MIN_INTERVAL_MS", "250"))   # 네트워크 호출 평균 간격 (토큰 보충 주기)
+    BURST = int(os.getenv("YF_BURST", "8"))                         # 대기 없이 허용하는 연속 호출 수
+    
+    def __init__(self, cache_dir: Path = CACHE_DIR,
+                 ttls: Optional[Dict[str, float]] = None) -> None:
+        """
+        초기화
+        
+        Args:
+            cache_dir: 디스크 캐시 디렉터리
+            ttls: 엔드포인트별 TTL (초), 기본값 DEFAULT_TTLS
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        
+        self._lock = threading.Lock()
+        self._memory: Dict[str, tuple] = {}              # 키 → (저장 시각, 값), _lock으로 보호
+        self._last_prune = 0.0                           # 마지막 만료 정리 시각 (첫 저장 때 1회)
+        self._inflight: Dict[str, _InflightCall] = {}
+        
+        # 호출 제한 (토큰 버킷)
+        self._rate_lock = threading.Lock()
+        self._tokens = float(self.BURST)
+        self._last_request = time.monotonic()
+    
+    # ============================================
+    # 엔드포인트
+    # ============================================
+    
+    def history(self, symbol: str, ttl: Optional[float] = None, **params) -> Any:
+        """
+        Ticker.history() (캐시)
+        
+        Args:
+            symbol: 심볼
+            ttl: TTL 재정의 (초)
+            **params: history() 인자 (period, interval, ...)
+        """
+        return self._get(
+            "history", symbol, params,
+            lambda: yf.Ticker(symbol).history(**params),
+            ttl,
+        )
+    
+    def info(self, symbol: str, ttl: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Ticker.info (캐시)
+        
+        Args:
+            symbol: 심볼
+            ttl: TTL 재정의 (초)
+        """
+        return self._get(
+            "info", symbol, {},
+            lambda: dict(yf.Ticker(symbol).info),
+            ttl,
+        )
+    
+    def download(self, symbols: List[str], ttl: Optional[float] = None, **params) -> Any:
+        """
+        yf.download() 다중 심볼 (캐시, 심볼 순서 무관)
+        
+        Args:
+            symbols: 심볼 리스트
+            ttl: TTL 재정의 (초)
+            **params: download() 인자
+        """
+        key_symbol = ",".join(sorted(symbols))
+        return self._get(
+            "download", key_symbol, params,
+            lambda: yf.download(symbols, **params),
+            ttl,
+        )
+    
+    # ============================================
+    # 캐시 조회 / 요청 병합
+    # ============================================
+    
+    @staticmethod
+    def _make_key(endpoint: str, symbol: str, params: Dict[str, Any]) -> str:
+        """(symbol, endpoint, params) → 캐시 키"""
+        raw = json.dumps([symbol, endpoint, params], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    
+    def _get(self, endpoint: str, symbol: str, params: Dict[str, Any],
+             fetch: Callable[[], Any], ttl: Optional[float]) -> Any:
+        """캐시 → (없으면) 병합된 네트워크 호출"""
+        ttl = self.ttls.get(endpoint, 0.0) if ttl is None else ttl
+        key = self._make_key(endpoint, symbol, params)
+        
+        cached = self._lookup(key, ttl)
+        if cached is not None:
+            return _copy(cached)
+        
+        with self._lock:
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _InflightCall()
+                self._inflight[key] = call
+        
+        if not is_leader:
+            # 같은 요청이 진행 중 → 결과 공유
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return _copy(call.value)
+        
+        try:
+            self._throttle()
+            value = fetch()
+            call.value = value
+            if not _is_empty(value):
+                self._store(key, value)
+            return _copy(value)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+    
+    def _lookup(self, key: str, ttl: float) -> Any:
+        """메모리 → 디스크 순으로 TTL 안의 응답 조회"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+        
+        if entry is None:
+            path = self.cache_dir / f"{key}.pkl"
+            try:
+                with open(path, "rb") as f:
+                    entry = pickle.load(f)
+                stored_at, _value = entry     # 형식 확인: (저장 시각, 값)
+                float(stored_at)
+            except FileNotFoundError:
+                return None
+            except Exception:
+                # 손상/구버전 파일 (언피클 실패, 모듈 변경 등) → 미스 + 삭제
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                return None
+            with self._lock:
+                self._memory[key] = entry
+        
+        stored_at, value = entry
+        if now - stored_at > ttl:
+            return None
+        return value
+    
+    def _store(self, key: str, value: Any) -> None:
+        """메모리 + 디스크 저장 (임시 파일 → rename)"""
+        now = time.time()
+        entry = (now, value)
+        with self._lock:
+            self._memory[key] = entry
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_dir / f"{key}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.cache_dir / f"{key}.pkl")
+        except OSError:
+            pass  # 디스크 저장 실패는 무시 (메모리 캐시는 유지)
+        
+        self._prune(now)
+    
+    def _prune(self, now: float) -> None:
+        """가장 긴 TTL도 지난 항목 삭제 (메모리 + 디스크, 남은 임시 파일 포함, TTL당 최대 1회)"""
+        max_age = max(self.ttls.values(), default=0.0)
+        
+        with self._lock:
+            if now - self._last_prune < max_age:
+                return
+            self._last_prune = now
+            expired = [key for key, (stored_at, _) in self._memory.items() if now - stored_at > max_age]
+            for key in expired:
+                del self._memory[key]
+        
+        try:
+            paths = list(self.cache_dir.iterdir())
+        except OSError:
+            return
+        for path in paths:
+            try:
+                if now - path.stat().st_mtime > max_age:
+                    path.unlink()
+            except OSError:
+                pass  # 다른 스레드가 먼저 삭제/교체
+    
+    def _throttle(self) -> None:
+        """토큰 버킷 호출 제한 (BURST개까지 바로 통과, 토큰은 MIN_INTERVAL_MS마다 1개 보충)"""
+        if self.MIN_INTERVAL_MS <= 0:
+            return
+        
+        interval_s = self.MIN_INTERVAL_MS / 1000
+        with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(float(self.BURST), self._tokens + (now - self._last_request) / interval_s)
+            self._last_request = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            
+            # 토큰 1개가 찰 때까지 대기 후 사용
+            QThread.msleep(int((1 - self._tokens) * interval_s * 1000))  # time.sleep 대신!
+            self._tokens = 0.0
+            self._last_request = time.monotonic()
+    
+    def clear(self) -> None:
+        """메모리/디스크 캐시 전체 삭제"""
+        with self._lock:
+            self._memory.clear()
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def _is_empty(value: Any) -> bool:
+    """빈 응답 여부 (빈 응답은 캐시하지 않음 → 일시 장애 시 재시도)"""
+    if value is None:
+        return True
+    empty = getattr(value, "empty", None)
+    if isinstance(empty, bool):
+        return empty
+    return not value
+
+
+def _copy(value: Any) -> Any:
+    """호출자가 캐시 원본을 수정하지 않도록 복사본 반환"""
+    copy = getattr(value, "copy", None)
+    return copy() if callable(copy) else value
+
+
+# ============================================
+# 공용 인스턴스
+# ============================================
+_client: Optional[YFinanceClient] = None
+_client_lock = threading.Lock()
+
+
+def get_yf_client() -> YFinanceClient:
+    """프로세스 공용 YFinanceClient 반환"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = YFinanceClient()
+        return _client
+
+
+# ============================================
+# 단위 테스트
+# ============================================
+if __name__ == "__main__":
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        client = YFinanceClient(cache_dir=Path(tmp))
+        calls = []
+        
+        def fake_fetch():
+            calls.append(1)
+            QThread.msleep(200)
+            return {"regularMarketPrice": 18.5}
+        
+        # 동시 요청 8개 → 네트워크 1회
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(
+                lambda _: client._get("info", "^VIX", {}, fake_fetch, 60), range(8)
+            ))
+        print(f"동시 요청 결과: {results[0]}, 네트워크 호출: {len(calls)}회 (1 예상)")
+        
+        # 재시작 (새 인스턴스) → 디스크 캐시 사용
+        restarted = YFinanceClient(cache_dir=Path(tmp))
+        print(f"재시작 후: {restarted._get('info', '^VIX', {}, fake_fetch, 60)}, "
+              f"네트워크 호출: {len(calls)}회 (1 예상)")
+        
+        # TTL 0 → 다시 요청
+        restarted._get("info", "^VIX", {}, fake_fetch, 0)
+        print(f"TTL 만료 후 네트워크 호출: {len(calls)}회 (2 예상)")
+        
+        # 손상된 캐시 파일 → 미스 처리 + 삭제
+        corrupt = Path(tmp) / f"{client._make_key('info', 'QQQ', {})}.pkl"
+        corrupt.write_bytes(b"not a pickle")
+        fresh = YFinanceClient(cache_dir=Path(tmp))
+        fresh._get("info", "QQQ", {}, fake_fetch, 60)
+        print(f"손상 파일 → 네트워크 호출: {len(calls)}회 (3 예상)")
+        
+        # 오래된 항목은 (시작 후 첫) 저장 때 삭제
+        old = Path(tmp) / "stale.pkl"
+        old.write_bytes(b"")
+        os.utime(old, (0, 0))
+        YFinanceClient(cache_dir=Path(tmp))._get("info", "IWM", {}, fake_fetch, 60)
+        print(f"만료 파일 정리: {'삭제됨' if not old.exists() else '남아 있음'}, "
+              f"캐시 파일 {len(list(Path(tmp).glob('*.pkl')))}개")
+        
+        # 토큰 버킷: BURST개는 바로, 그 다음부터 MIN_INTERVAL_MS 간격
+        limiter = YFinanceClient(cache_dir=Path(tmp))
+        start = time.monotonic()
+        for _ in range(limiter.BURST):
+            limiter._throttle()
+        burst_ms = (time.monotonic() - start) * 1000
+        limiter._throttle()
+        print(f"연속 {limiter.BURST}회: {burst_ms:.0f}ms (대기 없음), "
+              f"{limiter.BURST + 1}번째까지: {(time.monotonic() - start) * 1000:.0f}ms "
+              f"(~{limiter.MIN_INTERVAL_MS} 예상)")
@@ -4,11 +4,18 @@ Project Omnissiah - 메인 컨트롤러 (하이브리드)
 ============================================
 모든 모듈을 통합하여 시스템을 운영합니다.
 
-=== 하이브리드 업데이트 방식 ===
-- 기본 루프: 5초 간격
-- 동적 주기: |Z-Score| >= 1.0 → 1초
-- 이벤트: VIX ±0.5pt → 즉시 업데이트
-- 일봉 통계: 캐싱 (1일 1회)
+=== 스레드 구성 ===
+- GUI 스레드: 대시보드, 주문 실행 (OrderExecutor), 스케줄러
+- 엔진 스레드: 시장 데이터 / 레짐 / 리스크 / 전략 (TradingEngine)
+- 엔진 → 대시보드: 상태 스냅샷 시그널 (250ms 주기, 변경 시에만)
+
+=== 이벤트 구동 방식 ===
+- 틱/VIX 선물 갱신 → 입력별 더티 표시 → 병합 재평가 (최소 간격 50ms)
+- 킬 스위치: VIX 선물/현물이 바뀔 때만 재계산
+- 레짐: VIX 현물 또는 일봉이 바뀔 때만 재계산
+- 전략: SPY 가격 또는 레짐이 바뀔 때만 실행
+- 입력이 없으면 하트비트(10초)로만 전체 재평가
+- 일봉 통계: 롤링 증분 (새 일봉 종가만 push, 같은 날 종가 수정은 마지막 값 교체)
 
 ⚠️ 핵심 규칙:
 - time.sleep() 절대 금지!
@@ -22,20 +29,16 @@ Project Omnissiah - 메인 컨트롤러 (하이브리드)
 import sys
 from typing import Optional
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import QMetaObject, QThread, QTimer, Qt, Q_ARG
 
 # --- 프로젝트 내부 모듈 ---
 from gui.dashboard import OmnissiahDashboard
 from core.bridge import IBKRBridge
 from core.market_data import MarketDataManager
-from core.regime_detector import RegimeDetector
-from core.risk_manager import RiskManager
-from core.scanner import UniverseSelector
 from core.order_executor import OrderExecutor
 from core.scheduler import TradingScheduler
-from strategy.green_mode import GreenModeStrategy
-from strategy.red_mode import RedModeStrategy
-from strategy.black_mode import BlackModeStrategy
+from core.subscription_manager import PRIORITY_SCANNER
+from core.trading_engine import TradingEngine
 
 
 class OmnissiahController:
@@ -43,13 +46,12 @@ class OmnissiahController:
     Omnissiah 메인 컨트롤러
     
     모든 모듈을 연결하고 시스템을 운영합니다.
-    매 1초마다 trading_iteration을 실행합니다.
+    트레이딩 판단은 엔진 스레드(TradingEngine)에서 실행하고,
+    GUI 스레드는 상태 스냅샷 표시와 주문 실행만 담당합니다.
     """
     
-    # === 하이브리드 타이머 설정 ===
-    BASE_INTERVAL = 5000      # 기본 5초
-    FAST_INTERVAL = 1000      # 빠른 1초 (|Z| >= 1.0)
-    Z_THRESHOLD = 1.0         # 주기 전환 임계값
+    # 실시간 시세 구독 심볼
+    MARKET_SYMBOLS = ["SPY", "QQQ", "VIX"]
     
     def __init__(self) -> None:
         """컨트롤러 초기화"""
@@ -61,28 +63,24 @@ class OmnissiahController:
         
         # --- Core 모듈 ---
         self.bridge: Optional[IBKRBridge] = None
+        self._session_started = False     # 첫 연결 시 1회만 구독/엔진 시작
         self.market_data = MarketDataManager()
-        self.regime_detector = RegimeDetector()
-        self.risk_manager = RiskManager()
-        self.universe_selector = UniverseSelector()
-        self.order_executor = OrderExecutor(risk_manager=self.risk_manager)
         self.scheduler = TradingScheduler()
         
-        # --- 전략 모듈 ---
-        self.green_strategy = GreenModeStrategy(self.risk_manager)
-        self.red_strategy = RedModeStrategy(self.risk_manager)
-        self.black_strategy = BlackModeStrategy(self.risk_manager)
+        # --- 트레이딩 엔진 (레짐/리스크/전략 소유, 전용 스레드) ---
+        self.engine = TradingEngine(self.market_data)
+        self.engine_thread = QThread()
+        self.engine.move_to_thread(self.engine_thread)
+        self.engine_thread.start()
+        
+        # 엔진 소유 모듈 참조 (주문 승인용)
+        self.risk_manager = self.engine.risk_manager
+        self.order_executor = OrderExecutor(risk_manager=self.risk_manager)
         
         # --- 상태 변수 ---
-        self._is_running = False
-        self._current_regime = "횡보"
         self._account_balance = 0.0
         self._daily_loss = 0.0
-        self._current_interval = self.BASE_INTERVAL  # 현재 주기
-        
-        # --- 메인 타이머 (하이브리드: 5초 기본) ---
-        self.main_timer = QTimer()
-        self.main_timer.timeout.connect(self._trading_iteration)
+        self._ui_state: dict = {}     # 마지막으로 표시한 스냅샷
         
         # --- 시그널 연결 ---
         self._connect_signals()
@@ -95,27 +93,30 @@ class OmnissiahController:
         # Market Data
         self.market_data.log_message.connect(self.dashboard.add_log)
         self.market_data.vix_update.connect(self._on_vix_update)
+        self.market_data.data_ready.connect(self.engine.on_daily_update)
+        self.market_data.data_ready.connect(self._load_initial_chart_data)
+        
+        # Trading Engine (엔진 스레드 → GUI 스레드, 큐 연결)
+        self.engine.log_message.connect(self.dashboard.add_log)
+        self.engine.state_snapshot.connect(self._on_state_snapshot)
+        self.engine.order_requested.connect(self._execute_order)
         
         # Regime Detector
-        self.regime_detector.regime_changed.connect(self._on_regime_changed)
-        self.regime_detector.log_message.connect(self.dashboard.add_log)
+        self.engine.regime_detector.regime_changed.connect(self._on_regime_changed)
+        self.engine.regime_detector.log_message.connect(self.dashboard.add_log)
+        self.engine.regime_timeline.log_message.connect(self.dashboard.add_log)
         
         # Risk Manager
         self.risk_manager.kill_switch_triggered.connect(self._on_kill_switch)
         self.risk_manager.log_message.connect(self.dashboard.add_log)
         
         # Universe Selector
-        self.universe_selector.log_message.connect(self.dashboard.add_log)
+        self.engine.universe_selector.log_message.connect(self.dashboard.add_log)
         
         # Strategies
-        self.green_strategy.log_message.connect(self.dashboard.add_log)
-        self.red_strategy.log_message.connect(self.dashboard.add_log)
-        self.black_strategy.log_message.connect(self.dashboard.add_log)
-        
-        # 전략 시그널 → 주문 실행 연결
-        self.green_strategy.signal_generated.connect(self._execute_order)
-        self.red_strategy.signal_generated.connect(self._execute_order)
-        self.black_strategy.signal_generated.connect(self._execute_order)
+        self.engine.green_strategy.log_message.connect(self.dashboard.add_log)
+        self.engine.red_strategy.log_message.connect(self.dashboard.add_log)
+        self.engine.black_strategy.log_message.connect(self.dashboard.add_log)
         
         # OrderExecutor
         self.order_executor.log_message.connect(self.dashboard.add_log)
@@ -124,8 +125,8 @@ class OmnissiahController:
         
         # Scheduler
         self.scheduler.log_message.connect(self.dashboard.add_log)
-        self.scheduler.pre_close_warn.connect(self._handle_pre_close)
-        self.scheduler.market_close.connect(self._handle_market_close)
+        self.scheduler.pre_close_warn.connect(self.engine.handle_pre_close)
+        self.scheduler.market_close.connect(self.engine.handle_market_close)
     
     def _setup_buttons(self) -> None:
         """GUI 버튼 설정"""
@@ -146,38 +147,49 @@ class OmnissiahController:
         self.dashboard.stop_button.setEnabled(True)
         
         # --- IBKR 연결 ---
-        self.bridge = IBKRBridge()
+        self.bridge = IBKRBridge(
+            quote_table=self.market_data.quotes,
+            universe=self._contract_universe(),
+        )
         self.bridge.connected.connect(self._on_connected)
         self.bridge.account_update.connect(self._on_account_update)
         self.bridge.error.connect(lambda x: self.dashboard.add_log(x))
         self.bridge.log_message.connect(self.dashboard.add_log)
+        self.bridge.reconciled.connect(self.order_executor.on_reconciled)
         self.bridge.start()
         
-        # --- 차트에 초기 데이터 로드 (스레드 시작 전!) ---
-        self._load_initial_chart_data()
-        
-        # --- 시장 데이터 초기화 (백그라운드) ---
+        # --- 시장 데이터 초기화 (백그라운드, 완료 시 차트 로드) ---
         self.market_data.start()
         
-        # --- 유니버스 선정 ---
-        target_etf = self.universe_selector.get_target_etf()
-        self.dashboard.add_log(f"🎯 타겟 ETF: {target_etf}")
+        # --- VIX 스냅샷 폴백 스레드 (실시간 틱 끊길 때만 yfinance) ---
+        self.market_data.vix_snapshot.start()
+    
+    def _contract_universe(self) -> list:
+        """연결 시 미리 확인할 계약 (시세 + 레버리지/인버스 ETF)"""
+        return (
+            self.MARKET_SYMBOLS
+            + self.engine.universe_selector.LEVERAGED_ETFS
+            + self.engine.black_strategy.INVERSE_SYMBOLS
+        )
     
     def _on_stop(self) -> None:
         """Stop 버튼 클릭"""
         self.dashboard.add_log("⏹ 시스템 중지...")
         
-        # 타이머 중지
-        self.main_timer.stop()
-        self._is_running = False
+        # 엔진 중지 (엔진 스레드에서 실행, 남은 장중 봉 저장까지 대기)
+        self._stop_engine()
         
         # 스케줄러 중지
         self.scheduler.stop()
         
+        # VIX 스냅샷 폴백 스레드 중지
+        self.market_data.vix_snapshot.stop()
+        
         # 브릿지 중지
         if self.bridge:
             self.bridge.stop()
             self.bridge = None
+        self._session_started = False
         
         self.dashboard.start_button.setEnabled(True)
         self.dashboard.stop_button.setEnabled(False)
@@ -187,17 +199,27 @@ class OmnissiahController:
         """IBKR 연결 상태 변경"""
         self.dashboard.update_connection_status(connected)
         
-        if connected:
-            # IB 객체를 OrderExecutor에 전달
+        # 재연결 시에는 상태만 갱신 (구독 복원/대조는 브릿지가 처리)
+        if connected and not self._session_started:
+            self._session_started = True
+            
+            # 브릿지를 OrderExecutor에 전달 (주문은 bridge.submit()으로)
             if self.bridge and self.bridge.ib:
-                self.order_executor.set_ib(self.bridge.ib)
+                self.order_executor.set_bridge(self.bridge)
             
             # MarketDataManager에 bridge 참조 전달 (VIX 선물용)
             self.market_data.bridge = self.bridge
             
-            # 실시간 시세 구독 (SPY, QQQ, VIX)
-            self.bridge.price_update.connect(self._on_price_update)
-            self.bridge.subscribe_market_data(["SPY", "QQQ", "VIX"])
+            # 실시간 시세 구독 (SPY, QQQ, VIX + 후보 ETF) → 엔진 스레드로 직접 전달
+            # 회선 한도를 넘으면 후보 ETF부터 스냅샷 순환
+            self.bridge.price_batch.connect(self.engine.on_price_batch)
+            self.bridge.vix_futures_update.connect(self.engine.on_vix_futures_update)
+            self.bridge.subscribe_market_data(self.MARKET_SYMBOLS)
+            self.bridge.subscribe_market_data(
+                self.engine.universe_selector.LEVERAGED_ETFS
+                + self.engine.black_strategy.INVERSE_SYMBOLS,
+                priority=PRIORITY_SCANNER,
+            )
             
             # VIX 선물 구독 (Term Structure 정확도 향상)
             self.bridge.subscribe_vix_futures()
@@ -205,26 +227,28 @@ class OmnissiahController:
             # 스케줄러 시작
             self.scheduler.start()
             
-            # 연결 성공 시 메인 루프 시작 (하이브리드: 5초 기본)
-            self._is_running = True
-            self._current_interval = self.BASE_INTERVAL
-            self.main_timer.start(self._current_interval)
-            self.dashboard.add_log("🔄 하이브리드 루프 시작 (5초 기본, 동적 조절)")
+            # 연결 성공 시 엔진 시작 (엔진 스레드에서 실행)
+            QMetaObject.invokeMethod(self.engine, "start", Qt.ConnectionType.QueuedConnection)
     
     def _on_account_update(self, info: dict) -> None:
         """계좌 정보 업데이트"""
         self._account_balance = info.get("balance", 0.0)
         self.dashboard.update_balance(self._account_balance)
+        QMetaObject.invokeMethod(
+            self.engine, "set_account_balance", Qt.ConnectionType.QueuedConnection,
+            Q_ARG(float, float(self._account_balance))
+        )
     
-    def _load_initial_chart_data(self) -> None:
+    def _load_initial_chart_data(self, _symbol: str = "ALL") -> None:
         """
         차트에 초기 히스토리 데이터 로드
         
-        로컬 DB에서 최근 50일 데이터를 가져와 차트에 표시합니다.
+        시장 데이터 스레드가 DB 초기화를 마친 뒤(data_ready)
+        메모리 캐시에서 최근 50일 데이터를 가져와 차트에 표시합니다.
         """
         try:
-            # DB에서 SPY 데이터 로드
-            self.market_data.initialize_database()
+            # 메모리 캐시에서 SPY 데이터 로드 (네트워크 없음)
+            self.dashboard.chart_widget.clear()
             df = self.market_data.get_historical_prices("SPY", days=50)
             
             if df.empty:
@@ -251,93 +275,6 @@ class OmnissiahController:
         except Exception as e:
             self.dashboard.add_log(f"⚠️ 차트 데이터 로드 실패: {str(e)}")
     
-    # ============================================
-    # 메인 트레이딩 루프
-    # ============================================
-    
-    def _trading_iteration(self) -> None:
-        """
-        하이브리드 트레이딩 루프
-        
-        기본 5초, |Z-Score| >= 1.0 시 1초로 전환
-        VIX 급변 시 즉시 업데이트
-        """
-        if not self._is_running:
-            return
-        
-        try:
-            # === 1. 킬 스위치 체크 (1순위!) ===
-            vix_data = self.market_data.get_vix_data()
-            vix_1m = vix_data.get("front_month", 0)
-            vix_3m = vix_data.get("back_month", 0)
-            vix_spot = vix_data.get("spot", 0)
-            
-            kill_status = self.risk_manager.check_kill_switch(
-                vix_1m=vix_1m,
-                vix_3m=vix_3m
-            )
-            self.dashboard.update_kill_switch(kill_status)
-            
-            # === 2. 킬 스위치 발동 시 Black Mode ===
-            if kill_status != "CLEAR":
-                self._current_regime = "위기"
-                self.dashboard.update_mode("위기")
-                return
-            
-            # === 3. 하이브리드 Z-Score 계산 (캐시 사용) ===
-            z_score = self.market_data.calculate_z_score_hybrid(vix_spot)
-            
-            # === 4. 동적 주기 조절 ===
-            self._adjust_timer_interval(z_score)
-            
-            # === 5. SPY 데이터로 KER, ADX 계산 ===
-            spy_df = self.market_data.get_historical_prices("SPY", days=30)
-            if not spy_df.empty:
-                prices = spy_df["close"].tolist()
-                ker = self.regime_detector.calculate_ker(prices)
-                
-                if len(spy_df) >= 14:
-                    adx = self.regime_detector.calculate_adx(
-                        spy_df["high"].tolist(),
-                        spy_df["low"].tolist(),
-                        spy_df["close"].tolist()
-                    )
-                else:
-                    adx = 0.0
-                
-                regime = self.regime_detector.get_regime(z_score, ker, adx)
-                self._current_regime = regime
-                self.dashboard.update_mode(regime)
-            
-            # === 6. VIX 정보 GUI 업데이트 ===
-            term_structure = self.market_data.get_vix_term_structure()
-            self.dashboard.update_vix_info(vix_spot, z_score, term_structure)
-            
-            # === 7. 레짐별 전략 실행 ===
-            self._execute_strategy(spy_df, kill_status)
-            
-        except Exception as e:
-            self.dashboard.add_log(f"❌ 루프 오류: {str(e)}")
-    
-    def _adjust_timer_interval(self, z_score: float) -> None:
-        """
-        Z-Score에 따라 타이머 주기 동적 조절
-        
-        |Z-Score| >= 1.0: 1초 (레짐 전환 임박)
-        |Z-Score| < 1.0: 5초 (안정적)
-        """
-        if abs(z_score) >= self.Z_THRESHOLD:
-            new_interval = self.FAST_INTERVAL
-        else:
-            new_interval = self.BASE_INTERVAL
-        
-        # 주기가 변경되었으면 타이머 재시작
-        if new_interval != self._current_interval:
-            self._current_interval = new_interval
-            self.main_timer.setInterval(new_interval)
-            interval_sec = new_interval / 1000
-            self.dashboard.add_log(f"⏱ 주기 변경: {interval_sec:.0f}초 (Z={z_score:.2f})")
-    
     # ============================================
     # 시그널 핸들러
     # ============================================
@@ -349,42 +286,38 @@ class OmnissiahController:
         term = data.get("term_structure", "")
         self.dashboard.update_vix_info(vix, z_score, term)
     
-    def _on_regime_changed(self, regime: str) -> None:
-        """레짐 변경"""
-        self._current_regime = regime
-        self.dashboard.update_mode(regime)
-        self.dashboard.add_log(f"📊 레짐 변경: {regime}")
-    
-    def _on_price_update(self, data: dict) -> None:
+    def _on_state_snapshot(self, state: dict) -> None:
         """
-        실시간 시세 업데이트
+        엔진 상태 스냅샷 표시 (바뀐 항목만 위젯 갱신)
         
         Args:
-            data: {symbol, bid, ask, last, volume, high, low, close}
+            state: {kill_status, regime, vix, z_score, term_structure, spy_last}
         """
-        symbol = data.get("symbol", "")
-        last_price = data.get("last", 0.0)
+        prev = self._ui_state
         
-        # 최신 가격 저장
-        if not hasattr(self, "_last_prices"):
-            self._last_prices = {}
+        if state["kill_status"] != prev.get("kill_status"):
+            self.dashboard.update_kill_switch(state["kill_status"])
         
-        self._last_prices[symbol] = {
-            "last": last_price,
-            "bid": data.get("bid", 0.0),
-            "ask": data.get("ask", 0.0),
-        }
+        if state["regime"] != prev.get("regime"):
+            self.dashboard.update_mode(state["regime"])
         
-        # VIX 실시간 업데이트
-        if symbol == "VIX" and last_price > 0:
-            self.market_data._last_vix = last_price
+        vix_keys = ("vix", "z_score", "term_structure")
+        if any(state[k] != prev.get(k) for k in vix_keys):
+            self.dashboard.update_vix_info(state["vix"], state["z_score"], state["term_structure"])
         
-        # 차트 업데이트 (SPY만)
-        if symbol == "SPY" and last_price > 0:
+        # 차트 가격 (SPY만)
+        if state["spy_last"] > 0 and state["spy_last"] != prev.get("spy_last"):
             try:
-                self.dashboard.chart_widget.update_price(last_price)
+                self.dashboard.chart_widget.update_price(state["spy_last"])
             except Exception:
                 pass  # 차트 업데이트 실패 무시
+        
+        self._ui_state = state
+    
+    def _on_regime_changed(self, regime: str) -> None:
+        """레짐 변경"""
+        self.dashboard.update_mode(regime)
+        self.dashboard.add_log(f"📊 레짐 변경: {regime}")
     
     def _on_kill_switch(self, status: str) -> None:
         """킬 스위치 발동"""
@@ -392,70 +325,6 @@ class OmnissiahController:
         if status != "CLEAR":
             self.dashboard.add_log(f"🚨 킬 스위치 발동: {status}")
     
-    def _execute_strategy(self, spy_df, kill_status: str) -> None:
-        """
-        레짐별 전략 실행
-        
-        Args:
-            spy_df: SPY 히스토리컬 데이터
-            kill_status: 킬 스위치 상태
-        """
-        # 현재 가격 가져오기-
-        if not hasattr(self, "_last_prices") or "SPY" not in self._last_prices:
-            # 실시간 가격 없으면 DB에서 가져오기
-            if spy_df is not None and not spy_df.empty:
-                current_price = spy_df["close"].iloc[-1]
-            else:
-                return  # 가격 없으면 전략 실행 안함
-        else:
-            current_price = self._last_prices["SPY"].get("last", 0)
-            if current_price <= 0 and spy_df is not None and not spy_df.empty:
-                current_price = spy_df["close"].iloc[-1]
-        
-        if current_price <= 0:
-            return
-        
-        signal = None
-        
-        if self._current_regime == "횡보":
-            # Green Mode: VWAP 밴드 매매
-            if spy_df is not None and not spy_df.empty:
-                prices = spy_df["close"].tolist()
-                volumes = spy_df["volume"].tolist()
-                vwap, upper, lower = self.green_strategy.calculate_vwap_bands(prices, volumes)
-                
-                signal = self.green_strategy.generate_signal(
-                    current_price=current_price,
-                    vwap=vwap,
-                    lower_band=lower,
-                    kill_status=kill_status,
-                    daily_loss=getattr(self, "_daily_loss", 0),
-                    account=self._account_balance
-                )
-        
-        elif self._current_regime == "상승":
-            # Red Mode: 3x 레버리지 모멘텀
-            # 타겟 ETF 사용
-            target_etf = self.universe_selector.get_target_etf()
-            signal = self.red_strategy.generate_signal(
-                current_price=current_price,
-                symbol=target_etf,
-                kill_status=kill_status,
-                account=self._account_balance
-            )
-        
-        elif self._current_regime == "위기":
-            # Black Mode: 방어 (현금화)
-            signal = self.black_strategy.generate_signal(
-                current_price=current_price,
-                kill_status=kill_status,
-                account=self._account_balance
-            )
-        
-        # 시그널이 있으면 주문 실행
-        if signal:
-            self._execute_order(signal)
-    
     # ============================================
     # 주문 실행 핸들러
     # ============================================
@@ -511,82 +380,6 @@ class OmnissiahController:
         
         self.dashboard.add_log(f"❌ 주문 실패 ({symbol}): {reason}")
     
-    # ============================================
-    # 스케줄러 핸들러
-    # ============================================
-    
-    def _handle_pre_close(self) -> None:
-        """장 마감 10분 전 처리 (적응형 오버나이트)"""
-        self.dashboard.add_log("⏰ 장 마감 10분 전 - 적응형 오버나이트 결정")
-        
-        # === 위기 모드: 즉시 청산 (기존 유지) ===
-        if self._current_regime == "위기":
-            self.dashboard.add_log("🌑 위기 모드: 즉시 청산")
-            return
-        
-        # === 컨텍스트 수집 (적응형 파라미터) ===
-        try:
-            vix_stats = self.market_data.get_vix_stats()
-            atr = self.market_data.get_atr("SPY")
-            daily_range = self.market_data.get_daily_range_pct("SPY")
-            
-            # 금요일 체크 (US Eastern)
-            import pytz
-            from datetime import datetime
-            us_eastern = pytz.timezone("US/Eastern")
-            is_friday = datetime.now(us_eastern).weekday() == 4
-            
-        except Exception as e:
-            self.dashboard.add_log(f"⚠️ 컨텍스트 수집 실패: {e}")
-            return
-        
-        # === 횡보 모드: 조건부 오버나이트 ===
-        if self._current_regime == "횡보" and self.green_strategy.has_position():
-            context = {
-                "current_price": 0,  # TODO: 실시간 가격
-                "entry_price": self.green_strategy._entry_price,
-                "vwap": 0,  # TODO: 실시간 VWAP
-                "daily_range_pct": daily_range,
-                "is_friday": is_friday
-            }
-            
-            keep = self.green_strategy.should_keep_overnight(context)
-            if not keep:
-                self.dashboard.add_log("🌑 횡보: 청산 실행")
-                # TODO: 실제 청산 주문
-        
-        # === 상승 모드: 조건부 오버나이트 ===
-        elif self._current_regime == "상승" and self.red_strategy.has_position():
-            context = {
-                "current_price": 0,  # TODO: 실시간 가격
-                "ma20": 0,  # TODO: MA20
-                "vix": self.market_data._last_vix if hasattr(self.market_data, '_last_vix') else 15,
-                "vix_mean": vix_stats["mean"],
-                "vix_std": vix_stats["std"],
-                "daily_return": 0,  # TODO: 당일 수익률
-                "atr": atr,
-                "is_friday": is_friday
-            }
-            
-            action = self.red_strategy.should_keep_overnight(context)
-            if action == "LIQUIDATE_ALL":
-                self.dashboard.add_log("🌑 상승: 전량 청산 실행")
-                # TODO: 전량 청산 주문
-            elif action == "KEEP_HALF":
-                self.dashboard.add_log("🌓 상승: 50% 청산 실행")
-                # TODO: 50% 청산 주문
-    
-    def _handle_market_close(self) -> None:
-        """장 마감 처리"""
-        self.dashboard.add_log("🔔 장 마감 - 일일 정산")
-        
-        # 전략 리셋
-        self.green_strategy.reset()
-        self.red_strategy.reset()
-        self.black_strategy.reset()
-        
-        self.dashboard.add_log("🔄 전략 초기화 완료")
-    
     # ============================================
     # 앱 실행
     # ============================================
@@ -604,18 +397,31 @@ class OmnissiahController:
         
         return self.app.exec()
     
+    def _stop_engine(self) -> None:
+        """엔진 중지 (엔진 스레드에서 실행되며 끝날 때까지 대기)"""
+        if self.engine_thread.isRunning():
+            QMetaObject.invokeMethod(
+                self.engine, "stop", Qt.ConnectionType.BlockingQueuedConnection
+            )
+    
     def _cleanup(self) -> None:
         """앱 종료 시 정리"""
         self.dashboard.add_log("🧹 시스템 종료 중...")
         
-        # 타이머 중지
-        if hasattr(self, "main_timer"):
-            self.main_timer.stop()
+        # 엔진 중지 (남은 장중 봉 저장) → 엔진 스레드 종료
+        if hasattr(self, "engine"):
+            self._stop_engine()
+            self.engine_thread.quit()
+            self.engine_thread.wait(2000)  # 최대 2초 대기
         
         # 스케줄러 중지
         if hasattr(self, "scheduler"):
             self.scheduler.stop()
         
+        # VIX 스냅샷 폴백 스레드 중지
+        if hasattr(self, "market_data") and self.market_data.vix_snapshot.isRunning():
+            self.market_data.vix_snapshot.stop()
+        
         # MarketData 스레드 중지
         if hasattr(self, "market_data") and self.market_data.isRunning():
             self.market_data.stop()
@@ -18,10 +18,11 @@ Green Mode 전략 (평균 회귀)
 from datetime import datetime, time
 from typing import Optional, Dict, List, Tuple
 
-import numpy as np
 import pandas as pd
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from core.indicators import vwap_bands
+
 
 class GreenModeStrategy(QObject):
     """
@@ -76,29 +77,8 @@ class GreenModeStrategy(QObject):
         Returns:
             (vwap, upper_band, lower_band)
         """
-        if not prices or not volumes or len(prices) != len(volumes):
-            return (0.0, 0.0, 0.0)
-        
-        prices_arr = np.array(prices)
-        volumes_arr = np.array(volumes)
-        
-        # VWAP 계산
-        total_pv = np.sum(prices_arr * volumes_arr)
-        total_volume = np.sum(volumes_arr)
-        
-        if total_volume == 0:
-            return (0.0, 0.0, 0.0)
-        
-        vwap = total_pv / total_volume
-        
-        # 표준편차 계산 (VWAP 기준)
-        squared_diff = (prices_arr - vwap) ** 2
-        weighted_var = np.sum(squared_diff * volumes_arr) / total_volume
-        std = np.sqrt(weighted_var)
-        
-        # 밴드 계산
-        upper_band = vwap + (self.BAND_MULTIPLIER * std)
-        lower_band = vwap - (self.BAND_MULTIPLIER * std)
+        # 공용 지표 함수 (엔진은 IndicatorPipeline 메모이즈 결과 사용)
+        vwap, upper_band, lower_band = vwap_bands(prices, volumes, self.BAND_MULTIPLIER)
         
         return (round(vwap, 2), round(upper_band, 2), round(lower_band, 2))
     
@@ -18,9 +18,10 @@ Red Mode 전략 (추세 추종)
 from datetime import datetime
 from typing import Optional, Dict, List
 
-import numpy as np
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from core.indicators import sma
+
 
 class RedModeStrategy(QObject):
     """
@@ -77,7 +78,7 @@ class RedModeStrategy(QObject):
         if len(prices) < period:
             return 0.0
         
-        return round(np.mean(prices[-period:]), 2)
+        return round(sma(prices, period), 2)
     
     # ============================================
     # 매매 신호 생성
@@ -85,8 +86,8 @@ class RedModeStrategy(QObject):
     
     def generate_signal(self, current_price: float, prev_high: float,
                        prices: List[float], kill_status: str = "CLEAR",
-                       daily_loss: float = 0.0, account: float = 10000.0
-                       ) -> Optional[Dict]:
+                       daily_loss: float = 0.0, account: float = 10000.0,
+                       ma: Optional[float] = None) -> Optional[Dict]:
         """
         매매 신호 생성
         
@@ -97,11 +98,12 @@ class RedModeStrategy(QObject):
             kill_status: 킬 스위치 상태
             daily_loss: 당일 손실
             account: 계좌 잔고
+            ma: 미리 계산된 MA (지표 파이프라인 값, None이면 prices로 계산)
             
         Returns:
             매매 신호 딕셔너리 또는 None
         """
-        ma20 = self.calculate_ma(prices)
+        ma20 = self.calculate_ma(prices) if ma is None else ma
         position_count = len(self._positions)
         total_qty = sum(p["qty"] for p in self._positions)
         